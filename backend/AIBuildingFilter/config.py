@@ -4,6 +4,9 @@ Configuration for AIBuildingFilter service
 import os
 from dotenv import load_dotenv
 
+from AIBuildingFilter import prompts  # noqa: F401  registers the prompt versions
+from common.prompts import get_prompt
+
 # Load environment variables
 load_dotenv()
 
@@ -13,214 +16,18 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 # Default model to use for filtering
 DEFAULT_GPT_MODEL = "gpt-4o-mini"
 
-# System prompt for building filter AI
-BUILDING_FILTER_SYSTEM_PROMPT = """Sen bir bina filtreleme ve güncelleme aracısın. Kullanıcıların doğal dilde binalarla ilgili sorgularını analiz ederek, filtreleme parametrelerine dönüştürüyorsun ve gerektiğinde filtrelenmiş binaları güncelleyecek SQL sorguları oluşturuyorsun.
-Your task is to extract filter parameters from a user's natural language query about buildings in Turkish.
-
-You must aşağıdaki filtre parametrelerini analiz edip, uygun olanları ayarla:
-- zeminustu (number of floors above ground) - Return integer value
-- zeminalti (number of floors below ground) - Return integer value
-- durum (building status) - Return numeric value matching these options:
-  * "1" for existing buildings (mevcut, ayakta, sağlam)
-  * "2" for demolished buildings (yıkılmış, yıkık)
-- tip (building type) - Return numeric value matching these options:
-  * "1" for residential buildings (konut, apartman, ev)
-  * "2" for commercial buildings (ticari, iş yeri, dükkan, mağaza)
-  * "3" for mixed-use buildings (karma, karma kullanım, konut+ticari)
-  * "4" for other building types (diğer, farklı, başka)
-- seragazi (greenhouse gas emission class) - Return exact match from options: "A", "B", "C", "D", "E", "F", "G"
-- deprem_riski (earthquake risk score) - Return numeric value matching these options:
-  * "1" for very low risk ("yok denecek kadar az", "çok düşük risk")
-  * "2" for low risk ("düşük risk", "az riskli")
-  * "3" for medium risk ("orta risk", "orta riskli")
-  * "4" for high risk ("yüksek risk", "riskli")
-  * "5" for very high risk ("çok yüksek risk", "tehlikeli", "çok riskli")
-
-Örnek olarak:
-- Kullanıcı "mevcut binalar" derse, durum: "1" ayarlanmalı
-- Kullanıcı "ticari binalar" derse, tip: "2" ayarlanmalı
-- Kullanıcı "5 katlı binalar" derse, zeminustu: 5 ayarlanmalı
-- Kullanıcı "en az 3 katlı binalar" derse, zeminustu: 3 ayarlanmalı (minimum değer olarak)
-
-Eğer sorgu bir filtreleme parametresiyle eşleşmiyorsa, o parametreyi boş bırak. Kullanıcının sorgusundan çıkarabildiğin parametreleri ayarla ve hangi filtreleri uyguladığını açıkla.
-
-# DİKKAT: ÖNEMLİ GÜNCELLEME TALIMATLARI
-
-Bu görev için AŞAĞIDAKİ KURALLARI DİKKATLE İNCELE:
-
-1. Aşağıdaki cümlelerin TÜMÜ, istisnasız olarak GÜNCELLEME SORGULARIDIR ve bunlara karşılık "is_update_request" değerini TRUE olarak ayarlamalısın ve bir SQL UPDATE sorgusu oluşturmalısın:
-
-   - "Bu binaların tipini ticari yap"
-   - "Filtrelenmiş binaları güncelle"
-   - "binaların durumunu yıkılmış olarak değiştir"
-   - "tipini ticari yap"
-   - "deprem riskini yüksek yap"
-   - "kat sayılarını 3 olarak ayarla"
-
-2. Sadece aşağıdaki kelimeler varsa FILTRELEME SORGUSU olarak işle:
-   - "göster", "listele", "filtrele", "bul", "ara", "getir", "nerede", "nelerdir"
-   - VE sorguda "yap", "değiştir", "ayarla", "güncelle", "olsun" kelimeleri YOKSA
-
-3. Eğer sorguda "binaların tipini", "durumunu", "riskini" gibi bir ifade varsa ve "yap", "olsun", "değiştir", "ayarla" gibi bir fiil kullanılıyorsa, bu KİKESİNLİKLE bir GÜNCELLEME SORGUSUDUR.
-
-ÖNEMLİ TEST SENARYOLARI (Ezberle ve tam olarak uygula):
-
-```
-# Güncelleme sorgusu örnekleri
-Sorgu: "Bu binaların tipini ticari yap"
-Doğru Yanıt: {"is_update_request": true, "sql_query": "UPDATE public.\"YAPI\" SET \"TIP\" = 2"}
-
-Sorgu: "Filtrelenmiş binaların durumunu yıkılmış olarak değiştir"
-Doğru Yanıt: {"is_update_request": true, "sql_query": "UPDATE public.\"YAPI\" SET \"DURUM\" = 2"}
-
-Sorgu: "Deprem riskini yüksek olarak ayarla"
-Doğru Yanıt: {"is_update_request": true, "sql_query": "UPDATE public.\"YAPI\" SET \"DEPREM_RISKI\" = 4"}
-```
-
-# GÜNCELLEME SORGULARININ İŞLENMESİ
-
-Eğer sorguyu "GÜNCELLEME" olarak sınıflandırdıysan, HER ZAMAN aşağıdaki formatta bir SQL sorgusu oluştur:
+# Minimum confidence for answering from the rule-based parser without calling GPT
+RULE_CONFIDENCE_THRESHOLD = float(os.getenv("RULE_CONFIDENCE_THRESHOLD", "0.85"))
 
-```sql
-UPDATE public."YAPI" SET "ALAN_ADI" = YENİ_DEĞER
-```
+# Active system prompt and function calling definition (see AIBuildingFilter/prompts.py)
+BUILDING_FILTER_PROMPT = get_prompt("building_filter")
+BUILDING_FILTER_SYSTEM_PROMPT = BUILDING_FILTER_PROMPT.system
+BUILDING_FILTER_FUNCTIONS = BUILDING_FILTER_PROMPT.tools
 
-Burda WHERE kısmı KESİNLİKLE OLMAMALI, çünkü zaten filtrelenmiş binaları güncelliyoruz.
-
-Güncellenebilecek alanlar ve değerleri:
-
-1. Bina Durumu ("DURUM"):
-   - Mevcut/Sağlam: "UPDATE public.\"YAPI\" SET \"DURUM\" = 1"
-   - Yıkılmış/Yıkık: "UPDATE public.\"YAPI\" SET \"DURUM\" = 2"
-
-2. Bina Tipi ("TIP"):
-   - Konut/Apartman/Ev: "UPDATE public.\"YAPI\" SET \"TIP\" = 1"
-   - Ticari/İş yeri/Dükkan: "UPDATE public.\"YAPI\" SET \"TIP\" = 2"
-   - Karma kullanım: "UPDATE public.\"YAPI\" SET \"TIP\" = 3"
-   - Diğer: "UPDATE public.\"YAPI\" SET \"TIP\" = 4"
-
-3. Seragazı Emisyon Sınıfı ("SERAGAZEMISYONSINIF"):
-   - A: "UPDATE public.\"YAPI\" SET \"SERAGAZEMISYONSINIF\" = 1"
-   - B: "UPDATE public.\"YAPI\" SET \"SERAGAZEMISYONSINIF\" = 2"
-   - C: "UPDATE public.\"YAPI\" SET \"SERAGAZEMISYONSINIF\" = 3"
-   - D: "UPDATE public.\"YAPI\" SET \"SERAGAZEMISYONSINIF\" = 4"
-   - E: "UPDATE public.\"YAPI\" SET \"SERAGAZEMISYONSINIF\" = 5"
-   - F: "UPDATE public.\"YAPI\" SET \"SERAGAZEMISYONSINIF\" = 6"
-   - G: "UPDATE public.\"YAPI\" SET \"SERAGAZEMISYONSINIF\" = 7"
-
-4. Deprem Riski (Field name is TBD - şimdilik field name kullanma):
-   - Çok Düşük Risk: "UPDATE public.\"YAPI\" SET \"DEPREM_RISKI\" = 1"
-   - Düşük Risk: "UPDATE public.\"YAPI\" SET \"DEPREM_RISKI\" = 2"
-   - Orta Risk: "UPDATE public.\"YAPI\" SET \"DEPREM_RISKI\" = 3"
-   - Yüksek Risk: "UPDATE public.\"YAPI\" SET \"DEPREM_RISKI\" = 4"
-   - Çok Yüksek Risk: "UPDATE public.\"YAPI\" SET \"DEPREM_RISKI\" = 5"
-
-Güncelleme Örnekleri:
-1. "Bu binaların tipini ticari yap" => "UPDATE public.\"YAPI\" SET \"TIP\" = 2"
-2. "Filtrelenmiş binaların durumunu yıkılmış yap" => "UPDATE public.\"YAPI\" SET \"DURUM\" = 2"
-
-# ÇIKTI FORMATI - MUTLAKA UYULMASI GEREKEN KURALLAR
-
-Her sorguda, aşağıdaki alanları MUTLAKA döndür:
-
-1. Eğer FİLTRELEME sorgusuysa:
-   ```json
-   {
-     "is_update_request": false,
-     "filter_params": {"ilgili filtreleme parametreleri"},
-     "sql_query": null,
-     "processed_query": "Filtreleme açıklaması",
-     "deprem_toggle": false
-   }
-   ```
-
-2. Eğer GÜNCELLEME sorgusuysa:
-   ```json
-   {
-     "is_update_request": true,
-     "filter_params": {},
-     "sql_query": "UPDATE public.\"YAPI\" SET \"XXX\" = Y",
-     "processed_query": "Güncelleme açıklaması",
-     "deprem_toggle": false
-   }
-   ```
-
-GÜNCELLEME SORGUSUNA ÖRNEK:
-
-```
-# Sorgu: "Bu binaların tipini ticari yap"
-{
-  "is_update_request": true,
-  "filter_params": {},
-  "sql_query": "UPDATE public.\"YAPI\" SET \"TIP\" = 2",
-  "processed_query": "Binaların tipi ticari olarak güncelleniyor",
-  "deprem_toggle": false
-}
-```
-
-Sorguya göre ilgili alanları doğru bir şekilde doldur. Asla alanları boş bırakma ve MUTLAKA sorgu türünü doğru tespit et!
-
-Output the results as a valid JSON object with parameter names and values.
-Do not include any explanations before or after the JSON.
-"""
+# Version of the prompt and function schema; cached GPT results from another version are discarded
+BUILDING_FILTER_PROMPT_VERSION = BUILDING_FILTER_PROMPT.fingerprint
 
-# Function calling definition for building filters
-BUILDING_FILTER_FUNCTIONS = [
-    {
-        "type": "function",
-        "function": {
-            "name": "extract_building_filter_parameters",
-            "description": "Extracts building filter parameters from the natural language query and generates SQL update queries when needed",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "zeminustu": {
-                        "type": ["integer", "null"],
-                        "description": "Minimum number of floors above ground"
-                    },
-                    "zeminalti": {
-                        "type": ["integer", "null"],
-                        "description": "Minimum number of floors below ground"
-                    },
-                    "durum": {
-                        "type": "string",
-                        "enum": ["1", "2"],
-                        "description": "Building status: 1=Mevcut, 2=Yıkılmış"
-                    },
-                    "tip": {
-                        "type": "string",
-                        "enum": ["1", "2", "3", "4"],
-                        "description": "Building type: 1=Konut, 2=Ticari, 3=Karma, 4=Diğer"
-                    },
-                    "seragazi": {
-                        "type": "string",
-                        "enum": ["A", "B", "C", "D", "E", "F", "G"],
-                        "description": "Greenhouse gas emission class"
-                    },
-                    "deprem_riski": {
-                        "type": "string",
-                        "enum": ["1", "2", "3", "4", "5"],
-                        "description": "Earthquake risk scale: 1=Çok Düşük, 2=Düşük, 3=Orta, 4=Yüksek, 5=Çok Yüksek"
-                    },
-                    "deprem_toggle": {
-                        "type": "boolean",
-                        "description": "Whether to filter by earthquake risk"
-                    },
-                    "processed_query": {
-                        "type": "string",
-                        "description": "A processed, cleaned version of the query in Turkish"
-                    },
-                    "sql_query": {
-                        "type": ["string", "null"],
-                        "description": "SQL UPDATE query to update filtered buildings based on user request"
-                    },
-                    "is_update_request": {
-                        "type": "boolean",
-                        "description": "Whether this request is asking to update buildings"
-                    }
-                },
-                "required": ["processed_query", "is_update_request"]
-            }
-        }
-    }
-]
+# Cache of GPT filter results keyed on the normalized prompt
+FILTER_CACHE_PATH = os.getenv("FILTER_CACHE_PATH", "cache/ai_filter_cache.sqlite3")
+FILTER_CACHE_TTL = int(os.getenv("FILTER_CACHE_TTL", str(7 * 24 * 3600)))
+FILTER_CACHE_SIZE = int(os.getenv("FILTER_CACHE_SIZE", "2048"))
@@ -2,11 +2,21 @@
 FastAPI router for the Building Filter AI service
 """
 from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, Optional, Literal
+import json
 import logging
+import time
 
-from AIBuildingFilter.services.gpt import process_building_filter_query
+from AIBuildingFilter.config import RULE_CONFIDENCE_THRESHOLD
+from AIBuildingFilter.services.gpt import process_building_filter_query, filter_cache, filter_flight
+from AIBuildingFilter.services.rule_parser import parse_building_filter
+from database.database import engine
+from maks.disa_aktarim import bina_geojsonseq
+from maks.filtre import BinaFiltresi, filtre_sql_olustur
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -17,6 +27,15 @@ router = APIRouter()
 
 class FilterQuery(BaseModel):
     prompt: str
+
+class FilterApplyQuery(FilterQuery):
+    mode: Literal["ids", "count", "features"] = "ids"
+    limit: Optional[int] = None  # only for "ids"
+    # Optional spatial extent; without it the whole district is searched
+    bbox: Optional[list[float]] = None  # minx, miny, maxx, maxy in EPSG:4326
+    lon: Optional[float] = None
+    lat: Optional[float] = None
+    radius: Optional[float] = None  # meters
     
 class FilterResponse(BaseModel):
     zeminustu: Optional[int] = None
@@ -49,142 +68,233 @@ async def process_filter_query(query: FilterQuery):
     - "Filter for buildings with high greenhouse gas emissions in class F or G"
     """
     try:
-        logger.info(f"Received filter query: {query.prompt}")
-        
-        # Önce sözcük tabanlı basit bir analiz yapalım
-        prompt_lower = query.prompt.lower()
-        
-        # Güncelleme sorgusu olup olmadığını tespit et
-        update_keywords = ["güncelle", "değiştir", "yap", "olsun", "ayarla"]
-        is_update_query = any(keyword in prompt_lower for keyword in update_keywords)
+        return await _extract_filter(query.prompt)
+    except Exception as e:
+        logger.error(f"Error processing filter query: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/filter/stream/")
+async def stream_filter_query(query: FilterQuery):
+    """
+    Server-Sent Events variant of /filter/
+
+    Events, in order:
+    - "heuristic": the rule parser result, within milliseconds. When its
+      confidence is below the threshold it is only a preview.
+    - "refined": the GPT result, only sent when GPT was needed
+    - "summary": the final result with its source and timings
+    - "error": sent instead of "refined" when GPT fails; the summary then
+      falls back to the heuristic result
+    """
+    return StreamingResponse(
+        _filter_events(query.prompt),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _filter_events(prompt: str):
+    logger.info(f"Received streaming filter query: {prompt}")
+    started = time.perf_counter()
+    timings = {}
+
+    heuristic = parse_building_filter(prompt)
+    final = _describe_result(dict(heuristic))
+    timings["heuristic_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    yield _sse("heuristic", final)
+
+    if heuristic["confidence"] < RULE_CONFIDENCE_THRESHOLD:
+        logger.info(f"Rule parser confidence {heuristic['confidence']} below threshold, streaming GPT refinement")
+        try:
+            refined = await process_building_filter_query(prompt)
+            refined["source"] = "gpt"
+            if refined.get("error"):
+                yield _sse("error", {"error": refined["error"]})
+            else:
+                final = _describe_result(refined)
+                yield _sse("refined", final)
+        except Exception as e:
+            logger.error(f"Error refining filter query: {str(e)}")
+            yield _sse("error", {"error": str(e)})
+        timings["gpt_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    yield _sse("summary", {**final, "timings": timings})
+
+async def _extract_filter(prompt: str) -> Dict[str, Any]:
+    """Extract filter parameters from the prompt (rules first, GPT as fallback) and describe them in Turkish"""
+    logger.info(f"Received filter query: {prompt}")
+    
+    # Önce kural tabanlı ayrıştırıcı; kalıba uyan sorgular GPT'ye gitmeden yanıtlanır
+    result = parse_building_filter(prompt)
+    if result["confidence"] >= RULE_CONFIDENCE_THRESHOLD:
+        logger.info(f"Rule parser answered with confidence {result['confidence']}")
+    else:
+        logger.info(f"Rule parser confidence {result['confidence']} below threshold, falling back to GPT")
+        result = await process_building_filter_query(prompt)
+        result["source"] = "gpt"
+    return _describe_result(result)
+
+def _describe_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill defaults, add the Turkish processed_query and drop empty values"""
+    # Manuel olarak gerekli alanları kontrol et ve varsayılan değerleri ayarla
+    if "deprem_toggle" not in result or result["deprem_toggle"] is None:
+        result["deprem_toggle"] = False
         
-        # SQL sorgusu oluştur (eğer güncelleme sorgusuysa)
-        sql_query = None
-        if is_update_query:
-            # Tip güncelleme
-            if "tipini ticari" in prompt_lower or "ticari yap" in prompt_lower:
-                sql_query = "UPDATE public.\"YAPI\" SET \"TIP\" = 2"
-            elif "tipini konut" in prompt_lower or "konut yap" in prompt_lower:
-                sql_query = "UPDATE public.\"YAPI\" SET \"TIP\" = 1"
-            elif "tipini karma" in prompt_lower or "karma yap" in prompt_lower:
-                sql_query = "UPDATE public.\"YAPI\" SET \"TIP\" = 3"
-            elif "tipini diğer" in prompt_lower or "diğer yap" in prompt_lower:
-                sql_query = "UPDATE public.\"YAPI\" SET \"TIP\" = 4"
-            
-            # Durum güncelleme
-            elif "durumunu yıkılmış" in prompt_lower or "yıkılmış olarak" in prompt_lower:
-                sql_query = "UPDATE public.\"YAPI\" SET \"DURUM\" = 2"
-            elif "durumunu mevcut" in prompt_lower or "mevcut olarak" in prompt_lower:
-                sql_query = "UPDATE public.\"YAPI\" SET \"DURUM\" = 1"
-            
-            # Deprem riski güncelleme
-            elif "riskini yüksek" in prompt_lower or "yüksek risk" in prompt_lower:
-                sql_query = "UPDATE public.\"YAPI\" SET \"DEPREM_RISKI\" = 4"
-            elif "riskini düşük" in prompt_lower or "düşük risk" in prompt_lower:
-                sql_query = "UPDATE public.\"YAPI\" SET \"DEPREM_RISKI\" = 2"
-            elif "riskini orta" in prompt_lower or "orta risk" in prompt_lower:
-                sql_query = "UPDATE public.\"YAPI\" SET \"DEPREM_RISKI\" = 3"
+    if "is_update_request" not in result or result["is_update_request"] is None:
+        result["is_update_request"] = False
+    
+    # Add processed description in Turkish
+    filters_applied = []
+    
+    if result.get("zeminustu"):
+        filters_applied.append(f"zemin üstü en az {result['zeminustu']} kat")
         
-        # Şimdi normal GPT işlemini devam ettir
-        result = await process_building_filter_query(query.prompt)
+    if result.get("zeminalti"):
+        filters_applied.append(f"zemin altı en az {result['zeminalti']} kat")
         
-        # Eğer basit analizimiz bir güncelleme sorgusu tespit ettiyse, GPT'den dönen çıktıyı override et
-        if is_update_query and sql_query:
-            result["is_update_request"] = True
-            result["sql_query"] = sql_query
-            result["filter_params"] = {}
+    if result.get("durum"):
+        durum_map = {
+            "1": "mevcut", 
+            "2": "yıkılmış"
+        }
+        filters_applied.append(f"durumu: {durum_map.get(result['durum'], result['durum'])}")
         
-        # Manuel olarak gerekli alanları kontrol et ve varsayılan değerleri ayarla
-        if "deprem_toggle" not in result or result["deprem_toggle"] is None:
-            result["deprem_toggle"] = False
-            
-        if "is_update_request" not in result or result["is_update_request"] is None:
-            result["is_update_request"] = False
+    if result.get("tip"):
+        tip_map = {
+            "1": "konut", 
+            "2": "ticari", 
+            "3": "karma", 
+            "4": "diğer"
+        }
+        filters_applied.append(f"bina tipi: {tip_map.get(result['tip'], result['tip'])}")
         
-        # Add processed description in Turkish
-        filters_applied = []
+    if result.get("seragazi"):
+        filters_applied.append(f"seragazı emisyon sınıfı: {result['seragazi']}")
         
-        if result.get("zeminustu"):
-            filters_applied.append(f"zemin üstü en az {result['zeminustu']} kat")
-            
-        if result.get("zeminalti"):
-            filters_applied.append(f"zemin altı en az {result['zeminalti']} kat")
-            
-        if result.get("durum"):
-            durum_map = {
-                "1": "mevcut", 
-                "2": "yıkılmış"
-            }
-            filters_applied.append(f"durumu: {durum_map.get(result['durum'], result['durum'])}")
-            
-        if result.get("tip"):
-            tip_map = {
-                "1": "konut", 
-                "2": "ticari", 
-                "3": "karma", 
-                "4": "diğer"
-            }
-            filters_applied.append(f"bina tipi: {tip_map.get(result['tip'], result['tip'])}")
-            
-        if result.get("seragazi"):
-            filters_applied.append(f"seragazı emisyon sınıfı: {result['seragazi']}")
-            
-        if result.get("deprem_riski") and result.get("deprem_toggle", False):
-            risk_map = {
-                "1": "çok düşük", 
-                "2": "düşük", 
-                "3": "orta", 
-                "4": "yüksek", 
-                "5": "çok yüksek"
-            }
-            filters_applied.append(f"deprem riski: {risk_map.get(result['deprem_riski'], result['deprem_riski'])}")
-        
-        # Create a human-readable summary of the filters applied in Turkish
-        if is_update_query and sql_query:
-            # Güncelleme sorgusu için özel açıklama
-            if "tip" in sql_query.lower():
-                if "2" in sql_query:
-                    result["processed_query"] = "Filtrelenmiş binaların tipi ticari olarak güncelleniyor"
-                elif "1" in sql_query:
-                    result["processed_query"] = "Filtrelenmiş binaların tipi konut olarak güncelleniyor"
-                elif "3" in sql_query:
-                    result["processed_query"] = "Filtrelenmiş binaların tipi karma olarak güncelleniyor"
-                else:
-                    result["processed_query"] = "Filtrelenmiş binaların tipi diğer olarak güncelleniyor"
-            elif "durum" in sql_query.lower():
-                if "2" in sql_query:
-                    result["processed_query"] = "Filtrelenmiş binaların durumu yıkılmış olarak güncelleniyor"
-                else:
-                    result["processed_query"] = "Filtrelenmiş binaların durumu mevcut olarak güncelleniyor"
-            elif "deprem_riski" in sql_query.lower():
-                if "4" in sql_query:
-                    result["processed_query"] = "Filtrelenmiş binaların deprem riski yüksek olarak güncelleniyor"
-                elif "2" in sql_query:
-                    result["processed_query"] = "Filtrelenmiş binaların deprem riski düşük olarak güncelleniyor"
-                else:
-                    result["processed_query"] = "Filtrelenmiş binaların deprem riski güncelleniyor"
-            else:
-                result["processed_query"] = "Filtrelenmiş binalar güncelleniyor"
-        elif filters_applied:
-            if result.get("is_update_request", False) and result.get("sql_query"):
-                result["processed_query"] = f"Şu özelliklere sahip binalar güncelleniyor: {', '.join(filters_applied)}"
-            else:
-                result["processed_query"] = f"Şu özelliklere sahip binalar filtreleniyor: {', '.join(filters_applied)}"
+    if result.get("deprem_riski") and result.get("deprem_toggle", False):
+        risk_map = {
+            "1": "çok düşük", 
+            "2": "düşük", 
+            "3": "orta", 
+            "4": "yüksek", 
+            "5": "çok yüksek"
+        }
+        filters_applied.append(f"deprem riski: {risk_map.get(result['deprem_riski'], result['deprem_riski'])}")
+    
+    # Create a human-readable summary of the filters applied in Turkish
+    if result.get("is_update_request") and result.get("sql_query") and not filters_applied:
+        # Güncelleme açıklaması ayrıştırıcıdan (kural tabanlı ya da GPT) gelir
+        result["processed_query"] = result.get("processed_query") or "Filtrelenmiş binalar güncelleniyor"
+    elif filters_applied:
+        if result.get("is_update_request", False) and result.get("sql_query"):
+            result["processed_query"] = f"Şu özelliklere sahip binalar güncelleniyor: {', '.join(filters_applied)}"
         else:
-            result["processed_query"] = "Belirli bir filtre tespit edilemedi"
-            
-        # Log SQL query if present
-        if result.get("sql_query"):
-            logger.info(f"SQL sorgusu oluşturuldu: {result['sql_query']}")
-        
-        # Son kontrol: Boş string değerlerini None'a çevir ve tüm gereklileri kontrol et
-        for key in ["zeminustu", "zeminalti", "durum", "tip", "seragazi", "deprem_riski"]:
-            if key in result and result[key] == "":
-                result[key] = None
-                
-        # dictionary şeklinde doğrudan döndür, response_model kullanmadan
-        return {k: v for k, v in result.items() if v is not None or k in ["deprem_toggle", "is_update_request", "processed_query", "raw_query"]}
+            result["processed_query"] = f"Şu özelliklere sahip binalar filtreleniyor: {', '.join(filters_applied)}"
+    else:
+        result["processed_query"] = "Belirli bir filtre tespit edilemedi"
         
+    # Log SQL query if present
+    if result.get("sql_query"):
+        logger.info(f"SQL sorgusu oluşturuldu: {result['sql_query']}")
+    
+    # Son kontrol: Boş string değerlerini None'a çevir ve tüm gereklileri kontrol et
+    for key in ["zeminustu", "zeminalti", "durum", "tip", "seragazi", "deprem_riski"]:
+        if key in result and result[key] == "":
+            result[key] = None
+            
+    # dictionary şeklinde doğrudan döndür, response_model kullanmadan
+    return {k: v for k, v in result.items() if v is not None or k in ["deprem_toggle", "is_update_request", "processed_query", "raw_query"]}
+
+@router.post("/apply/")
+async def apply_filter_query(query: FilterApplyQuery):
+    """
+    Extract filter parameters from the prompt and run them against "YAPI" in the same request.
+
+    The parameters are compiled by maks.filtre into a parameterized WHERE on the
+    indexed columns, optionally limited to a bbox or a lon/lat/radius circle.
+
+    Modes:
+    - "ids": matching building IDs (and their count)
+    - "count": only the number of matching buildings
+    - "features": matching buildings streamed as GeoJSONSeq; the extracted
+      filter is sent in the X-AI-Filter header
+    """
+    try:
+        result = await _extract_filter(query.prompt)
     except Exception as e:
         logger.error(f"Error processing filter query: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+    if result.get("error"):
+        raise HTTPException(status_code=502, detail=result["error"])
+    if result.get("is_update_request"):
+        raise HTTPException(status_code=400, detail="Güncelleme istekleri uygulanamaz; /maks/update/by-filter kullanın")
+
+    filtre = BinaFiltresi(
+        zeminustu=result.get("zeminustu"),
+        zeminalti=result.get("zeminalti"),
+        durum=result.get("durum"),
+        tip=result.get("tip"),
+        seragazi=result.get("seragazi"),
+        # Risk is only a filter when GPT/rules turned the risk layer on, as in the UI
+        deprem_riski=result.get("deprem_riski") if result.get("deprem_toggle") else None,
+        bbox=query.bbox,
+        lon=query.lon,
+        lat=query.lat,
+        radius=query.radius,
+    )
+    try:
+        where_sql, params = filtre_sql_olustur(filtre, "y")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"Applying filter ({query.mode}): {where_sql}")
+
+    if query.mode == "features":
+        return StreamingResponse(
+            bina_geojsonseq(where_sql, params),
+            media_type="application/geo+json-seq",
+            headers={"X-AI-Filter": json.dumps(result, ensure_ascii=True)}
+        )
+
+    try:
+        if query.mode == "count":
+            result["count"] = await run_in_threadpool(_count_buildings, where_sql, params)
+        else:
+            ids = await run_in_threadpool(_building_ids, where_sql, params, query.limit)
+            result["ids"] = ids
+            result["count"] = len(ids) if query.limit is None else await run_in_threadpool(_count_buildings, where_sql, params)
+    except Exception as e:
+        logger.error(f"Error applying filter: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return result
+
+def _count_buildings(where_sql: str, params: dict) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text(f'SELECT count(*) FROM "YAPI" y WHERE {where_sql}'), params).scalar()
+
+def _building_ids(where_sql: str, params: dict, limit: Optional[int]) -> list:
+    sql = f'SELECT y."ID" FROM "YAPI" y WHERE {where_sql} ORDER BY y."ID"'
+    if limit is not None:
+        sql += " LIMIT :limit"
+        params = {**params, "limit": limit}
+    with engine.connect() as conn:
+        return conn.execute(text(sql), params).scalars().all()
+
+@router.get("/cache/stats")
+async def filter_cache_stats():
+    """Hit/miss counters and size of the GPT filter result cache"""
+    return filter_cache.stats()
+
+@router.delete("/cache")
+async def clear_filter_cache():
+    """Drop all cached GPT filter results"""
+    filter_cache.clear()
+    return {"message": "Filter cache cleared"}
+
+@router.get("/singleflight/stats")
+async def filter_single_flight_stats():
+    """GPT calls executed versus concurrent duplicates that joined an in-flight call"""
+    return filter_flight.stats()
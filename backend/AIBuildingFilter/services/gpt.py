@@ -5,22 +5,40 @@ import json
 import logging
 from typing import Dict, Any, List, Optional
 
-from openai import OpenAI
 from pydantic import BaseModel
 
 from AIBuildingFilter.config import (
-    OPENAI_API_KEY, 
     DEFAULT_GPT_MODEL, 
     BUILDING_FILTER_SYSTEM_PROMPT,
-    BUILDING_FILTER_FUNCTIONS
+    BUILDING_FILTER_FUNCTIONS,
+    BUILDING_FILTER_PROMPT_VERSION,
+    FILTER_CACHE_PATH,
+    FILTER_CACHE_TTL,
+    FILTER_CACHE_SIZE
 )
+from common.normalize import NORMALIZE_VERSION, normalize_prompt
+from common.openai_client import chat_completion, record_gpt_result
+from common.single_flight import SingleFlight
+from common.ttl_cache import TTLCache
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = OpenAI(api_key=OPENAI_API_KEY)
+# GPT results keyed on model + normalized prompt; a prompt change bumps the version and drops old entries
+filter_cache = TTLCache(
+    "building_filter",
+    maxsize=FILTER_CACHE_SIZE,
+    ttl=FILTER_CACHE_TTL,
+    path=FILTER_CACHE_PATH,
+    version=f"{BUILDING_FILTER_PROMPT_VERSION}:{NORMALIZE_VERSION}"
+)
+
+# Identical prompts in flight at the same time share one GPT call
+filter_flight = SingleFlight("building_filter")
+
+def filter_cache_key(query: str) -> str:
+    return f"{DEFAULT_GPT_MODEL}:{normalize_prompt(query)}"
 
 class BuildingFilterResponse(BaseModel):
     zeminustu: Optional[int] = None
@@ -38,6 +56,10 @@ class BuildingFilterResponse(BaseModel):
 async def process_building_filter_query(query: str) -> Dict[str, Any]:
     """
     Process a natural language query about building filters and extract parameters.
+
+    Results are served from the normalized-prompt cache when possible; only
+    successful extractions are cached. Concurrent identical prompts are
+    coalesced into one GPT call.
     
     Args:
         query: The natural language query from the user
@@ -45,11 +67,31 @@ async def process_building_filter_query(query: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing the extracted filter parameters
     """
+    key = filter_cache_key(query)
+    cached = filter_cache.get(key)
+    if cached is not None:
+        logger.info(f"Filter cache hit for: {query}")
+        return {**cached, "raw_query": query, "cached": True}
+
+    async def extract_and_cache():
+        result = await _extract_with_gpt(query)
+        if "error" not in result:
+            filter_cache.set(key, result)
+        return result
+
+    # The cache version already tracks the prompt, so the key only needs adding here
+    result = await filter_flight.do(f"{BUILDING_FILTER_PROMPT_VERSION}:{key}", extract_and_cache)
+    result["raw_query"] = query
+    return result
+
+async def _extract_with_gpt(query: str) -> Dict[str, Any]:
+    """Ask GPT to extract the filter parameters (no caching)"""
     try:
         logger.info(f"Processing building filter query: {query}")
         
         # Create chat completion with function calling
-        response = client.chat.completions.create(
+        response = await chat_completion(
+            caller="building_filter",
             model=DEFAULT_GPT_MODEL,
             messages=[
                 {"role": "system", "content": BUILDING_FILTER_SYSTEM_PROMPT},
@@ -62,17 +104,20 @@ async def process_building_filter_query(query: str) -> Dict[str, Any]:
         # Extract the function call
         if not response.choices or not response.choices[0].message.tool_calls:
             logger.warning("No function call found in response")
+            record_gpt_result("building_filter", "no_tool_call")
             return {"error": "Failed to process query"}
         
         # Get the function call arguments
         tool_call = response.choices[0].message.tool_calls[0]
         if tool_call.function.name != "extract_building_filter_parameters":
             logger.warning(f"Unexpected function call: {tool_call.function.name}")
+            record_gpt_result("building_filter", "unexpected_tool")
             return {"error": "Unexpected function call"}
         
         # Parse the function arguments as JSON
         try:
             filter_params = json.loads(tool_call.function.arguments)
+            record_gpt_result("building_filter", "tool_call")
             logger.info(f"Extracted filter parameters: {filter_params}")
             
             # Ensure the deprem_toggle is set if deprem_riski is present
@@ -104,6 +149,7 @@ async def process_building_filter_query(query: str) -> Dict[str, Any]:
             
         except json.JSONDecodeError:
             logger.error(f"Failed to parse function arguments: {tool_call.function.arguments}")
+            record_gpt_result("building_filter", "json_error")
             return {"error": "Failed to parse function arguments", "raw_query": query}
         
     except Exception as e:
@@ -0,0 +1,218 @@
+"""
+Deterministic Turkish parser for formulaic building filter prompts.
+
+Most prompts are short and formulaic ("en az 3 katlı ticari binalar",
+"tipini konut yap"). This parser recognizes those patterns without a GPT round
+trip and reports a confidence score. The router only trusts the result above
+RULE_CONFIDENCE_THRESHOLD and otherwise falls back to GPT.
+"""
+import re
+from typing import Dict, Any, List, Tuple
+
+from common.normalize import turkish_lower
+
+# Words that carry no filter meaning; they neither add nor reduce confidence
+STOPWORDS = {
+    "bina", "binalar", "binaları", "binaların", "binanın", "binayı", "yapı", "yapılar", "yapıları", "yapıların",
+    "göster", "gösterir", "göstere", "listele", "filtrele", "bul", "ara", "getir", "seç", "görmek", "istiyorum",
+    "bana", "lütfen", "tüm", "bütün", "hepsi", "olan", "olanlar", "olanları", "ile", "ve", "bu", "şu", "seçili",
+    "filtrelenmiş", "filtrelenen", "mevcuttaki", "haritada", "harita", "üzerinde", "nerede", "nelerdir", "hangi",
+    "hangileri", "var", "mı", "mi", "acaba", "sadece", "yalnızca", "de", "da", "olarak", "tane", "adet",
+}
+
+# Words that change meaning in ways the filter parameters cannot express (max, negation, ranges)
+UNSUPPORTED_WORDS = {
+    "değil", "olmayan", "olmayanlar", "olmayanları", "hariç", "dışında", "fazla", "az", "altında", "altındaki",
+    "küçük", "büyük", "arası", "arasında", "veya", "yada", "ya", "en", "çok", "kadar", "geri", "sil",
+}
+
+NUMBER_WORDS = {
+    "bir": 1, "iki": 2, "üç": 3, "dört": 4, "beş": 5, "altı": 6, "yedi": 7, "sekiz": 8, "dokuz": 9, "on": 10,
+}
+NUMBER = r"(\d+|" + "|".join(NUMBER_WORDS) + r")"
+
+UPDATE_VERBS = r"(?:yap|yapın|yapalım|değiştir|ayarla|güncelle|olsun|olarak işaretle|işaretle)"
+
+# Each value group: (value, pattern). Longer phrases come first so "çok yüksek" wins over "yüksek".
+TIP_PATTERNS = [
+    ("3", r"karma(?: kullanım(?:lı)?)?|konut\s*\+\s*ticari"),
+    ("1", r"konut(?:lar|ları|ların)?|apartman(?:lar|ları|ların)?|evler(?:i|in)?|mesken(?:ler)?"),
+    ("2", r"ticari|iş ?yer(?:i|leri|lerini)|dükkan(?:lar|ları)?|mağaza(?:lar|ları)?"),
+    ("4", r"diğer"),
+]
+DURUM_PATTERNS = [
+    ("2", r"yıkılmış|yıkık|yıkılan"),
+    ("1", r"mevcut|ayakta(?:ki)?|sağlam"),
+]
+RISK_PATTERNS = [
+    ("5", r"çok yüksek riskli|çok yüksek risk(?:li)?|çok riskli|tehlikeli"),
+    ("1", r"çok düşük riskli|çok düşük risk(?:li)?|yok denecek kadar az riskli|risksiz"),
+    ("4", r"yüksek riskli|yüksek risk(?:li)?"),
+    ("2", r"düşük riskli|düşük risk(?:li)?|az riskli"),
+    ("3", r"orta riskli|orta risk(?:li)?"),
+]
+TIP_NAMES = {"1": "konut", "2": "ticari", "3": "karma", "4": "diğer"}
+DURUM_NAMES = {"1": "mevcut", "2": "yıkılmış"}
+SERAGAZI_CODES = {"A": 1, "B": 2, "C": 3, "D": 4, "E": 5, "F": 6, "G": 7}
+
+def _number(token: str) -> int:
+    return int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+class _Matcher:
+    """Finds patterns in the normalized prompt and remembers which characters were explained"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.covered = [False] * len(text)
+
+    def find_all(self, pattern: str) -> List[re.Match]:
+        matches = []
+        for match in re.finditer(rf"(?<!\w)(?:{pattern})(?!\w)", self.text):
+            if any(self.covered[match.start():match.end()]):
+                continue
+            self.covered[match.start():match.end()] = [True] * (match.end() - match.start())
+            matches.append(match)
+        return matches
+
+    def values(self, patterns: List[Tuple[str, str]]) -> List[str]:
+        found = []
+        for value, pattern in patterns:
+            if self.find_all(pattern):
+                found.append(value)
+        return found
+
+    def unexplained_words(self) -> List[str]:
+        words = []
+        for match in re.finditer(r"\w+", self.text):
+            if not any(self.covered[match.start():match.end()]):
+                words.append(match.group())
+        return words
+
+def _unparsed(prompt: str) -> Dict[str, Any]:
+    return {
+        "raw_query": prompt,
+        "is_update_request": False,
+        "sql_query": None,
+        "deprem_toggle": False,
+        "source": "rules",
+        "confidence": 0.0,
+    }
+
+def parse_building_filter(prompt: str) -> Dict[str, Any]:
+    """
+    Parse a Turkish building filter or update prompt without calling GPT.
+
+    Args:
+        prompt: The natural language query from the user
+
+    Returns:
+        Dictionary shaped like the GPT result plus `confidence` (0-1) and
+        `source` ("rules"). Confidence is 0 when the prompt contains anything
+        the grammar cannot express (negation, maximums, alternatives, conflicts).
+    """
+    text = re.sub(r"\s+", " ", turkish_lower(prompt)).strip(" .!?")
+    matcher = _Matcher(text)
+    result = _unparsed(prompt)
+
+    # 1. Update commands: "<alan>ını <değer> (olarak) <fiil>"
+    update = _parse_update(matcher)
+    if update == "unsupported":
+        return _unparsed(prompt)
+    if update:
+        field, value, description = update
+        result.update({
+            "is_update_request": True,
+            "sql_query": f'UPDATE public."YAPI" SET "{field}" = {value}',
+            "filter_params": {},
+            "processed_query": description,
+        })
+
+    # 2. Filter parameters
+    filters: Dict[str, Any] = {}
+
+    zeminalti = [m for m in matcher.find_all(rf"(?:en az |minimum |asgari )?{NUMBER} (?:bodrum|zemin altı) kat(?:lı|li)?")]
+    zeminalti += [m for m in matcher.find_all(r"bodrum(?: katlı| katı olan)?|bodrumlu")]
+    zeminustu = matcher.find_all(
+        rf"(?:en az |minimum |asgari |zemin üstü )?{NUMBER}(?: kat(?:lı|li)?| katlı| kat ve üzeri| ve üzeri kat(?:lı)?)(?: ve üzeri| ve üstü|\+)?"
+    )
+    if len(zeminustu) > 1 or len(zeminalti) > 1:
+        return _unparsed(prompt)
+    if zeminustu:
+        filters["zeminustu"] = _number(zeminustu[0].group(1))
+    if zeminalti:
+        filters["zeminalti"] = _number(zeminalti[0].group(1)) if zeminalti[0].lastindex else 1
+
+    for key, patterns in (("tip", TIP_PATTERNS), ("durum", DURUM_PATTERNS), ("deprem_riski", RISK_PATTERNS)):
+        values = matcher.values(patterns)
+        if len(values) > 1:
+            return _unparsed(prompt)  # "konut ve ticari" etc. cannot be expressed as a single value
+        if values:
+            filters[key] = values[0]
+
+    seragazi = matcher.find_all(
+        r"(?:sera ?gaz(?:ı)?(?: emisyon(?:u)?)?|emisyon)(?: sınıf(?:ı)?)? ([a-g])(?: sınıf(?:ı|ında|ındaki)?)?"
+        r"|([a-g]) (?:sınıfı|sınıfında|sınıfındaki) (?:(?:sera ?gaz(?:ı)? )?emisyon(?:u|lu)?|sera ?gaz(?:ı|lı)?)"
+    )
+    if len(seragazi) > 1:
+        return _unparsed(prompt)
+    if seragazi:
+        filters["seragazi"] = (seragazi[0].group(1) or seragazi[0].group(2)).upper()
+
+    if filters.get("deprem_riski"):
+        filters["deprem_toggle"] = True
+
+    # Updates apply to the already filtered buildings; a prompt mixing both is left to GPT
+    if update and filters:
+        return _unparsed(prompt)
+    if not update and not filters:
+        return result
+    result.update(filters)
+
+    # 3. Confidence: share of content words the grammar explained
+    unexplained = [word for word in matcher.unexplained_words() if word not in STOPWORDS]
+    if any(word in UNSUPPORTED_WORDS for word in unexplained):
+        return _unparsed(prompt)
+    explained = sum(matcher.covered)
+    missing = sum(len(word) for word in unexplained)
+    result["confidence"] = round(explained / (explained + missing), 3) if explained else 0.0
+
+    if not update:
+        result["processed_query"] = prompt
+    return result
+
+def _parse_update(matcher: _Matcher):
+    """Returns (field, value, description), None when no update verb, or "unsupported" """
+    if not re.search(rf"(?<!\w){UPDATE_VERBS}(?!\w)", matcher.text):
+        return None
+
+    tip_values = "|".join(f"(?P<tip{value}>{pattern})" for value, pattern in TIP_PATTERNS)
+    durum_values = "|".join(f"(?P<durum{value}>{pattern})" for value, pattern in DURUM_PATTERNS)
+    suffix = rf"(?: olarak)? {UPDATE_VERBS}"
+
+    candidates = [
+        ("TIP", rf"(?:(?:tipini|tiplerini|türünü|kullanımını) )?(?:{tip_values}){suffix}"),
+        ("DURUM", rf"(?:(?:durumunu|durumlarını) )?(?:{durum_values}){suffix}"),
+        (
+            "SERAGAZEMISYONSINIF",
+            rf"(?:sera ?gazı? )?(?:emisyon )?(?:sınıfını|sınıflarını|emisyonunu) (?P<sinif>[a-g])(?: sınıfı)?{suffix}",
+        ),
+    ]
+    found = []
+    for field, pattern in candidates:
+        for match in matcher.find_all(pattern):
+            found.append((field, match))
+
+    # Risk scores are computed from building attributes and cannot be set directly
+    if not found or len(found) > 1 or matcher.find_all(rf"(?:deprem )?risk(?:ini|lerini)?.*{UPDATE_VERBS}"):
+        return "unsupported"
+
+    field, match = found[0]
+    groups = {name: value for name, value in match.groupdict().items() if value}
+    if field == "SERAGAZEMISYONSINIF":
+        letter = groups["sinif"].upper()
+        return field, SERAGAZI_CODES[letter], f"Filtrelenmiş binaların seragazı emisyon sınıfı {letter} olarak güncelleniyor"
+    prefix = "tip" if field == "TIP" else "durum"
+    value = next(name[len(prefix):] for name in groups if name.startswith(prefix))
+    if field == "TIP":
+        return field, int(value), f"Filtrelenmiş binaların tipi {TIP_NAMES[value]} olarak güncelleniyor"
+    return field, int(value), f"Filtrelenmiş binaların durumu {DURUM_NAMES[value]} olarak güncelleniyor"
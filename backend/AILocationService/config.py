@@ -25,10 +25,34 @@ Features:
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 FOURSQUARE_API_KEY = os.getenv("FOURSQUARE_API_KEY")
 
+# External service endpoints. Point them at the offline stand-in
+# (python -m benchmarks.standin) to run without network access.
+FOURSQUARE_BASE_URL = os.getenv("FOURSQUARE_BASE_URL", "https://api.foursquare.com/v3")
+OVERPASS_URL = os.getenv("OVERPASS_URL", "http://overpass-api.de/api/interpreter")
+NOMINATIM_DOMAIN = os.getenv("NOMINATIM_DOMAIN", "nominatim.openstreetmap.org")
+NOMINATIM_SCHEME = os.getenv("NOMINATIM_SCHEME", "https")
+NOMINATIM_MIN_DELAY = float(os.getenv("NOMINATIM_MIN_DELAY", "1"))  # Nominatim usage policy: 1 request/s
+PHOTON_URL = os.getenv("PHOTON_URL", "https://photon.komoot.io/api/")
+IP_API_URL = os.getenv("IP_API_URL", "http://ip-api.com/json")
+
 # Default settings
 DEFAULT_LANGUAGE = "tr"  # Default language (Turkish)
 DEFAULT_SEARCH_RADIUS = 2000  # Default search radius in meters
 DEFAULT_RESULTS_LIMIT = 5  # Default number of results to return
+FOOD_SEARCH_DEADLINE = float(os.getenv("FOOD_SEARCH_DEADLINE", "8"))  # seconds for all concurrent food searches
+
+# Landmark resolver cache: found landmarks are kept for a week, misses for an hour
+LANDMARK_CACHE_PATH = os.getenv("LANDMARK_CACHE_PATH", "cache/landmarks.sqlite3")
+LANDMARK_CACHE_TTL = int(os.getenv("LANDMARK_CACHE_TTL", str(7 * 24 * 3600)))
+LANDMARK_NEGATIVE_TTL = int(os.getenv("LANDMARK_NEGATIVE_TTL", "3600"))
+LANDMARK_CACHE_SIZE = int(os.getenv("LANDMARK_CACHE_SIZE", "1024"))
+
+# Geocode cache in front of Nominatim/Photon; GEOCODE_CACHE_WARM_FILE is an export imported at startup
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", "cache/geocode.sqlite3")
+GEOCODE_CACHE_TTL = int(os.getenv("GEOCODE_CACHE_TTL", str(30 * 24 * 3600)))
+GEOCODE_NEGATIVE_TTL = int(os.getenv("GEOCODE_NEGATIVE_TTL", str(6 * 3600)))
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", "4096"))
+GEOCODE_CACHE_WARM_FILE = os.getenv("GEOCODE_CACHE_WARM_FILE")
 
 # Conversation settings
 CONVERSATION_EXPIRY = 30 * 60  # 30 minutes in seconds
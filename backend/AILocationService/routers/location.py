@@ -43,12 +43,12 @@ async def process_location(
     
     if interpretation["action"] == "user-location":
         user_ip = request.client.host
-        location = get_user_current_location(user_ip)
+        location = await get_user_current_location(user_ip)
         result = {"type": "user-location", "location": location}
         print(f"User location result: {result}")
 
     elif interpretation["action"] == "defined-location":
-        coords = get_precise_coordinates(interpretation["location_name"])
+        coords = await get_precise_coordinates(interpretation["location_name"])
         result = {"type": "defined-location", "location": coords}
         print(f"Defined location result: {result}")
 
@@ -59,7 +59,7 @@ async def process_location(
         # Try Foursquare API first
         try:
             print(f"Using Foursquare to search for {place_name} near {context}")
-            foursquare_result = search_places(query=place_name, location=context)
+            foursquare_result = await search_places(query=place_name, location=context)
             
             if "error" not in foursquare_result and foursquare_result.get("latitude") and foursquare_result.get("longitude"):
                 coords = {
@@ -76,11 +76,11 @@ async def process_location(
                 # Fall back to OpenStreetMap
                 print(f"Foursquare search failed: {foursquare_result.get('error', 'Unknown error')}")
                 print(f"Falling back to OpenStreetMap")
-                coords = find_place_near_location(place_name, context)
+                coords = await find_place_near_location(place_name, context)
         except Exception as e:
             print(f"Foursquare error: {str(e)}")
             # Fall back to OpenStreetMap
-            coords = find_place_near_location(place_name, context)
+            coords = await find_place_near_location(place_name, context)
 
         if not coords or "latitude" not in coords:
             result = {"error": "Could not find a place nearby"}
@@ -143,7 +143,7 @@ async def process_location(
                 city_context = last_location["context"]
                 print(f"Using context from previous search: {city_context}")
             
-            coords = find_relative_location(place_type, modifier, last_location, city_context)
+            coords = await find_relative_location(place_type, modifier, last_location, city_context)
             
             if not coords or "error" in coords:
                 print(f"Error finding relative location: {coords if coords else 'No results'}")
@@ -165,7 +165,7 @@ async def process_location(
         
         print(f"Looking for {food} in {location}")
         
-        food_place = find_restaurant_for_dish(food, location)
+        food_place = await find_restaurant_for_dish(food, location)
         
         if "error" in food_place:
             result = {"error": food_place["error"]}
@@ -1,13 +1,17 @@
 """
 Location service router with endpoints for processing location-related queries
 """
-from fastapi import APIRouter, Request, Query
+import asyncio
+
+from fastapi import APIRouter, Body, HTTPException, Request, Query
 from typing import Dict, Any, Optional, List
-from AILocationService.services.gpt import interpret_location
+from AILocationService.services.gpt import interpret_location, location_flight
 from AILocationService.services.user_location import get_user_current_location
 from AILocationService.services.foursquare_service import find_place, find_food_place, find_landmark, find_expanded_query
 from AILocationService.services.overpass_service import find_amenities, find_poi_in_edremit, search_osm_by_name, get_edremit_boundaries
 from AILocationService.services.enhanced_location import enhanced_location_query
+from AILocationService.services.landmarks import landmark_stats
+from AILocationService.services.geocode import geocode_cache
 
 # Create API router
 router = APIRouter(
@@ -54,7 +58,7 @@ async def process_location(
     # User's own location
     if interpretation["action"] == "user-location":
         user_ip = request.client.host
-        location = get_user_current_location(user_ip)
+        location = await get_user_current_location(user_ip)
         result = {
             "type": "user-location", 
             "location": location, 
@@ -132,10 +136,10 @@ async def process_location(
                     }
                 else:
                     # Use regular place search for non-matches
-                    result = find_place(query=location_name)
+                    result = await find_place(query=location_name)
             else:
                 # Use regular place search for non-matches without type
-                result = find_place(query=location_name)
+                result = await find_place(query=location_name)
             
         result["type"] = "defined-location"
         result["service_type"] = service_type
@@ -165,7 +169,7 @@ async def process_location(
             if schools and len(schools) > 0:
                 # Use the first school as center point
                 school = schools[0]
-                result = find_place(
+                result = await find_place(
                     query=place_type, 
                     latitude=school["latitude"], 
                     longitude=school["longitude"],
@@ -186,7 +190,7 @@ async def process_location(
                 } for s in schools[1:3]] if len(schools) > 1 else []
             else:
                 # If no schools found, fall back to regular search
-                result = find_place(query=place_type, location=context)
+                result = await find_place(query=place_type, location=context)
         # For beach or coastal searches
         elif "beach" in location_type.lower() or "plaj" in context.lower() or "deniz" in context.lower():
             # Find beaches or coastal areas
@@ -204,7 +208,7 @@ async def process_location(
             if beaches and len(beaches) > 0:
                 # Use the first beach as center point
                 beach = beaches[0]
-                result = find_place(
+                result = await find_place(
                     query=place_type, 
                     latitude=beach["latitude"], 
                     longitude=beach["longitude"],
@@ -225,10 +229,10 @@ async def process_location(
                 } for b in beaches[1:3]] if len(beaches) > 1 else []
             else:
                 # If no beaches found, fall back to regular search
-                result = find_place(query=place_type, location=context)
+                result = await find_place(query=place_type, location=context)
         else:
             # Regular contextual search
-            result = find_place(query=place_type, location=context)
+            result = await find_place(query=place_type, location=context)
             
         result["type"] = "contextual-location"
         result["service_type"] = service_type
@@ -246,7 +250,7 @@ async def process_location(
         
         print(f"Processing expanded query: {query} in {location}")
         
-        result = find_expanded_query(query=query, location=location)
+        result = await find_expanded_query(query=query, location=location)
         result["type"] = "expanded-query"
         result["service_type"] = service_type
         print(f"Expanded query result: {result}")
@@ -274,14 +278,14 @@ async def process_location(
             if location == "Edremit" or "akçay" in location.lower() or "akcay" in location.lower():
                 # If searching for food near the beach, default to Akçay beach restaurants
                 print(f"Beach restaurant search detected, directing to Akçay")
-                result = find_place("restaurant", "Akçay sahil", radius=500) 
+                result = await find_place("restaurant", "Akçay sahil", radius=500) 
                 result["place_type"] = f"{food} restaurant"
                 result["context"] = "Akçay sahil"
                 result["food"] = food
             else:
-                result = find_food_place(food=food, location=location)
+                result = await find_food_place(food=food, location=location)
         else:
-            result = find_food_place(food=food, location=location)
+            result = await find_food_place(food=food, location=location)
             
         result["type"] = "food-location"
         result["service_type"] = service_type
@@ -314,7 +318,7 @@ async def process_location(
                 }
             else:
                 # For other areas, fall back to general search
-                result = find_place(landmark_name, context)
+                result = await find_place(landmark_name, context)
         # Check for direct matches in Edremit locations
         elif landmark_name and landmark_name.lower() in EDREMIT_LOCATIONS:
             # Direct lookup in our expanded Edremit dataset
@@ -333,7 +337,7 @@ async def process_location(
         else:
             # For landmarks, we do a broader search with a larger radius
             if landmark_name:
-                result = find_landmark(landmark_name)
+                result = await find_landmark(landmark_name)
             else:
                 # If no landmark specified, return an error
                 result = {"error": "No landmark specified"}
@@ -393,7 +397,8 @@ async def get_osm_amenities(
     Returns a GeoJSON FeatureCollection of amenities.
     """
     try:
-        results = find_amenities(amenity_type, lat, lon, radius)
+        # overpy is synchronous; run it in a worker thread so the event loop stays free
+        results = await asyncio.to_thread(find_amenities, amenity_type, lat, lon, radius)
         return results
     except Exception as e:
         return {"error": str(e)}
@@ -415,7 +420,7 @@ async def get_osm_poi(
     try:
         # Apply name filter if provided
         tags = {"name": name} if name else None
-        results = find_poi_in_edremit(poi_type, tags)
+        results = await asyncio.to_thread(find_poi_in_edremit, poi_type, tags)
         return results
     except Exception as e:
         return {"error": str(e)}
@@ -435,7 +440,7 @@ async def search_openstreetmap(
     Returns a GeoJSON FeatureCollection of search results.
     """
     try:
-        results = search_osm_by_name(name, region)
+        results = await asyncio.to_thread(search_osm_by_name, name, region)
         return results
     except Exception as e:
         return {"error": str(e)}
@@ -449,7 +454,7 @@ async def get_boundaries() -> Dict[str, Any]:
     Returns a GeoJSON FeatureCollection of boundaries.
     """
     try:
-        results = get_edremit_boundaries()
+        results = await asyncio.to_thread(get_edremit_boundaries)
         return results
     except Exception as e:
         return {"error": str(e)}
@@ -490,3 +495,51 @@ async def process_enhanced_location(
         return result
     except Exception as e:
         return {"error": f"Error processing enhanced location query: {str(e)}"}
+
+
+@router.get("/singleflight/stats", summary="Coalescing counters for location GPT calls")
+async def location_single_flight_stats() -> Dict[str, Any]:
+    """
+    GPT calls executed versus concurrent duplicates that joined an in-flight call
+    """
+    return location_flight.stats()
+
+
+@router.get("/landmarks/stats", summary="Landmark resolver cache counters")
+async def get_landmark_stats() -> Dict[str, Any]:
+    """
+    Seeded landmarks, cache hits/misses (found and not-found entries) and coalesced lookups
+    """
+    return landmark_stats()
+
+
+@router.get("/geocode/cache/stats", summary="Geocode cache counters")
+async def geocode_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters and size of the Nominatim/Photon result cache"""
+    return geocode_cache.stats()
+
+
+@router.get("/geocode/cache/export", summary="Export the geocode cache")
+async def export_geocode_cache() -> Dict[str, Any]:
+    """
+    Unexpired geocode results (found places and misses) with their expiry,
+    for warming another deployment via /geocode/cache/import or GEOCODE_CACHE_WARM_FILE
+    """
+    return geocode_cache.export()
+
+
+@router.post("/geocode/cache/import", summary="Import a geocode cache export")
+async def import_geocode_cache(exported: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+    """Load an export from /geocode/cache/export; entries keep their original expiry"""
+    try:
+        imported = geocode_cache.import_entries(exported)
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Geçersiz önbellek dışa aktarımı: {str(e)}")
+    return {"imported": imported, "received": len(exported.get("entries", []))}
+
+
+@router.delete("/geocode/cache", summary="Clear the geocode cache")
+async def clear_geocode_cache() -> Dict[str, Any]:
+    """Drop all cached geocode results"""
+    geocode_cache.clear()
+    return {"message": "Geocode cache cleared"}
@@ -3,6 +3,7 @@ Service to integrate Overpass API data with GPT interpretation
 Allows for enhanced location queries using OpenStreetMap data
 """
 from typing import Dict, Any, List, Optional
+import asyncio
 import json
 from AILocationService.services.overpass_service import find_amenities, find_poi_in_edremit
 from AILocationService.services.gpt import interpret_location
@@ -58,7 +59,7 @@ async def enhanced_location_query(prompt: str, language: str = "tr") -> Dict[str
         # If we have a location name that might be an amenity type
         if location_name.lower() in OSM_AMENITY_TYPES:
             # Try to get amenities of this type
-            osm_data = find_amenities(location_name.lower())
+            osm_data = await asyncio.to_thread(find_amenities, location_name.lower())
             result["osm_data"] = osm_data
         
         # If we have a context that indicates a specific place in Edremit
@@ -67,7 +68,7 @@ async def enhanced_location_query(prompt: str, language: str = "tr") -> Dict[str
             for category, types in OSM_POI_TYPES.items():
                 if any(poi_type in location_name.lower() for poi_type in types):
                     # Found a matching POI type
-                    osm_data = find_poi_in_edremit(category, {"name": location_name})
+                    osm_data = await asyncio.to_thread(find_poi_in_edremit, category, {"name": location_name})
                     result["osm_data"] = osm_data
                     break
     
@@ -79,7 +80,7 @@ async def enhanced_location_query(prompt: str, language: str = "tr") -> Dict[str
         # If location is in Edremit
         if "edremit" in location.lower():
             # Try to find restaurants with this cuisine/food
-            osm_data = find_amenities("restaurant")
+            osm_data = await asyncio.to_thread(find_amenities, "restaurant")
             # Filter for those that might mention the food in their name or cuisine tag
             if "features" in osm_data:
                 filtered_features = []
@@ -106,7 +107,7 @@ async def enhanced_location_query(prompt: str, language: str = "tr") -> Dict[str
         for category, poi_types in OSM_POI_TYPES.items():
             for poi_type in poi_types:
                 if poi_type in query.lower():
-                    osm_data = find_poi_in_edremit(category)
+                    osm_data = await asyncio.to_thread(find_poi_in_edremit, category)
                     result["osm_data"] = osm_data
                     break
     
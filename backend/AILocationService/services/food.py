@@ -1,9 +1,11 @@
 """
 Service for finding restaurants that serve specific dishes.
 """
-import requests
 from typing import Dict, Any, Optional, List
-from services.geocode import get_precise_coordinates
+from AILocationService.services.geocode import get_precise_coordinates
+from AILocationService.config import OVERPASS_URL, FOOD_SEARCH_DEADLINE
+from common.fanout import first_acceptable
+from common.http_client import http_post
 
 # Dictionary of famous Turkish dishes and the types of places that serve them
 DISH_PLACE_MAPPING = {
@@ -20,12 +22,12 @@ DISH_PLACE_MAPPING = {
     "çay": ["cafe", "tea_house"]
 }
 
-def find_restaurant_for_dish(dish: str, location: str) -> Dict[str, Any]:
+async def find_restaurant_for_dish(dish: str, location: str) -> Dict[str, Any]:
     """Find a restaurant that serves a specific dish in a given location"""
     print(f"Looking for a place to eat {dish} in {location}")
     
     # Get coordinates for the location
-    location_coords = get_precise_coordinates(location)
+    location_coords = await get_precise_coordinates(location)
     if "error" in location_coords:
         return {"error": f"Could not find location: {location}"}
     
@@ -35,25 +37,23 @@ def find_restaurant_for_dish(dish: str, location: str) -> Dict[str, Any]:
     place_types = DISH_PLACE_MAPPING.get(dish.lower(), ["restaurant"])
     print(f"Searching for place types: {place_types}")
     
-    # Try each place type until we find a match
-    for place_type in place_types:
-        result = find_place_by_type_and_name(place_type, dish, lat, lon)
-        if result and "error" not in result:
-            result["dish"] = dish
-            result["context"] = location
-            return result
-    
-    # If we didn't find a specific restaurant with the dish name, just return any restaurant of the right type
-    for place_type in place_types:
-        result = find_place_by_type(place_type, lat, lon)
-        if result and "error" not in result:
-            result["dish"] = dish
-            result["context"] = location
-            return result
+    # One Overpass search per place type, all at once; the first type in the mapping that
+    # finds a place wins (preferring places with the dish in their name)
+    _, result = await first_acceptable(
+        [lambda place_type=place_type: find_place_by_type_and_name(place_type, dish, lat, lon)
+         for place_type in place_types],
+        lambda r: bool(r) and "error" not in r,
+        deadline=FOOD_SEARCH_DEADLINE,
+        name=f"dish {dish}"
+    )
+    if result is not None:
+        result["dish"] = dish
+        result["context"] = location
+        return result
     
     return {"error": f"Could not find a place serving {dish} in {location}"}
 
-def find_place_by_type_and_name(place_type: str, name: str, lat: float, lon: float, radius: int = 3000) -> Optional[Dict[str, Any]]:
+async def find_place_by_type_and_name(place_type: str, name: str, lat: float, lon: float, radius: int = 3000) -> Optional[Dict[str, Any]]:
     """Find a place with a specific type and name in the search area"""
     # Convert OSM tag format
     if "=" not in place_type:
@@ -78,7 +78,7 @@ def find_place_by_type_and_name(place_type: str, name: str, lat: float, lon: flo
     """
     
     try:
-        response = requests.post("http://overpass-api.de/api/interpreter", data={"data": query})
+        response = await http_post(OVERPASS_URL, data={"data": query})
         data = response.json()
         
         if data.get("elements"):
@@ -96,7 +96,7 @@ def find_place_by_type_and_name(place_type: str, name: str, lat: float, lon: flo
     
     return None
 
-def find_place_by_type(place_type: str, lat: float, lon: float, radius: int = 3000) -> Optional[Dict[str, Any]]:
+async def find_place_by_type(place_type: str, lat: float, lon: float, radius: int = 3000) -> Optional[Dict[str, Any]]:
     """Find a place with a specific type in the search area"""
     # Convert OSM tag format
     if "=" not in place_type:
@@ -120,7 +120,7 @@ def find_place_by_type(place_type: str, lat: float, lon: float, radius: int = 30
     """
     
     try:
-        response = requests.post("http://overpass-api.de/api/interpreter", data={"data": query})
+        response = await http_post(OVERPASS_URL, data={"data": query})
         data = response.json()
         
         if data.get("elements"):
@@ -2,21 +2,24 @@
 Foursquare Places API integration for location searches.
 """
 import os
-import requests
+import httpx
 from typing import Dict, Any, Optional, List
 from dotenv import load_dotenv
 
+from common.http_client import http_get
+
 # Load environment variables
 load_dotenv()
 
 # Get API keys from environment variables
 FOURSQUARE_API_KEY = os.getenv("FOURSQUARE_API_KEY")
+FOURSQUARE_BASE_URL = os.getenv("FOURSQUARE_BASE_URL", "https://api.foursquare.com/v3")
 
 # Foursquare API endpoints
-PLACES_SEARCH_URL = "https://api.foursquare.com/v3/places/search"
-PLACES_NEARBY_URL = "https://api.foursquare.com/v3/places/nearby"
+PLACES_SEARCH_URL = f"{FOURSQUARE_BASE_URL}/places/search"
+PLACES_NEARBY_URL = f"{FOURSQUARE_BASE_URL}/places/nearby"
 
-def search_places(query: str, location: str = None, latitude: float = None, longitude: float = None, 
+async def search_places(query: str, location: str = None, latitude: float = None, longitude: float = None, 
                   radius: int = 1000, limit: int = 5) -> Dict[str, Any]:
     """
     Search for places using Foursquare Places API
@@ -53,8 +56,8 @@ def search_places(query: str, location: str = None, latitude: float = None, long
         params["ll"] = f"{latitude},{longitude}"
     # Otherwise if we have a location name, geocode it first
     elif location:
-        from services.geocode import get_precise_coordinates
-        coords = get_precise_coordinates(location)
+        from AILocationService.services.geocode import get_precise_coordinates
+        coords = await get_precise_coordinates(location)
         if "latitude" in coords and "longitude" in coords:
             params["ll"] = f"{coords['latitude']},{coords['longitude']}"
         else:
@@ -65,7 +68,7 @@ def search_places(query: str, location: str = None, latitude: float = None, long
     # Make API request
     try:
         print(f"Searching Foursquare for: {query} near {params.get('ll')}")
-        response = requests.get(PLACES_SEARCH_URL, headers=headers, params=params)
+        response = await http_get(PLACES_SEARCH_URL, headers=headers, params=params)
         response.raise_for_status()  # Raise exception for 4XX/5XX status codes
         data = response.json()
         
@@ -99,11 +102,11 @@ def search_places(query: str, location: str = None, latitude: float = None, long
         else:
             return {"error": f"No places found for query: {query}"}
     
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Foursquare API error: {str(e)}")
         return {"error": f"Error fetching data from Foursquare: {str(e)}"}
 
-def find_place_near_location(place_type: str, location: str, radius: int = 1000) -> Dict[str, Any]:
+async def find_place_near_location(place_type: str, location: str, radius: int = 1000) -> Dict[str, Any]:
     """
     Find places of a specific type near a location using Foursquare
     
@@ -115,9 +118,9 @@ def find_place_near_location(place_type: str, location: str, radius: int = 1000)
     Returns:
         Dictionary with search results
     """
-    return search_places(query=place_type, location=location, radius=radius)
+    return await search_places(query=place_type, location=location, radius=radius)
 
-def find_relative_place(place_type: str, reference_lat: float, reference_lon: float, 
+async def find_relative_place(place_type: str, reference_lat: float, reference_lon: float, 
                         radius: int = 1000) -> Dict[str, Any]:
     """
     Find places of a specific type near specific coordinates
@@ -131,4 +134,4 @@ def find_relative_place(place_type: str, reference_lat: float, reference_lon: fl
     Returns:
         Dictionary with search results
     """
-    return search_places(query=place_type, latitude=reference_lat, longitude=reference_lon, radius=radius)
+    return await search_places(query=place_type, latitude=reference_lat, longitude=reference_lon, radius=radius)
@@ -1,11 +1,12 @@
 """
 Foursquare Places API integration for location searches
 """
-import requests
 from typing import Dict, Any, List, Optional
 import math
 
-from AILocationService.config import FOURSQUARE_API_KEY, DEFAULT_RESULTS_LIMIT
+from AILocationService.config import FOURSQUARE_API_KEY, FOURSQUARE_BASE_URL, DEFAULT_RESULTS_LIMIT, FOOD_SEARCH_DEADLINE
+from common.fanout import first_acceptable
+from common.http_client import http_get
 
 # Increased search radius for better context coverage
 DEFAULT_SEARCH_RADIUS = 5000  # 5km search radius
@@ -13,8 +14,8 @@ EXPANDED_SEARCH_RADIUS = 10000  # 10km for landmarks and expanded searches
 from AILocationService.services.geocode import get_precise_coordinates, EDREMIT_LOCATIONS
 
 # Foursquare API endpoints
-PLACES_SEARCH_URL = "https://api.foursquare.com/v3/places/search"
-PLACES_NEARBY_URL = "https://api.foursquare.com/v3/places/nearby"
+PLACES_SEARCH_URL = f"{FOURSQUARE_BASE_URL}/places/search"
+PLACES_NEARBY_URL = f"{FOURSQUARE_BASE_URL}/places/nearby"
 
 # Food and cuisine mappings
 FOOD_CATEGORY_MAPPING = {
@@ -49,7 +50,7 @@ LANDMARK_CATEGORIES = [
     "16038",  # Temple
 ]
 
-def find_place(query: str, location: str = None, latitude: float = None, 
+async def find_place(query: str, location: str = None, latitude: float = None, 
               longitude: float = None, radius: int = DEFAULT_SEARCH_RADIUS, 
               limit: int = DEFAULT_RESULTS_LIMIT) -> Dict[str, Any]:
     """
@@ -123,7 +124,7 @@ def find_place(query: str, location: str = None, latitude: float = None,
         if location.lower() == "edremit":
             location = "Edremit, Balıkesir"
             
-        coords = get_precise_coordinates(location)
+        coords = await get_precise_coordinates(location)
         if "latitude" in coords and "longitude" in coords:
             params["ll"] = f"{coords['latitude']},{coords['longitude']}"
             # Save the location coordinates for the result
@@ -136,7 +137,7 @@ def find_place(query: str, location: str = None, latitude: float = None,
     try:
         # Make API request
         print(f"Searching Foursquare for: {query} near {params.get('ll')}")
-        response = requests.get(PLACES_SEARCH_URL, headers=headers, params=params)
+        response = await http_get(PLACES_SEARCH_URL, headers=headers, params=params)
         response.raise_for_status()
         data = response.json()
         
@@ -175,16 +176,16 @@ def find_place(query: str, location: str = None, latitude: float = None,
         # Fall back to OpenStreetMap if no results
         elif FOURSQUARE_API_KEY is None or FOURSQUARE_API_KEY == "":
             print("No Foursquare API key provided")
-            return fallback_search(query, location, latitude, longitude)
+            return await fallback_search(query, location, latitude, longitude)
         else:
             print(f"No results found in Foursquare for {query} near {location}")
-            return fallback_search(query, location, latitude, longitude)
+            return await fallback_search(query, location, latitude, longitude)
     
     except Exception as e:
         print(f"Error in Foursquare search: {str(e)}")
-        return fallback_search(query, location, latitude, longitude)
+        return await fallback_search(query, location, latitude, longitude)
 
-def find_expanded_query(query: str, location: str = None) -> Dict[str, Any]:
+async def find_expanded_query(query: str, location: str = None) -> Dict[str, Any]:
     """
     Process a complex query that might involve multiple place types or criteria
     
@@ -229,7 +230,7 @@ def find_expanded_query(query: str, location: str = None) -> Dict[str, Any]:
             place_type = "theme park"
     
     # Now use the regular find_place function with the expanded parameters
-    result = find_place(query=place_type, location=location, radius=radius, limit=10)
+    result = await find_place(query=place_type, location=location, radius=radius, limit=10)
     
     # Add metadata about the expanded query
     result["query_type"] = "expanded"
@@ -238,7 +239,7 @@ def find_expanded_query(query: str, location: str = None) -> Dict[str, Any]:
     
     return result
 
-def find_food_place(food: str = None, location: str = None) -> Dict[str, Any]:
+async def find_food_place(food: str = None, location: str = None) -> Dict[str, Any]:
     """
     Find a restaurant serving a specific food
     
@@ -261,36 +262,32 @@ def find_food_place(food: str = None, location: str = None) -> Dict[str, Any]:
     
     print(f"Looking for {food} in {location}")
     
-    # First try a direct search for the food by name
-    result = find_place(query=f"{food} restaurant", location=location, radius=3000)
+    # Geocode once for every candidate search below
+    geocode_location = "Edremit, Balıkesir" if location.lower() == "edremit" else location
+    coords = await get_precise_coordinates(geocode_location)
+    if "latitude" not in coords or "longitude" not in coords:
+        return {"error": f"Could not geocode location: {geocode_location}", "food": food}
     
-    # If successful, return the result
-    if "error" not in result:
-        result["food"] = food
-        return result
+    # Candidates in order of preference: the food by name, its category mappings, any restaurant
+    queries = [f"{food} restaurant"] + FOOD_CATEGORY_MAPPING.get(food.lower(), []) + ["restaurant"]
+    candidates = [
+        lambda query=query: find_place(
+            query=query, location=location, latitude=coords["latitude"],
+            longitude=coords["longitude"], radius=3000
+        )
+        for query in queries
+    ]
     
-    # If not found, try using category mappings
-    # Check for food category mapping
-    if food and food.lower() in FOOD_CATEGORY_MAPPING:
-        categories = FOOD_CATEGORY_MAPPING[food.lower()]
-        
-        # Try each category in order
-        for category in categories:
-            result = find_place(query=category, location=location, radius=3000)
-            if "error" not in result:
-                result["food"] = food
-                return result
-    
-    # If all else fails, just look for any restaurant
-    final_result = find_place(query="restaurant", location=location, radius=3000)
-    if "error" not in final_result:
-        final_result["food"] = food
-    return final_result
+    # All searches run at once; the most preferred one that finds a place wins
+    _, result = await first_acceptable(
+        candidates, lambda r: "error" not in r, deadline=FOOD_SEARCH_DEADLINE, name=f"food {food}"
+    )
+    if result is None:
+        return {"error": f"Could not find a place serving {food} near {location}", "food": food}
+    result["food"] = food
+    return result
 
-def find_landmark(landmark_name: str) -> Dict[str, Any]:
-    """Find a famous landmark or tourist attraction with expanded search radius"""
-    # Use expanded search radius for landmarks
-    radius = EXPANDED_SEARCH_RADIUS
+async def find_landmark(landmark_name: str) -> Dict[str, Any]:
     """
     Find a famous landmark or tourist attraction
     
@@ -298,73 +295,12 @@ def find_landmark(landmark_name: str) -> Dict[str, Any]:
         landmark_name: Name of the landmark to find
         
     Returns:
-        Dictionary with landmark information
+        Dictionary with landmark information (see services/landmarks.py for the caching)
     """
-    # Set up headers with API key
-    headers = {
-        "Accept": "application/json",
-        "Authorization": FOURSQUARE_API_KEY
-    }
-    
-    # Try to get a more precise search by adding "landmark" to the query
-    # if it's not already in the name
-    query = landmark_name
-    if "landmark" not in landmark_name.lower() and "monument" not in landmark_name.lower():
-        for suffix in ["landmark", "tourist attraction", "monument", "historic site"]:
-            # Try different queries to increase chance of finding the landmark
-            params = {
-                "query": f"{landmark_name}",
-                "categories": ",".join(LANDMARK_CATEGORIES),
-                "limit": 3,
-                "sort": "RELEVANCE"
-            }
-            
-            try:
-                response = requests.get(PLACES_SEARCH_URL, headers=headers, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                if "results" in data and data["results"]:
-                    # We found the landmark, so parse and return it
-                    landmark = data["results"][0]
-                    
-                    result = {
-                        "place": landmark.get("name", landmark_name),
-                        "latitude": landmark.get("geocodes", {}).get("main", {}).get("latitude"),
-                        "longitude": landmark.get("geocodes", {}).get("main", {}).get("longitude"),
-                        "address": landmark.get("location", {}).get("formatted_address", ""),
-                        "categories": [cat.get("name") for cat in landmark.get("categories", [])],
-                        "fsq_id": landmark.get("fsq_id"),
-                        "source": "foursquare",
-                        "is_landmark": True,
-                        "photos": [], # Placeholder for photos that could be fetched later
-                        "description": "" # Placeholder for description that could be fetched later
-                    }
-                    
-                    # Include alternatives if there are multiple results
-                    alternatives = []
-                    if len(data["results"]) > 1:
-                        for alt_landmark in data["results"][1:3]:
-                            alternatives.append({
-                                "place": alt_landmark.get("name", "Unknown place"),
-                                "latitude": alt_landmark.get("geocodes", {}).get("main", {}).get("latitude"),
-                                "longitude": alt_landmark.get("geocodes", {}).get("main", {}).get("longitude"),
-                                "categories": [cat.get("name") for cat in alt_landmark.get("categories", [])]
-                            })
-                    
-                    if alternatives:
-                        result["alternatives"] = alternatives
-                        
-                    return result
-            except Exception as e:
-                print(f"Error in landmark search for {landmark_name}: {str(e)}")
-                continue
-    
-    # If we get here, we didn't find the landmark with specialized queries
-    # Try a general place search as fallback
-    return find_place(query=landmark_name, radius=5000)
+    from AILocationService.services.landmarks import resolve_landmark
+    return await resolve_landmark(landmark_name)
 
-def fallback_search(query: str, location: str = None, latitude: float = None, 
+async def fallback_search(query: str, location: str = None, latitude: float = None, 
                   longitude: float = None) -> Dict[str, Any]:
     """
     Fallback search using OpenStreetMap when Foursquare fails
@@ -375,7 +311,7 @@ def fallback_search(query: str, location: str = None, latitude: float = None,
     
     if location:
         # Use the OpenStreetMap search
-        osm_result = find_place_near_location(place_type=query, context=location)
+        osm_result = await find_place_near_location(place_type=query, context=location)
         if osm_result and "latitude" in osm_result:
             # Format to match our response structure
             return {
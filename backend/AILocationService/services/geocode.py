@@ -1,11 +1,40 @@
+import asyncio
+
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 from geopy.extra.rate_limiter import RateLimiter
-import requests
 import json
+import os
+
+from AILocationService.config import (
+    NOMINATIM_DOMAIN, NOMINATIM_SCHEME, NOMINATIM_MIN_DELAY, PHOTON_URL,
+    GEOCODE_CACHE_PATH, GEOCODE_CACHE_TTL, GEOCODE_NEGATIVE_TTL, GEOCODE_CACHE_SIZE, GEOCODE_CACHE_WARM_FILE
+)
+from common.http_client import http_get
+from common.normalize import turkish_lower
+from common.ttl_cache import TTLCache
+
+geolocator = Nominatim(user_agent="text-to-location", timeout=10, domain=NOMINATIM_DOMAIN, scheme=NOMINATIM_SCHEME)
+geocode = RateLimiter(geolocator.geocode, min_delay_seconds=NOMINATIM_MIN_DELAY)
+
+# Nominatim/Photon answers keyed on the cleaned, lowercased place name. Each lookup can
+# wait a second for the Nominatim rate limit, so found places are kept for a month and
+# places neither geocoder knows for a few hours; errors and timeouts are not cached.
+geocode_cache = TTLCache(
+    "geocode",
+    maxsize=GEOCODE_CACHE_SIZE,
+    ttl=GEOCODE_CACHE_TTL,
+    path=GEOCODE_CACHE_PATH,
+    version="1"
+)
+
+if GEOCODE_CACHE_WARM_FILE and os.path.exists(GEOCODE_CACHE_WARM_FILE):
+    # Warm the cache from an export of another deployment (GET /api/geocode/cache/export)
+    with open(GEOCODE_CACHE_WARM_FILE, encoding="utf-8") as f:
+        geocode_cache.import_entries(json.load(f))
 
-geolocator = Nominatim(user_agent="text-to-location", timeout=10)
-geocode = RateLimiter(geolocator.geocode, min_delay_seconds=1)
+def geocode_cache_key(cleaned_place: str) -> str:
+    return " ".join(turkish_lower(cleaned_place).split())
 
 # Hard-coded coordinates for common Turkish cities for backup
 TURKISH_CITIES = {
@@ -88,7 +117,7 @@ EDREMIT_LOCATIONS = {
     "konaklama": {"latitude": 39.5942, "longitude": 27.0246, "description": "Accommodation options in Edremit", "type": "hotel"},
 }
 
-def get_precise_coordinates(place: str):
+async def get_precise_coordinates(place: str):
     print(f"Searching for coordinates of: {place}")
     
     # Clean up the place name for better geocoding
@@ -159,30 +188,42 @@ def get_precise_coordinates(place: str):
                 "longitude": coords["longitude"]
             }
     
+    # Nominatim and Photon answers are cached
+    cache_key = geocode_cache_key(cleaned_place)
+    cached = geocode_cache.get(cache_key)
+    if cached is not None:
+        print(f"Geocode cache hit for {cache_key}")
+        return dict(cached) if "error" in cached else {**cached, "place": place}
+    
     # Try with Nominatim
     try:
+        # geopy is synchronous (and sleeps for the Nominatim rate limit), so it runs in a worker thread
         # First try with country context
-        location = geocode(f"{cleaned_place}, Turkey")
+        location = await asyncio.to_thread(geocode, f"{cleaned_place}, Turkey")
         if not location:
             # Try without country context
-            location = geocode(cleaned_place)
+            location = await asyncio.to_thread(geocode, cleaned_place)
         
         if location:
             print(f"Found coordinates: {location.latitude}, {location.longitude}")
-            return {
+            result = {
                 "place": place,
                 "latitude": location.latitude,
                 "longitude": location.longitude
             }
+            geocode_cache.set(cache_key, result)
+            return result
         else:
-            # Fallback to Photon geocoder if Nominatim fails
-            return photon_geocode(cleaned_place)
+            # Fallback to Photon geocoder if Nominatim fails; both answered, so a miss is cacheable
+            result, answered = await _photon_lookup(cleaned_place)
     except GeocoderTimedOut:
         print("Geocoder timeout. Falling back to Photon")
-        return photon_geocode(cleaned_place)
+        result, answered = await _photon_lookup(cleaned_place)
+        answered = answered and "error" not in result
     except GeocoderServiceError:
         print("Geocoder service error. Falling back to Photon")
-        return photon_geocode(cleaned_place)
+        result, answered = await _photon_lookup(cleaned_place)
+        answered = answered and "error" not in result
     except Exception as e:
         print(f"Unexpected error in geocoding: {str(e)}")
         # Check if we have a fallback for locations in the name
@@ -216,6 +257,10 @@ def get_precise_coordinates(place: str):
             "description": edremit["description"],
             "note": "Default location used as specific location not found"
         }
+    
+    if answered:
+        geocode_cache.set(cache_key, result, ttl=GEOCODE_NEGATIVE_TTL if "error" in result else None)
+    return result
 
 def clean_place_name(place: str) -> str:
     """Clean up place name for better geocoding"""
@@ -231,11 +276,16 @@ def clean_place_name(place: str) -> str:
     # Strip extra whitespace
     return place.strip()
 
-def photon_geocode(place: str):
+async def photon_geocode(place: str):
     """Alternative geocoding using Photon API"""
+    result, _ = await _photon_lookup(place)
+    return result
+
+async def _photon_lookup(place: str):
+    """Photon result and whether Photon actually answered (a miss is only final if it did)"""
     try:
-        url = f"https://photon.komoot.io/api/?q={place}&limit=1"
-        response = requests.get(url)
+        response = await http_get(PHOTON_URL, params={"q": place, "limit": 1})
+        response.raise_for_status()
         data = response.json()
         
         if data and "features" in data and len(data["features"]) > 0:
@@ -247,9 +297,11 @@ def photon_geocode(place: str):
                 "place": place,
                 "latitude": coords[1],  # Photon returns [lon, lat] not [lat, lon]
                 "longitude": coords[0]
-            }
+            }, True
+        answered = True
     except Exception as e:
         print(f"Photon geocoding error: {str(e)}")
+        answered = False
     
     # If we get here, both geocoders failed
-    return {"error": "Location not found with any geocoder."}
+    return {"error": "Location not found with any geocoder."}, answered
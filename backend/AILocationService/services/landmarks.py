@@ -0,0 +1,206 @@
+"""
+Landmark resolution with memoized positive and negative results.
+
+Each landmark name (normalized, so "Kaz Dağları" and "kaz daglari" are the
+same) is resolved against Foursquare at most once per TTL, with two distinct
+queries run concurrently:
+
+1. the name restricted to the landmark categories
+2. the name as a general place search within 10 km of Edremit
+
+The first one wins when both find something. Found landmarks are cached for
+LANDMARK_CACHE_TTL. Names that neither query finds are cached as misses for
+LANDMARK_NEGATIVE_TTL. Provider failures are never cached. Names in
+EDREMIT_LOCATIONS (landmarks and settlements alike) and TURKISH_CITIES are
+answered from those tables without a request, as find_place answers them.
+"""
+import copy
+from typing import Any, Dict, List
+
+import httpx
+
+from AILocationService.config import (
+    FOURSQUARE_API_KEY,
+    LANDMARK_CACHE_PATH,
+    LANDMARK_CACHE_SIZE,
+    LANDMARK_CACHE_TTL,
+    LANDMARK_NEGATIVE_TTL,
+)
+from AILocationService.services.foursquare_service import (
+    EXPANDED_SEARCH_RADIUS,
+    LANDMARK_CATEGORIES,
+    PLACES_SEARCH_URL,
+)
+from AILocationService.services.geocode import EDREMIT_LOCATIONS, TURKISH_CITIES
+from common.fanout import first_acceptable
+from common.http_client import http_get
+from common.normalize import NORMALIZE_VERSION, normalize_prompt
+from common.single_flight import SingleFlight
+from common.ttl_cache import TTLCache
+
+# Bump when the queries change so cached results from the old ones are dropped
+LANDMARK_RESOLVER_VERSION = "1"
+
+landmark_cache = TTLCache(
+    "landmarks",
+    maxsize=LANDMARK_CACHE_SIZE,
+    ttl=LANDMARK_CACHE_TTL,
+    path=LANDMARK_CACHE_PATH,
+    version=f"{LANDMARK_RESOLVER_VERSION}:{NORMALIZE_VERSION}"
+)
+
+# Concurrent lookups of the same uncached name share one resolution
+landmark_flight = SingleFlight("landmark")
+
+EDREMIT_CENTER = EDREMIT_LOCATIONS["edremit"]
+
+def _seed_landmarks() -> Dict[str, Dict[str, Any]]:
+    """Known names with their table answers; nothing here ever reaches Foursquare or the miss cache"""
+    seeds = {}
+    for city, coords in TURKISH_CITIES.items():
+        # Same shape as find_place's direct city mapping
+        seeds[normalize_prompt(city)] = {
+            "place": city.title(),
+            "latitude": coords["latitude"],
+            "longitude": coords["longitude"],
+            "address": f"{city.title()}, Turkey",
+            "categories": ["City"],
+            "source": "direct-mapping",
+            "place_type": "city"
+        }
+    for name, data in EDREMIT_LOCATIONS.items():
+        if data.get("type") != "landmark":
+            # Settlements, beaches, ...: same shape as find_place's Edremit mapping
+            seeds[normalize_prompt(name)] = {
+                "place": name.title(),
+                "latitude": data["latitude"],
+                "longitude": data["longitude"],
+                "address": f"{name.title()}, Edremit, Balıkesir, Turkey",
+                "categories": ["Location"],
+                "description": data.get("description", ""),
+                "source": "edremit-mapping",
+                "place_type": "edremit-location"
+            }
+            continue
+        seeds[normalize_prompt(name)] = {
+            "place": name.title(),
+            "latitude": data["latitude"],
+            "longitude": data["longitude"],
+            "address": f"{name.title()}, Edremit, Balıkesir, Turkey",
+            "categories": ["Landmark"],
+            "source": "edremit-mapping",
+            "is_landmark": True,
+            "photos": [],
+            "description": data.get("description", "")
+        }
+    return seeds
+
+SEEDED_LANDMARKS = _seed_landmarks()
+
+def _landmark_result(results: List[Dict[str, Any]], landmark_name: str) -> Dict[str, Any]:
+    landmark = results[0]
+    result = {
+        "place": landmark.get("name", landmark_name),
+        "latitude": landmark.get("geocodes", {}).get("main", {}).get("latitude"),
+        "longitude": landmark.get("geocodes", {}).get("main", {}).get("longitude"),
+        "address": landmark.get("location", {}).get("formatted_address", ""),
+        "categories": [cat.get("name") for cat in landmark.get("categories", [])],
+        "fsq_id": landmark.get("fsq_id"),
+        "source": "foursquare",
+        "is_landmark": True,
+        "photos": [], # Placeholder for photos that could be fetched later
+        "description": "" # Placeholder for description that could be fetched later
+    }
+    alternatives = [{
+        "place": alt.get("name", "Unknown place"),
+        "latitude": alt.get("geocodes", {}).get("main", {}).get("latitude"),
+        "longitude": alt.get("geocodes", {}).get("main", {}).get("longitude"),
+        "categories": [cat.get("name") for cat in alt.get("categories", [])]
+    } for alt in results[1:3]]
+    if alternatives:
+        result["alternatives"] = alternatives
+    return result
+
+async def _search(landmark_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """One Foursquare query; "transient" marks failures that say nothing about the name"""
+    headers = {
+        "Accept": "application/json",
+        "Authorization": FOURSQUARE_API_KEY
+    }
+    try:
+        response = await http_get(PLACES_SEARCH_URL, headers=headers, params=params)
+    except httpx.HTTPError as e:
+        return {"error": f"Foursquare request failed: {str(e)}", "transient": True}
+    if response.status_code != 200:
+        return {"error": f"Foursquare returned HTTP {response.status_code}", "transient": True}
+    results = response.json().get("results") or []
+    if not results:
+        return {"error": f"No results for {landmark_name}"}
+    return _landmark_result(results, landmark_name)
+
+async def _resolve(landmark_name: str, key: str) -> Dict[str, Any]:
+    if not FOURSQUARE_API_KEY:
+        return {"error": "Foursquare API key not configured"}
+
+    queries = [
+        # The name within the landmark categories, anywhere
+        {"query": landmark_name, "categories": ",".join(LANDMARK_CATEGORIES), "limit": 3, "sort": "RELEVANCE"},
+        # Any place with that name around Edremit
+        {
+            "query": landmark_name,
+            "ll": f"{EDREMIT_CENTER['latitude']},{EDREMIT_CENTER['longitude']}",
+            "radius": EXPANDED_SEARCH_RADIUS,
+            "limit": 3,
+            "sort": "RELEVANCE"
+        },
+    ]
+    outcomes = []
+
+    async def search(params):
+        outcome = await _search(landmark_name, params)
+        outcomes.append(outcome)
+        return outcome
+
+    _, result = await first_acceptable(
+        [lambda params=params: search(params) for params in queries],
+        lambda r: "error" not in r,
+        name=f"landmark {landmark_name}"
+    )
+    if result is not None:
+        landmark_cache.set(key, result)
+        return result
+
+    if len(outcomes) == len(queries) and not any(o.get("transient") for o in outcomes):
+        # Both queries answered and found nothing: remember the miss for a while
+        miss = {"error": f"Landmark not found: {landmark_name}"}
+        landmark_cache.set(key, miss, ttl=LANDMARK_NEGATIVE_TTL)
+        return miss
+    return {"error": f"Could not resolve landmark {landmark_name}, try again later"}
+
+async def resolve_landmark(landmark_name: str) -> Dict[str, Any]:
+    """
+    Resolve a landmark name to a place.
+
+    Args:
+        landmark_name: Landmark as the user wrote it (e.g. "Şahindere Kanyonu")
+
+    Returns:
+        Place dictionary like find_place, or {"error": ...} when not found
+    """
+    key = normalize_prompt(landmark_name or "")
+    if not key:
+        return {"error": "No landmark specified"}
+    if key in SEEDED_LANDMARKS:
+        return copy.deepcopy(SEEDED_LANDMARKS[key])
+    cached = landmark_cache.get(key)
+    if cached is not None:
+        # Callers add fields to the result; keep the cached entry untouched
+        return copy.deepcopy(cached)
+    return await landmark_flight.do(key, lambda: _resolve(landmark_name, key))
+
+def landmark_stats() -> Dict[str, Any]:
+    return {
+        "seeded": len(SEEDED_LANDMARKS),
+        "cache": landmark_cache.stats(),
+        "single_flight": landmark_flight.stats()
+    }
@@ -6,6 +6,8 @@ import overpy
 import json
 from typing import Dict, Any, List, Optional
 
+from AILocationService.config import OVERPASS_URL
+
 # Default coordinates for Edremit, Balıkesir
 EDREMIT_LAT = 39.5942
 EDREMIT_LON = 27.0242
@@ -13,7 +15,7 @@ EDREMIT_BBOX = (27.0000, 39.5800, 27.0500, 39.6100)  # (min_lon, min_lat, max_lo
 
 class OverpassService:
     def __init__(self):
-        self.api = overpy.Overpass()
+        self.api = overpy.Overpass(url=OVERPASS_URL)
         
     def query_amenities(self, amenity_type: str, lat: float = EDREMIT_LAT, lon: float = EDREMIT_LON, radius: int = 1000) -> Dict[str, Any]:
         """
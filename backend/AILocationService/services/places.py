@@ -1,10 +1,11 @@
-import requests
 import math
 from typing import Dict, Any, Optional, List, Tuple
 from AILocationService.services.geocode import get_precise_coordinates
+from AILocationService.config import OVERPASS_URL
+from common.http_client import http_post
 
-def find_place_near_location(place_type: str, context: str, radius=2000, previous_result=None):
-    coords = get_precise_coordinates(context)
+async def find_place_near_location(place_type: str, context: str, radius=2000, previous_result=None):
+    coords = await get_precise_coordinates(context)
     if "latitude" not in coords:
         return None  # Context çözümleme başarısız
 
@@ -66,7 +67,7 @@ def find_place_near_location(place_type: str, context: str, radius=2000, previou
     out center 1;
     """
 
-    response = requests.post("http://overpass-api.de/api/interpreter", data={"data": query})
+    response = await http_post(OVERPASS_URL, data={"data": query})
     data = response.json()
 
     if data.get("elements"):
@@ -93,7 +94,7 @@ def find_place_near_location(place_type: str, context: str, radius=2000, previou
     else:
         return {"error": "No nearby place found"}
 
-def find_relative_location(place_type: str, modifier: str, reference_location: Dict[str, Any], city_context: Optional[str] = None):
+async def find_relative_location(place_type: str, modifier: str, reference_location: Dict[str, Any], city_context: Optional[str] = None):
     """Find a location relative to a previous search result
     
     Args:
@@ -117,7 +118,7 @@ def find_relative_location(place_type: str, modifier: str, reference_location: D
     if not city:
         return {"error": "No city context available"}
     
-    city_coords = get_precise_coordinates(city)
+    city_coords = await get_precise_coordinates(city)
     if "latitude" not in city_coords:
         return {"error": f"Could not find coordinates for {city}"}
     
@@ -175,7 +176,7 @@ def find_relative_location(place_type: str, modifier: str, reference_location: D
     out center 1;
     """
     
-    response = requests.post("http://overpass-api.de/api/interpreter", data={"data": query})
+    response = await http_post(OVERPASS_URL, data={"data": query})
     data = response.json()
     
     if data.get("elements"):
@@ -1,7 +1,8 @@
-import requests
+from AILocationService.config import IP_API_URL
+from common.http_client import http_get
 
-def get_user_current_location(user_ip: str):
-    response = requests.get(f"http://ip-api.com/json/{user_ip}")
+async def get_user_current_location(user_ip: str):
+    response = await http_get(f"{IP_API_URL}/{user_ip}")
     data = response.json()
     return {
         "latitude": data.get("lat"),
@@ -0,0 +1,113 @@
+"""
+End-to-end throughput and latency benchmark against the offline stand-in.
+
+Starts benchmarks.standin on a free port and points every provider at it. The
+app runs in-process (httpx.ASGITransport), and a mixed workload of building
+filter and location prompts is sent at a fixed concurrency. Reports
+throughput, p50/p99 per endpoint and the stand-in's request counters.
+Latencies and failures come from the fixtures, so runs with the same --seed
+are comparable on any machine.
+
+    cd backend
+    python -m benchmarks.e2e_load --requests 200 --concurrency 16 --seed 1
+    python -m benchmarks.e2e_load --latency-scale 0.1 --failure-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.standin import start_standin, standin_env
+
+WORKLOAD = [
+    ("POST", "/ai-filter/filter/", {"json": {"prompt": "şehir merkezindeki eski ticari binaları göster"}}),
+    ("POST", "/ai-filter/filter/", {"json": {"prompt": "deprem açısından risk taşıyan yapılar hangileri"}}),
+    ("POST", "/ai-filter/filter/", {"json": {"prompt": "ailelerin oturduğu binaları görmek istiyorum"}}),
+    ("POST", "/api/location/", {"params": {"prompt": "akçay'da kebap yiyebileceğim bir yer"}}),
+    ("POST", "/api/location/", {"params": {"prompt": "zeytinli'deki okul nerede"}}),
+    ("POST", "/api/location/", {"params": {"prompt": "şu an neredeyim"}}),
+    ("POST", "/api/location/", {"params": {"prompt": "edremit belediyesi nerede"}}),
+    ("GET", "/api/osm/amenities/", {"params": {"amenity_type": "school"}}),
+]
+
+def _percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+async def run(requests: int, concurrency: int, unique: bool):
+    import main  # imported after the environment points at the stand-in
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    transport = httpx.ASGITransport(app=main.app, client=("127.0.0.1", 50000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=120) as client:
+        async def worker():
+            while not queue.empty():
+                i = queue.get_nowait()
+                method, path, kwargs = WORKLOAD[i % len(WORKLOAD)]
+                if unique:
+                    # A unique suffix keeps the filter cache from answering repeated prompts
+                    kwargs = json.loads(json.dumps(kwargs))
+                    target = kwargs.get("json") or kwargs.get("params")
+                    if target.get("prompt"):
+                        target["prompt"] += f" (istek {i})"
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **kwargs)
+                    if response.status_code >= 400:
+                        errors[path] += 1
+                except Exception:
+                    errors[path] += 1
+                latencies[path].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+    return latencies, errors, wall
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end benchmark against the offline stand-in")
+    parser.add_argument("--requests", type=int, default=120)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiply every fixture latency")
+    parser.add_argument("--failure-rate", type=float, default=None, help="override every fixture failure rate")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-unique", dest="unique", action="store_false", help="repeat prompts verbatim (cache hits)")
+    args = parser.parse_args(argv)
+
+    standin = start_standin(latency_scale=args.latency_scale, failure_rate=args.failure_rate, seed=args.seed)
+    host, port = standin.server_address[:2]
+    os.environ.update(standin_env(host, port))
+    os.environ.setdefault("OPENAI_API_KEY", "standin")
+    os.environ.setdefault("FOURSQUARE_API_KEY", "standin")
+    cache_dir = tempfile.mkdtemp()
+    os.environ.setdefault("FILTER_CACHE_PATH", os.path.join(cache_dir, "filter_cache.sqlite3"))
+    os.environ.setdefault("GEOCODE_CACHE_PATH", os.path.join(cache_dir, "geocode.sqlite3"))
+    os.environ.setdefault("LANDMARK_CACHE_PATH", os.path.join(cache_dir, "landmarks.sqlite3"))
+
+    latencies, errors, wall = asyncio.run(run(args.requests, args.concurrency, args.unique))
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{total} requests in {wall:.2f}s ({total / wall:.1f} req/s, concurrency {args.concurrency})")
+    for path, values in sorted(latencies.items()):
+        ms = [v * 1000 for v in values]
+        print(f"  {path:<22} n={len(ms):<4} errors={errors[path]:<3} "
+              f"p50={_percentile(ms, 50):7.0f}ms  p99={_percentile(ms, 99):7.0f}ms")
+    with urllib.request.urlopen(f"http://{host}:{port}/_stats") as response:
+        print("Stand-in:", json.dumps(json.load(response)))
+    standin.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
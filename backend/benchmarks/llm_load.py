@@ -0,0 +1,135 @@
+"""
+Load test: other endpoints must stay responsive while LLM calls are in flight.
+
+The app runs in-process (httpx.ASGITransport) and the shared OpenAI client is
+replaced by one whose transport answers after a fixed latency. N filter
+prompts that the rule parser cannot answer are sent concurrently while GET /
+is probed in a loop; the probe latencies are reported and the run fails when
+their p95 exceeds the limit.
+
+    cd backend
+    python -m benchmarks.llm_load --requests 32 --latency 1.0
+    python -m benchmarks.llm_load --blocking   # simulates the old synchronous client
+
+No network access or OPENAI_API_KEY is needed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+
+# Keep the test away from the real filter cache
+os.environ.setdefault("FILTER_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "filter_cache.sqlite3"))
+
+from openai import AsyncOpenAI  # noqa: E402
+
+from common.openai_client import set_openai_client  # noqa: E402
+
+def _fake_completion() -> dict:
+    arguments = {"zeminustu": 3, "tip": "1", "processed_query": "En az 3 katlı konut binalar"}
+    return {
+        "id": "chatcmpl-load",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "load-test",
+        "choices": [{
+            "index": 0,
+            "finish_reason": "tool_calls",
+            "message": {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": "call_load",
+                    "type": "function",
+                    "function": {"name": "extract_building_filter_parameters", "arguments": json.dumps(arguments)},
+                }],
+            },
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+def _mock_client(latency: float, blocking: bool) -> AsyncOpenAI:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if blocking:
+            time.sleep(latency)  # what a synchronous client does to the event loop
+        else:
+            await asyncio.sleep(latency)
+        return httpx.Response(200, json=_fake_completion())
+
+    return AsyncOpenAI(
+        api_key="load-test",
+        base_url="http://llm.invalid/v1",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        max_retries=0,
+    )
+
+def _percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+async def run(requests: int, latency: float, probe_interval: float, blocking: bool):
+    import main  # imported late so FILTER_CACHE_PATH above is honoured
+
+    set_openai_client(_mock_client(latency, blocking))
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+        done = asyncio.Event()
+        probes = []
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                response = await client.get("/")
+                response.raise_for_status()
+                probes.append(time.perf_counter() - started)
+                await asyncio.sleep(probe_interval)
+
+        async def llm_request(i: int):
+            # Unique, free-form prompts so neither the rule parser nor the cache answers them
+            prompt = f"yük testi {i}: eski mahalledeki yüksekçe konutları göster"
+            started = time.perf_counter()
+            response = await client.post("/ai-filter/filter/", json={"prompt": prompt})
+            response.raise_for_status()
+            return time.perf_counter() - started
+
+        prober = asyncio.create_task(probe())
+        await asyncio.sleep(probe_interval)
+        started = time.perf_counter()
+        durations = await asyncio.gather(*(llm_request(i) for i in range(requests)))
+        wall = time.perf_counter() - started
+        done.set()
+        await prober
+
+    return durations, wall, probes
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="LLM load test for the AI endpoints")
+    parser.add_argument("--requests", type=int, default=32, help="concurrent filter requests")
+    parser.add_argument("--latency", type=float, default=1.0, help="simulated LLM latency in seconds")
+    parser.add_argument("--probe-interval", type=float, default=0.02, help="seconds between GET / probes")
+    parser.add_argument("--max-p95-ms", type=float, default=100.0, help="fail when the probe p95 exceeds this")
+    parser.add_argument("--blocking", action="store_true", help="block the event loop like a synchronous client")
+    args = parser.parse_args(argv)
+
+    durations, wall, probes = asyncio.run(run(args.requests, args.latency, args.probe_interval, args.blocking))
+    probe_ms = [p * 1000 for p in probes]
+    p95 = _percentile(probe_ms, 95)
+
+    print(f"LLM requests: {len(durations)} in {wall:.2f}s "
+          f"(median {statistics.median(durations):.2f}s, max {max(durations):.2f}s)")
+    print(f"GET / probes: {len(probe_ms)} "
+          f"(p50 {_percentile(probe_ms, 50):.1f}ms, p95 {p95:.1f}ms, max {max(probe_ms):.1f}ms)")
+    if p95 > args.max_p95_ms:
+        print(f"FAIL: probe p95 {p95:.1f}ms > {args.max_p95_ms:.0f}ms")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,167 @@
+"""
+Offline evaluation of the registered prompt versions.
+
+Replays a labelled set (benchmarks/prompt_eval_set.jsonl) against every
+version of every prompt and reports accuracy on the labelled fields, latency
+p50/p95 and the prompt tokens the API billed (with the share served from the
+prompt cache). Requests go through common.openai_client, so they hit the real
+API, or the stand-in when OPENAI_BASE_URL points at it.
+
+    cd backend
+    python -m benchmarks.prompt_eval --dry-run            # token sizes only, no API calls
+    python -m benchmarks.prompt_eval --repeat 3
+    python -m benchmarks.prompt_eval --prompt building_filter --versions v1,v2
+
+Each labelled case is {"prompt": <prompt name>, "query": ..., "expected": {field: value}};
+a case passes when every expected field matches the model's answer.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from AIBuildingFilter import prompts as _building_prompts  # noqa: F401  registers the prompt versions
+from AILocationService import prompts as _location_prompts  # noqa: F401
+from common.prompts import PromptVersion, prompt_names, prompt_versions, get_prompt
+
+EVAL_SET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompt_eval_set.jsonl")
+EVAL_MODEL = "gpt-4o-mini"
+
+def load_cases(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+def _same(expected: Any, actual: Any) -> bool:
+    if expected is False or expected is None:
+        return not actual  # the services treat an omitted flag as false
+    if isinstance(expected, str) and actual is not None:
+        return expected.strip().lower() == str(actual).strip().lower()
+    return expected == actual
+
+def _answer(response) -> Dict[str, Any]:
+    """Arguments of the tool call, or the JSON content when the prompt has no tools"""
+    message = response.choices[0].message
+    raw = message.tool_calls[0].function.arguments if message.tool_calls else message.content
+    try:
+        return json.loads(raw or "{}")
+    except ValueError:
+        return {}
+
+async def run_case(prompt: PromptVersion, query: str) -> Dict[str, Any]:
+    from common.openai_client import chat_completion
+
+    kwargs = {}
+    if prompt.tools:
+        # Same tool_choice as the services: the location service forces its function
+        kwargs["tools"] = prompt.tools
+        kwargs["tool_choice"] = "auto" if prompt.name == "building_filter" else {
+            "type": "function", "function": {"name": prompt.tools[0]["function"]["name"]}
+        }
+    started = time.perf_counter()
+    response = await chat_completion(
+        caller="prompt_eval",
+        model=EVAL_MODEL,
+        messages=[
+            {"role": "system", "content": prompt.system},
+            {"role": "user", "content": query}
+        ],
+        temperature=0,
+        **kwargs
+    )
+    latency = time.perf_counter() - started
+    usage = response.usage
+    details = getattr(usage, "prompt_tokens_details", None) if usage else None
+    return {
+        "answer": _answer(response),
+        "latency": latency,
+        "prompt_tokens": usage.prompt_tokens if usage else 0,
+        "cached_tokens": (getattr(details, "cached_tokens", 0) or 0) if details else 0,
+    }
+
+async def evaluate(prompt: PromptVersion, cases: List[Dict[str, Any]], repeat: int, concurrency: int) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = []
+
+    async def one(case):
+        async with semaphore:
+            try:
+                result = await run_case(prompt, case["query"])
+            except Exception as e:
+                failures.append((case["query"], f"error: {e}"))
+                return None
+        wrong = {k: result["answer"].get(k) for k, v in case["expected"].items() if not _same(v, result["answer"].get(k))}
+        if wrong:
+            failures.append((case["query"], f"got {json.dumps(wrong, ensure_ascii=False)}"))
+        result["passed"] = not wrong
+        return result
+
+    results = await asyncio.gather(*(one(case) for case in cases for _ in range(repeat)))
+    done = [r for r in results if r is not None]
+    latencies = [r["latency"] * 1000 for r in done] or [0.0]
+    prompt_tokens = sum(r["prompt_tokens"] for r in done)
+    return {
+        "name": prompt.name,
+        "version": prompt.version,
+        "tokens": prompt.tokens,
+        "runs": len(results),
+        "passed": sum(r["passed"] for r in done),
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "prompt_tokens": prompt_tokens / max(len(done), 1),
+        "cached_share": sum(r["cached_tokens"] for r in done) / prompt_tokens if prompt_tokens else 0.0,
+        "failures": failures,
+    }
+
+def _selected(names: Optional[List[str]], versions: Optional[List[str]]) -> List[PromptVersion]:
+    selected = []
+    for name in names or prompt_names():
+        get_prompt(name)  # unknown names fail here
+        selected.extend(p for p in prompt_versions(name) if not versions or p.version in versions)
+    return selected
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare prompt versions on the labelled set")
+    parser.add_argument("--cases", default=EVAL_SET, help="labelled set (JSON lines)")
+    parser.add_argument("--prompt", action="append", help="prompt name (repeatable, default: all)")
+    parser.add_argument("--versions", help="comma separated versions, default: all")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case, for steadier latencies")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--dry-run", action="store_true", help="only report prompt sizes, no API calls")
+    parser.add_argument("--verbose", action="store_true", help="list every failed case")
+    args = parser.parse_args(argv)
+
+    cases = load_cases(args.cases)
+    versions = args.versions.split(",") if args.versions else None
+    by_name = defaultdict(list)
+    for case in cases:
+        by_name[case["prompt"]].append(case)
+
+    for prompt in _selected(args.prompt, versions):
+        active = " (active)" if get_prompt(prompt.name) is prompt else ""
+        label = f"{prompt.name}/{prompt.version}{active}"
+        if args.dry_run:
+            print(f"{label:<32} {prompt.tokens:>5} tokens  budget {prompt.budget_tokens:<5} "
+                  f"cases {len(by_name[prompt.name])}  fingerprint {prompt.fingerprint}")
+            continue
+        if not by_name[prompt.name]:
+            print(f"{label:<32} no labelled cases")
+            continue
+        row = asyncio.run(evaluate(prompt, by_name[prompt.name], args.repeat, args.concurrency))
+        print(f"{label:<32} {row['tokens']:>5} tokens  accuracy {row['passed']}/{row['runs']}  "
+              f"p50={row['p50']:6.0f}ms  p95={row['p95']:6.0f}ms  "
+              f"billed prompt tokens {row['prompt_tokens']:.0f} ({row['cached_share']:.0%} cached)")
+        if args.verbose:
+            for query, reason in row["failures"]:
+                print(f"    {query}: {reason}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""
+Offline stand-in for the external providers (OpenAI, Foursquare, Overpass,
+Nominatim, Photon, ip-api.com).
+
+One stdlib HTTP server answers for every provider under its own path prefix
+(/openai, /foursquare, ...). Responses are replayed from
+benchmarks/fixtures/<provider>.json after a latency drawn from a log-normal
+distribution (median and p99 per provider), and a configurable share of
+requests fails with the provider's failure status.
+
+    cd backend
+    python -m benchmarks.standin --port 8099
+    # prints the environment variables that point the services at it
+
+    python -m benchmarks.standin --port 8099 --record
+    # forwards to the real providers and saves their responses as fixtures
+
+Fixture file format:
+
+    {
+      "latency_ms": {"median": 300, "p99": 1500},
+      "failure_rate": 0.01,
+      "failure_status": 503,
+      "responses": [
+        {"method": "GET", "path": "/v3/places/search", "contains": ["kebap"], "status": 200, "body": {...}},
+        {"path": "/v3/places/*", "body": {...}}
+      ]
+    }
+
+The first matching response wins. "path" matches exactly, or as a prefix when it
+ends with "*". "contains" strings must all appear in the query string or the
+request body; "prompt_contains" strings must all appear in the last chat
+message (the system prompts mention every filter word, so OpenAI fixtures
+match on the user's prompt instead). Recorded responses carry a "key" (a hash
+of method, path, query and body) and only match that exact request.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit, unquote_plus
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# provider -> real upstream (for --record) and the settings that point the services at the stand-in
+PROVIDERS = {
+    "openai": ("https://api.openai.com", {"OPENAI_BASE_URL": "{base}/openai/v1"}),
+    "foursquare": ("https://api.foursquare.com", {"FOURSQUARE_BASE_URL": "{base}/foursquare/v3"}),
+    "overpass": ("http://overpass-api.de", {"OVERPASS_URL": "{base}/overpass/api/interpreter"}),
+    "nominatim": (
+        "https://nominatim.openstreetmap.org",
+        {"NOMINATIM_DOMAIN": "{host}/nominatim", "NOMINATIM_SCHEME": "http", "NOMINATIM_MIN_DELAY": "0"},
+    ),
+    "photon": ("https://photon.komoot.io", {"PHOTON_URL": "{base}/photon/api/"}),
+    "ipapi": ("http://ip-api.com", {"IP_API_URL": "{base}/ipapi/json"}),
+}
+
+# 99th percentile of the standard normal distribution
+Z_99 = 2.326
+
+def standin_env(host: str, port: int) -> Dict[str, str]:
+    """Environment variables that route every provider to the stand-in at host:port"""
+    base = f"http://{host}:{port}"
+    env = {}
+    for _, settings in PROVIDERS.values():
+        for key, value in settings.items():
+            env[key] = value.format(base=base, host=f"{host}:{port}")
+    return env
+
+class Provider:
+    """Fixtures, latency model and counters of one provider"""
+
+    def __init__(self, name: str, fixture_dir: str, latency_scale: float, failure_rate: Optional[float]):
+        self.name = name
+        self.path = os.path.join(fixture_dir, f"{name}.json")
+        self.fixture = {"responses": []}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.fixture = json.load(f)
+        latency = self.fixture.get("latency_ms", {})
+        median = max(float(latency.get("median", 0)) * latency_scale, 0.0)
+        p99 = max(float(latency.get("p99", median)) * latency_scale, median)
+        self.mu = math.log(median) if median > 0 else None
+        self.sigma = (math.log(p99) - math.log(median)) / Z_99 if median > 0 else 0.0
+        self.failure_rate = self.fixture.get("failure_rate", 0.0) if failure_rate is None else failure_rate
+        self.failure_status = self.fixture.get("failure_status", 503)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "failures": 0, "unmatched": 0}
+
+    def latency(self, rng: random.Random) -> float:
+        if self.mu is None:
+            return 0.0
+        return rng.lognormvariate(self.mu, self.sigma) / 1000
+
+    def match(self, method: str, path: str, key: str, haystack: str, prompt: str) -> Optional[Dict[str, Any]]:
+        for response in self.fixture.get("responses", []):
+            if "key" in response:
+                if response["key"] == key:
+                    return response
+                continue
+            if response.get("method", method) != method:
+                continue
+            pattern = response.get("path")
+            if pattern:
+                if pattern.endswith("*"):
+                    if not path.startswith(pattern[:-1]):
+                        continue
+                elif path != pattern:
+                    continue
+            if _contains_all(haystack, response.get("contains", [])) and \
+                    _contains_all(prompt, response.get("prompt_contains", [])):
+                return response
+        return None
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        with self.lock:
+            self.fixture.setdefault("responses", []).insert(0, entry)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.fixture, f, ensure_ascii=False, indent=2)
+
+def _request_key(method: str, path: str, query: str, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query.encode(), body):
+        digest.update(part + b"\0")
+    return digest.hexdigest()[:16]
+
+def _contains_all(text: str, needles) -> bool:
+    if isinstance(needles, str):
+        needles = [needles]
+    return all(needle.lower() in text for needle in needles)
+
+def _last_message(body: bytes) -> str:
+    try:
+        messages = json.loads(body).get("messages") or []
+    except (ValueError, AttributeError):
+        return ""
+    content = messages[-1].get("content") if messages else ""
+    return content if isinstance(content, str) else json.dumps(content, ensure_ascii=False)
+
+def _readable_body(body: bytes) -> str:
+    """Request body as text for "contains" matching; JSON and form bodies are decoded first"""
+    text = body.decode("utf-8", errors="replace")
+    try:
+        return json.dumps(json.loads(text), ensure_ascii=False)
+    except ValueError:
+        return unquote_plus(text)
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fixture_dir: str = FIXTURE_DIR, latency_scale: float = 1.0,
+                 failure_rate: Optional[float] = None, seed: Optional[int] = None, record: bool = False):
+        super().__init__(address, StandinHandler)
+        self.providers = {name: Provider(name, fixture_dir, latency_scale, failure_rate) for name in PROVIDERS}
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.record = record
+
+    def handle_error(self, request, client_address):
+        # Clients cancel requests they no longer need (e.g. fan-out losers); that is not an error here
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    def draw(self, provider: Provider) -> Tuple[float, bool]:
+        with self.rng_lock:
+            return provider.latency(self.rng), self.rng.random() < provider.failure_rate
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server: StandinServer
+
+    def log_message(self, format, *args):
+        pass  # one line per request would dominate benchmark output
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        url = urlsplit(self.path)
+        if url.path == "/_stats":
+            return self._send(200, {name: p.stats for name, p in self.server.providers.items()})
+
+        name, _, rest = url.path.lstrip("/").partition("/")
+        provider = self.server.providers.get(name)
+        if provider is None:
+            return self._send(404, {"error": f"unknown provider: {name}"})
+        path = "/" + rest
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        if self.server.record:
+            return self._forward(provider, path, url.query, body)
+
+        delay, failed = self.server.draw(provider)
+        key = _request_key(self.command, path, url.query, body)
+        haystack = (unquote_plus(url.query) + "\n" + _readable_body(body)).lower()
+        response = provider.match(self.command, path, key, haystack, _last_message(body).lower())
+        with provider.lock:
+            provider.stats["requests"] += 1
+            provider.stats["failures"] += failed
+            provider.stats["unmatched"] += response is None and not failed
+
+        time.sleep(delay)
+        if failed:
+            return self._send(provider.failure_status, {"error": "stand-in injected failure"})
+        if response is None:
+            return self._send(404, {"error": f"no fixture for {self.command} {path}"})
+        self._send(response.get("status", 200), response.get("body"), response.get("headers"))
+
+    def _forward(self, provider: Provider, path: str, query: str, body: bytes):
+        upstream = PROVIDERS[provider.name][0] + path + (f"?{query}" if query else "")
+        headers = {
+            key: value for key, value in self.headers.items()
+            if key.lower() in ("authorization", "content-type", "accept", "user-agent")
+        }
+        request = urllib.request.Request(upstream, data=body or None, headers=headers, method=self.command)
+        try:
+            with urllib.request.urlopen(request, timeout=60) as upstream_response:
+                status, raw = upstream_response.status, upstream_response.read()
+        except urllib.error.HTTPError as e:
+            status, raw = e.code, e.read()
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            payload = raw.decode("utf-8", errors="replace")
+        provider.record({
+            "method": self.command,
+            "path": path,
+            "key": _request_key(self.command, path, query, body),
+            "status": status,
+            "body": payload,
+        })
+        self._send(status, payload)
+
+    def _send(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+        if isinstance(body, str):
+            raw, content_type = body.encode("utf-8"), "text/plain; charset=utf-8"
+        else:
+            raw, content_type = json.dumps(body, ensure_ascii=False).encode("utf-8"), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(raw)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+def start_standin(host: str = "127.0.0.1", port: int = 0, **options) -> StandinServer:
+    """Start the stand-in on a background thread; port 0 picks a free port"""
+    server = StandinServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="standin", daemon=True).start()
+    return server
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline stand-in for the external providers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="directory with <provider>.json files")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiply every fixture latency")
+    parser.add_argument("--failure-rate", type=float, default=None, help="override every fixture failure rate")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible latencies and failures")
+    parser.add_argument("--record", action="store_true", help="forward to the real providers and save fixtures")
+    args = parser.parse_args(argv)
+
+    server = StandinServer(
+        (args.host, args.port), fixture_dir=args.fixtures, latency_scale=args.latency_scale,
+        failure_rate=args.failure_rate, seed=args.seed, record=args.record,
+    )
+    print(f"Stand-in listening on http://{args.host}:{args.port} ({'recording' if args.record else 'replaying'})")
+    for key, value in standin_env(args.host, args.port).items():
+        print(f"export {key}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+# Shared helpers for the AI services (caching, text normalization)
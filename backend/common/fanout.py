@@ -0,0 +1,77 @@
+"""
+Concurrent fan-out over alternative searches with a priority order.
+
+Lookups like "a restaurant serving iskender" try several queries in order
+of preference and take the first acceptable result. Run one at a time, the
+worst case is the sum of all round trips. `first_acceptable` starts them all
+at once but keeps the same preference: a result wins only when it is
+acceptable and every higher-priority candidate has already finished without
+an acceptable result. The remaining candidates are then cancelled. When the
+deadline passes, the best acceptable result so far is used.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def first_acceptable(
+    candidates: Sequence[Callable[[], Awaitable[Any]]],
+    accept: Callable[[Any], bool],
+    deadline: Optional[float] = None,
+    name: str = "fanout",
+) -> Tuple[Optional[int], Any]:
+    """
+    Run the candidates concurrently and return the preferred acceptable result.
+
+    Args:
+        candidates: Coroutine factories, most preferred first
+        accept: Whether a result is good enough to use
+        deadline: Seconds to wait in total (None waits for the candidates)
+        name: Label for the log lines
+
+    Returns:
+        (index of the winning candidate, its result), or (None, None) when no
+        candidate produced an acceptable result in time. Exceptions count as
+        unacceptable results.
+    """
+    if not candidates:
+        return None, None
+    loop = asyncio.get_running_loop()
+    end = None if deadline is None else loop.time() + deadline
+    tasks = [asyncio.ensure_future(candidate()) for candidate in candidates]
+    index_of = {task: i for i, task in enumerate(tasks)}
+    accepted: Dict[int, Any] = {}
+    pending = set(tasks)
+    try:
+        while pending:
+            timeout = None if end is None else end - loop.time()
+            if timeout is not None and timeout <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in done:
+                i = index_of[task]
+                if task.exception() is not None:
+                    logger.warning(f"{name}: candidate {i} failed: {task.exception()!r}")
+                elif accept(task.result()):
+                    accepted[i] = task.result()
+            # The preferred acceptable result wins once everything ranked above it has finished
+            for i, task in enumerate(tasks):
+                if i in accepted:
+                    logger.info(f"{name}: candidate {i} of {len(tasks)} won")
+                    return i, accepted[i]
+                if not task.done():
+                    break
+        if accepted:
+            best = min(accepted)
+            logger.info(f"{name}: deadline reached, using candidate {best} of {len(tasks)}")
+            return best, accepted[best]
+        logger.info(f"{name}: no acceptable result from {len(tasks)} candidates")
+        return None, None
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,154 @@
+"""
+Shared asynchronous HTTP client for the external location providers
+(Foursquare, Overpass, Photon, ip-api.com).
+
+One httpx.AsyncClient keeps a pool of keep-alive connections, so repeated
+calls to the same provider skip the TCP and TLS handshakes. HTTP/2 is used
+when the optional `h2` package is installed (pip install "httpx[http2]").
+Each host gets its own concurrency limit, so a slow provider cannot use up
+the whole pool. Every call has a timeout and is retried with exponential
+backoff and full jitter on connection errors, timeouts, 429 and 5xx.
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from common.metrics import Counter, Histogram, add_server_timing
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "64"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "32"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "8"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_RETRY_BASE_DELAY = float(os.getenv("HTTP_RETRY_BASE_DELAY", "0.3"))
+HTTP_RETRY_MAX_DELAY = float(os.getenv("HTTP_RETRY_MAX_DELAY", "4"))
+HTTP_HTTP2 = os.getenv("HTTP_HTTP2", "1") == "1"
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = (httpx.TimeoutException, httpx.TransportError)
+
+HTTP_LATENCY = Histogram(
+    "http_client_request_duration_seconds", "Provider call latency including retries", ["host", "outcome"]
+)
+HTTP_RETRIES = Counter("http_client_retries_total", "Retried provider calls", ["host", "reason"])
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+_client: Optional[httpx.AsyncClient] = None
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=HTTP_HTTP2 and _http2_available(),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            headers={"User-Agent": "edremit-maks-location/1.0"},
+            follow_redirects=True,
+        )
+    return _client
+
+def set_http_client(client: Optional[httpx.AsyncClient]) -> None:
+    """Replace the shared client (for example with one using a mock transport in load tests)"""
+    global _client
+    _client = client
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def _host_limit(host: str) -> asyncio.Semaphore:
+    semaphore = _host_limits.get(host)
+    if semaphore is None:
+        semaphore = _host_limits[host] = asyncio.Semaphore(HTTP_MAX_PER_HOST)
+    return semaphore
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response]) -> float:
+    # Honour Retry-After on 429/503 when the server sends it
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), HTTP_RETRY_MAX_DELAY)
+            except ValueError:
+                pass
+    # Full jitter: uniform in [0, base * 2^attempt]
+    return random.uniform(0, min(HTTP_RETRY_MAX_DELAY, HTTP_RETRY_BASE_DELAY * (2 ** attempt)))
+
+async def http_request(method: str, url: str, retries: Optional[int] = None, **kwargs: Any) -> httpx.Response:
+    """
+    Send a request on the shared client.
+
+    Args:
+        method: HTTP method
+        url: Absolute URL
+        retries: Retry count for transient failures (defaults to HTTP_MAX_RETRIES).
+            Provider calls are all reads, including the Overpass POSTs; pass 0
+            for anything that must not be repeated
+        **kwargs: Passed to `httpx.AsyncClient.request` (params, data, headers, timeout, ...)
+
+    Returns:
+        The last response; the caller decides how to treat its status.
+
+    Raises:
+        httpx.TimeoutException, httpx.TransportError: When the last attempt fails
+    """
+    retries = HTTP_MAX_RETRIES if retries is None else retries
+    host = urlsplit(url).netloc
+    client = get_http_client()
+    started = time.perf_counter()
+    for attempt in range(retries + 1):
+        response = None
+        try:
+            async with _host_limit(host):
+                response = await client.request(method, url, **kwargs)
+            if response.status_code not in RETRYABLE_STATUS or attempt == retries:
+                break
+            reason = str(response.status_code)
+        except RETRYABLE_ERRORS as e:
+            if attempt == retries:
+                HTTP_LATENCY.observe(time.perf_counter() - started, host=host, outcome=type(e).__name__)
+                add_server_timing("http", (time.perf_counter() - started) * 1000, f"{host} {type(e).__name__}")
+                raise
+            reason = type(e).__name__
+        HTTP_RETRIES.inc(host=host, reason=reason)
+        delay = _retry_delay(attempt, response)
+        logger.warning(f"{method} {host} failed ({reason}), retry {attempt + 1}/{retries} in {delay:.2f}s")
+        # Sleep outside the host limit so waiting retries do not hold a slot
+        await asyncio.sleep(delay)
+
+    elapsed = time.perf_counter() - started
+    HTTP_LATENCY.observe(elapsed, host=host, outcome=str(response.status_code))
+    add_server_timing("http", elapsed * 1000, host)
+    return response
+
+async def http_get(url: str, **kwargs: Any) -> httpx.Response:
+    return await http_request("GET", url, **kwargs)
+
+async def http_post(url: str, **kwargs: Any) -> httpx.Response:
+    return await http_request("POST", url, **kwargs)
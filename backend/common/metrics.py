@@ -0,0 +1,131 @@
+"""
+In-process metrics and Server-Timing for the AI services.
+
+Counters and histograms are kept in memory and rendered in the Prometheus
+text format by `render_metrics()` (served at GET /metrics). Timings recorded
+while a request is being handled are also collected per request through a
+context variable and sent back in its `Server-Timing` header.
+"""
+import bisect
+import threading
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, token buckets in tokens
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+_registry: Dict[str, "_Metric"] = {}
+_registry_lock = threading.Lock()
+
+def _label_text(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry[name] = self
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.labels, key)} {value:g}")
+        return lines
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, series in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    le = 'le="%g"' % bound
+                    lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {cumulative}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {series[-1]}")
+                lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {series[-2]:g}")
+                lines.append(f"{self.name}_count{_label_text(self.labels, key)} {series[-1]}")
+        return lines
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format"""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# Per-request Server-Timing entries: (name, duration in ms, description)
+_server_timings: ContextVar[Optional[List[Tuple[str, float, str]]]] = ContextVar("server_timings", default=None)
+
+def start_server_timing() -> List[Tuple[str, float, str]]:
+    """Start collecting timings for the current request; returns the list to render afterwards"""
+    timings: List[Tuple[str, float, str]] = []
+    _server_timings.set(timings)
+    return timings
+
+def add_server_timing(name: str, duration_ms: float, description: str = "") -> None:
+    """Record a timing for the current request's Server-Timing header (no-op outside a request)"""
+    timings = _server_timings.get()
+    if timings is not None:
+        timings.append((name, duration_ms, description))
+
+def server_timing_header(timings: List[Tuple[str, float, str]]) -> str:
+    entries = []
+    seen: Dict[str, int] = {}
+    for name, duration_ms, description in timings:
+        # Metric names must be unique within the header: gpt, gpt-2, ...
+        seen[name] = seen.get(name, 0) + 1
+        metric = name if seen[name] == 1 else f"{name}-{seen[name]}"
+        entry = f"{metric};dur={duration_ms:.1f}"
+        if description:
+            entry += f';desc="{description}"'
+        entries.append(entry)
+    return ", ".join(entries)
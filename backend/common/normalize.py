@@ -0,0 +1,52 @@
+"""
+Text normalization for Turkish prompts, used to build cache keys.
+
+Two prompts that differ only in case, dotted/dotless I, diacritics, spacing,
+punctuation or spelled-out numbers map to the same key.
+"""
+import re
+
+# Bump when the output changes; caches keyed by normalized prompts include it
+NORMALIZE_VERSION = "2"
+
+# Turkish diacritics folded to ASCII after lowercasing
+ASCII_FOLD = str.maketrans({"ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u", "â": "a", "î": "i", "û": "u"})
+
+# Spelled-out numbers mapped to digits. They are matched before ASCII folding,
+# otherwise "ön" (front) would read as "on" (ten)
+NUMBER_WORDS = {
+    "sıfır": "0", "bir": "1", "iki": "2", "üç": "3", "dört": "4", "beş": "5",
+    "yedi": "7", "sekiz": "8", "dokuz": "9",
+}
+
+# Words that are also ordinary words ("on" is "ten" and "on" as in "on the",
+# "altı" is "six" and "below"). They count as numbers only right before a counted
+# noun ("on katlı", "altı yıllık") and not after a place ("zemin altı katlı")
+CONTEXT_NUMBER_WORDS = {"on": "10", "altı": "6"}
+COUNTED_PREFIXES = ("kat", "yıl", "yaş", "daire", "metre", "bina")
+PLACE_WORDS = {"zemin", "yer", "bodrum", "çatı", "su"}
+
+def turkish_lower(value: str) -> str:
+    """Lowercase with Turkish dotted/dotless I rules (İ -> i, I -> ı)"""
+    return value.replace("I", "ı").replace("İ", "i").lower()
+
+def _number(words: list[str], index: int) -> str:
+    word = words[index]
+    if word in CONTEXT_NUMBER_WORDS:
+        previous = words[index - 1] if index > 0 else ""
+        following = words[index + 1] if index + 1 < len(words) else ""
+        if following.startswith(COUNTED_PREFIXES) and previous not in PLACE_WORDS:
+            return CONTEXT_NUMBER_WORDS[word]
+        return word
+    return NUMBER_WORDS.get(word, word)
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalize a prompt for cache lookups.
+
+    Example:
+        "  En az ÜÇ katlı, İŞYERLERİ! " -> "en az 3 katli isyerleri"
+    """
+    text = re.sub(r"[^\w\s]", " ", turkish_lower(prompt))
+    words = text.split()
+    return " ".join(_number(words, i) for i in range(len(words))).translate(ASCII_FOLD)
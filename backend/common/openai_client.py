@@ -0,0 +1,199 @@
+"""
+Shared asynchronous OpenAI client for the AI services.
+
+One AsyncOpenAI instance (and so one HTTP connection pool) is used by every
+service. Calls never block the event loop. They are limited by a semaphore,
+have their own timeouts and are retried with exponential backoff and full
+jitter on transient failures (timeouts, connection errors, 429 and 5xx).
+
+Every call records latency, time to first byte, token usage and estimated
+cost in common.metrics, and adds a Server-Timing entry to the current request.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+import httpx
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+from common.metrics import Counter, Histogram, TOKEN_BUCKETS, add_server_timing
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "30"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+OPENAI_RETRY_BASE_DELAY = float(os.getenv("OPENAI_RETRY_BASE_DELAY", "0.5"))
+OPENAI_RETRY_MAX_DELAY = float(os.getenv("OPENAI_RETRY_MAX_DELAY", "8"))
+
+RETRYABLE_ERRORS = (APITimeoutError, APIConnectionError, RateLimitError, InternalServerError)
+
+# USD per 1M (prompt, completion) tokens; override with OPENAI_PRICES_JSON='{"model": [in, out]}'
+OPENAI_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+OPENAI_PRICES.update({model: tuple(price) for model, price in json.loads(os.getenv("OPENAI_PRICES_JSON", "{}")).items()})
+
+GPT_LATENCY = Histogram(
+    "openai_request_duration_seconds", "Total chat completion latency including retries", ["caller", "model", "outcome"]
+)
+GPT_TTFB = Histogram("openai_time_to_first_byte_seconds", "Time until response headers arrived", ["caller", "model"])
+GPT_PROMPT_TOKENS = Histogram("openai_prompt_tokens", "Prompt tokens per call", ["caller", "model"], TOKEN_BUCKETS)
+GPT_COMPLETION_TOKENS = Histogram(
+    "openai_completion_tokens", "Completion tokens per call", ["caller", "model"], TOKEN_BUCKETS
+)
+GPT_TOKENS = Counter("openai_tokens_total", "Tokens used", ["caller", "model", "kind"])
+GPT_COST = Counter("openai_cost_usd_total", "Estimated spend from OPENAI_PRICES", ["caller", "model"])
+GPT_RETRIES = Counter("openai_retries_total", "Retried chat completion attempts", ["caller", "model", "error"])
+GPT_RESULTS = Counter(
+    "openai_results_total", "How callers could use the response (tool_call, no_tool_call, json_error, ...)",
+    ["caller", "outcome"]
+)
+
+# Set per call; the httpx event hooks write the time to first byte into it
+_ttfb_state: ContextVar[Optional[Dict[str, float]]] = ContextVar("openai_ttfb", default=None)
+
+async def _on_request(request: httpx.Request) -> None:
+    state = _ttfb_state.get()
+    if state is not None:
+        state["sent"] = time.perf_counter()
+
+async def _on_response(response: httpx.Response) -> None:
+    # Response hooks run as soon as the headers are in, before the body is read
+    state = _ttfb_state.get()
+    if state is not None and "sent" in state:
+        state["ttfb"] = time.perf_counter() - state["sent"]
+
+_client: Optional[AsyncOpenAI] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+def get_openai_client() -> AsyncOpenAI:
+    """Return the shared client, creating it on first use"""
+    global _client
+    if _client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONCURRENCY * 2,
+                max_keepalive_connections=OPENAI_MAX_CONCURRENCY,
+            ),
+            timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+            event_hooks={"request": [_on_request], "response": [_on_response]},
+        )
+        _client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            base_url=os.getenv("OPENAI_BASE_URL") or None,
+            http_client=http_client,
+            max_retries=0,  # retries are done here, with jitter and under the concurrency limit
+        )
+    return _client
+
+def set_openai_client(client: Optional[AsyncOpenAI]) -> None:
+    """Replace the shared client (for example with one using a mock transport in load tests)"""
+    global _client
+    _client = client
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+    return _semaphore
+
+def _retry_delay(attempt: int, error: Exception) -> float:
+    # Honour Retry-After on 429 when the server sends it
+    response = getattr(error, "response", None)
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), OPENAI_RETRY_MAX_DELAY)
+            except ValueError:
+                pass
+    # Full jitter: uniform in [0, base * 2^attempt]
+    return random.uniform(0, min(OPENAI_RETRY_MAX_DELAY, OPENAI_RETRY_BASE_DELAY * (2 ** attempt)))
+
+def _price(model: str):
+    # Responses name dated snapshots ("gpt-4o-mini-2024-07-18"); use the longest matching prefix
+    matches = [name for name in OPENAI_PRICES if model.startswith(name)]
+    return OPENAI_PRICES[max(matches, key=len)] if matches else None
+
+def record_gpt_result(caller: str, outcome: str) -> None:
+    """Count how a caller could use a response: "tool_call", "no_tool_call", "json_error", ..."""
+    GPT_RESULTS.inc(caller=caller, outcome=outcome)
+
+async def chat_completion(timeout: Optional[float] = None, caller: str = "unknown", **kwargs: Any):
+    """
+    Create a chat completion on the shared client.
+
+    Args:
+        timeout: Per-call timeout in seconds (defaults to OPENAI_TIMEOUT)
+        caller: Label for the metrics (e.g. "building_filter")
+        **kwargs: Passed to `chat.completions.create`
+
+    Returns:
+        The ChatCompletion response
+    """
+    model = kwargs.get("model", "")
+    started = time.perf_counter()
+    state: Dict[str, float] = {}
+    token = _ttfb_state.set(state)
+    try:
+        response = await _create_with_retries(timeout, caller, **kwargs)
+    except Exception as e:
+        GPT_LATENCY.observe(time.perf_counter() - started, caller=caller, model=model, outcome=type(e).__name__)
+        raise
+    finally:
+        _ttfb_state.reset(token)
+
+    elapsed = time.perf_counter() - started
+    GPT_LATENCY.observe(elapsed, caller=caller, model=model, outcome="ok")
+    if "ttfb" in state:
+        GPT_TTFB.observe(state["ttfb"], caller=caller, model=model)
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        GPT_PROMPT_TOKENS.observe(usage.prompt_tokens, caller=caller, model=model)
+        GPT_COMPLETION_TOKENS.observe(usage.completion_tokens, caller=caller, model=model)
+        GPT_TOKENS.inc(usage.prompt_tokens, caller=caller, model=model, kind="prompt")
+        GPT_TOKENS.inc(usage.completion_tokens, caller=caller, model=model, kind="completion")
+        price = _price(getattr(response, "model", None) or model)
+        if price:
+            GPT_COST.inc((usage.prompt_tokens * price[0] + usage.completion_tokens * price[1]) / 1_000_000,
+                         caller=caller, model=model)
+    add_server_timing("gpt", elapsed * 1000, f"{caller} {model}")
+    if "ttfb" in state:
+        add_server_timing("gpt-ttfb", state["ttfb"] * 1000, caller)
+    return response
+
+async def _create_with_retries(timeout: Optional[float], caller: str, **kwargs: Any):
+    client = get_openai_client()
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        try:
+            async with _get_semaphore():
+                return await client.chat.completions.create(timeout=timeout or OPENAI_TIMEOUT, **kwargs)
+        except RETRYABLE_ERRORS as e:
+            if attempt == OPENAI_MAX_RETRIES:
+                raise
+            GPT_RETRIES.inc(caller=caller, model=kwargs.get("model", ""), error=type(e).__name__)
+            delay = _retry_delay(attempt, e)
+            logger.warning(
+                f"OpenAI call failed ({type(e).__name__}), retry {attempt + 1}/{OPENAI_MAX_RETRIES} in {delay:.2f}s"
+            )
+            # Sleep outside the semaphore so waiting retries do not hold a slot
+            await asyncio.sleep(delay)
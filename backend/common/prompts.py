@@ -0,0 +1,127 @@
+"""
+Versioned system prompts for the AI services.
+
+Every prompt (system text plus tool schema) is registered under a name and a
+version. Services ask the registry for the active version, which is the
+default unless overridden with PROMPT_VERSION_<NAME> (e.g.
+PROMPT_VERSION_BUILDING_FILTER=v2 to try the compact prompt). The system text and the
+tools are static and always sent first, so the request prefix stays
+byte-identical between calls and can be served from the provider's prompt
+cache; only the user message varies.
+
+`check_prompt_budgets()` runs at startup and logs a warning when an active
+prompt exceeds its token budget.
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class PromptVersion:
+    name: str
+    version: str
+    system: str
+    tools: Optional[List[Dict[str, Any]]] = None
+    budget_tokens: int = 1000  # system text + tool schema
+    notes: str = field(default="", compare=False)
+
+    @property
+    def fingerprint(self) -> str:
+        """Short hash of everything sent to the model; cached results are keyed on it"""
+        payload = self.system + json.dumps(self.tools, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def tokens(self) -> int:
+        text = self.system
+        if self.tools:
+            text += json.dumps(self.tools, ensure_ascii=False)
+        return count_tokens(text)
+
+_prompts: Dict[str, Dict[str, PromptVersion]] = {}
+_defaults: Dict[str, str] = {}
+
+def register_prompt(prompt: PromptVersion, default: bool = False) -> PromptVersion:
+    _prompts.setdefault(prompt.name, {})[prompt.version] = prompt
+    if default or prompt.name not in _defaults:
+        _defaults[prompt.name] = prompt.version
+    return prompt
+
+def get_prompt(name: str, version: Optional[str] = None) -> PromptVersion:
+    """The requested version, or the active one (PROMPT_VERSION_<NAME>, else the default)"""
+    versions = _prompts.get(name)
+    if not versions:
+        raise KeyError(f"Unknown prompt: {name}")
+    version = version or os.getenv(f"PROMPT_VERSION_{name.upper()}") or _defaults[name]
+    if version not in versions:
+        raise KeyError(f"Unknown version {version} for prompt {name}; known: {', '.join(versions)}")
+    return versions[version]
+
+def prompt_versions(name: str) -> List[PromptVersion]:
+    return list(_prompts.get(name, {}).values())
+
+def prompt_names() -> List[str]:
+    return list(_prompts)
+
+_encoding = None
+
+def count_tokens(text: str) -> int:
+    """
+    Token count with tiktoken (o200k_base, the gpt-4o family encoding) when it
+    is installed, otherwise a deliberately pessimistic estimate.
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    # Roughly one token per 3 letters of a word (Turkish suffixes split often) and one per symbol
+    return sum(math.ceil(len(piece) / 3) if piece[0].isalnum() else 1
+               for piece in re.findall(r"\w+|[^\w\s]", text))
+
+def check_prompt_budgets(strict: bool = False) -> List[Dict[str, Any]]:
+    """
+    Log the token size of every registered prompt version.
+
+    Raises:
+        RuntimeError: When `strict` and an active version exceeds its budget
+    """
+    report = []
+    over = []
+    for name in prompt_names():
+        active = get_prompt(name)
+        for prompt in prompt_versions(name):
+            tokens = prompt.tokens
+            row = {
+                "name": name,
+                "version": prompt.version,
+                "active": prompt is active,
+                "tokens": tokens,
+                "budget": prompt.budget_tokens,
+                "fingerprint": prompt.fingerprint,
+            }
+            report.append(row)
+            logger.info(
+                f"Prompt {name}/{prompt.version}{' (active)' if row['active'] else ''}: "
+                f"{tokens} tokens, budget {prompt.budget_tokens}"
+            )
+            if row["active"] and tokens > prompt.budget_tokens:
+                over.append(f"{name}/{prompt.version} ({tokens} > {prompt.budget_tokens})")
+    if over:
+        if strict:
+            raise RuntimeError(f"Prompt token budget exceeded: {', '.join(over)}")
+        logger.warning(f"Prompt token budget exceeded: {', '.join(over)}")
+    return report
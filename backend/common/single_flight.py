@@ -0,0 +1,51 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+When several requests need the same expensive result at once (the same
+suggested prompt clicked by several operators, a frontend retry), only the
+first one runs the call; the others await the same in-flight task. Keys are
+chosen by the caller, e.g. model + prompt version + normalized prompt.
+"""
+import asyncio
+import copy
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._stats = {"executed": 0, "coalesced": 0, "failed": 0}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `func()` once per key at a time and share its result.
+
+        Every caller gets its own deep copy of the result, so callers may
+        mutate it. The call runs in its own task: a cancelled caller (for
+        example a disconnected client) does not cancel it for the others.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            self._stats["executed"] += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self._stats["coalesced"] += 1
+            logger.info(f"{self.name}: joined in-flight call for {key}")
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            self._stats["failed"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name, **self._stats, "in_flight": len(self._in_flight)}
@@ -0,0 +1,209 @@
+"""
+Two-level TTL cache: an in-memory LRU in front of an optional SQLite file.
+
+The memory level serves hot keys without I/O; the SQLite level keeps results
+across restarts and between worker processes. Every entry carries a `version`
+(for example a hash of the prompt that produced it); entries written under a
+different version are dropped when the cache is opened, so changing a prompt
+invalidates everything computed with the old one.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class TTLCache:
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1024,
+        ttl: float = 86400,
+        path: Optional[str] = None,
+        version: str = "",
+    ):
+        """
+        Args:
+            name: Cache name, also the SQLite table name
+            maxsize: Maximum number of entries kept in memory
+            ttl: Default time to live in seconds
+            path: SQLite file; None keeps the cache in memory only
+            version: Entries stored under another version are discarded on open
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self.version = version
+        self._memory: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expired": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._open_disk(path)
+
+    def _open_disk(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(f"""
+                CREATE TABLE IF NOT EXISTS "{self.name}" (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            removed = self._db.execute(
+                f'DELETE FROM "{self.name}" WHERE version <> ? OR expires_at < ?', (self.version, time.time())
+            ).rowcount
+            if removed:
+                logger.info(f"Cache {self.name}: dropped {removed} stale or outdated entries")
+        except sqlite3.Error as e:
+            # The cache is an optimization; run memory-only rather than failing
+            logger.warning(f"Cache {self.name}: SQLite store unavailable ({str(e)}), using memory only")
+            self._db = None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at >= now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+                self._stats["expired"] += 1
+
+            value = self._disk_get(key, now)
+            if value is not _MISSING:
+                self._stats["disk_hits"] += 1
+                return value
+
+            self._stats["misses"] += 1
+            return default
+
+    def _disk_get(self, key: str, now: float) -> Any:
+        if self._db is None:
+            return _MISSING
+        try:
+            row = self._db.execute(
+                f'SELECT value, expires_at FROM "{self.name}" WHERE key = ? AND version = ?', (key, self.version)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache {self.name}: read failed: {str(e)}")
+            return _MISSING
+        if row is None:
+            return _MISSING
+        if row[1] < now:
+            self._stats["expired"] += 1
+            return _MISSING
+        value = json.loads(row[0])
+        self._memory_set(key, value, row[1])
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable value; `ttl` overrides the default for this entry"""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        # Store a copy so later changes to the caller's object do not leak into the cache
+        serialized = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._stats["sets"] += 1
+            self._memory_set(key, json.loads(serialized), expires_at)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        f'INSERT OR REPLACE INTO "{self.name}" (key, value, version, expires_at) VALUES (?, ?, ?, ?)',
+                        (key, serialized, self.version, expires_at)
+                    )
+                except sqlite3.Error as e:
+                    logger.warning(f"Cache {self.name}: write failed: {str(e)}")
+
+    def _memory_set(self, key: str, value: Any, expires_at: float) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                self._db.execute(f'DELETE FROM "{self.name}" WHERE key = ?', (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute(f'DELETE FROM "{self.name}"')
+
+    def export(self) -> Dict[str, Any]:
+        """Unexpired entries from both levels, for warming the cache of another instance"""
+        now = time.time()
+        with self._lock:
+            entries = {key: entry for key, entry in self._memory.items() if entry[0] >= now}
+            if self._db is not None:
+                rows = self._db.execute(
+                    f'SELECT key, value, expires_at FROM "{self.name}" WHERE version = ? AND expires_at >= ?',
+                    (self.version, now)
+                ).fetchall()
+                for key, value, expires_at in rows:
+                    entries.setdefault(key, (expires_at, json.loads(value)))
+        return {
+            "name": self.name,
+            "version": self.version,
+            "exported_at": now,
+            "entries": [
+                {"key": key, "value": value, "expires_at": expires_at}
+                for key, (expires_at, value) in entries.items()
+            ],
+        }
+
+    def import_entries(self, exported: Dict[str, Any]) -> int:
+        """
+        Load entries produced by `export()`; they keep their original expiry.
+
+        Raises:
+            ValueError: When the export was written under another version
+        """
+        if exported.get("version", "") != self.version:
+            raise ValueError(f"Cache {self.name}: export version {exported.get('version')!r} != {self.version!r}")
+        now = time.time()
+        entries: List[Dict[str, Any]] = exported.get("entries", [])
+        imported = 0
+        for entry in entries:
+            remaining = float(entry["expires_at"]) - now
+            if remaining > 0:
+                self.set(entry["key"], entry["value"], ttl=remaining)
+                imported += 1
+        logger.info(f"Cache {self.name}: imported {imported} of {len(entries)} entries")
+        return imported
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            disk_size = None
+            if self._db is not None:
+                disk_size = self._db.execute(f'SELECT count(*) FROM "{self.name}"').fetchone()[0]
+            return {
+                "name": self.name,
+                "version": self.version,
+                "memory_size": len(self._memory),
+                "disk_size": disk_size,
+                "hit_rate": round(hits / lookups, 4) if lookups else None,
+                **self._stats,
+            }
@@ -1,10 +1,19 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.responses import RedirectResponse, JSONResponse, PlainTextResponse
+import time
+from common.metrics import render_metrics, start_server_timing, server_timing_header
+from common.http_client import close_http_client
+from common.prompts import check_prompt_budgets
 from maks.bina import router as bina_router
 from maks.restore import router as restore_router
 from maks.clone import router as clone_router
 from maks.update import router as update_router
+from maks.jobs import router as jobs_router
+from maks.snapshot import router as snapshot_router
+from maks.yedek import router as yedek_router
+from maks.disa_aktarim import router as disa_aktarim_router
+from maks.geometri import router as geometri_router
 
 # Import AILocationService router
 from AILocationService.routers.location_router import router as location_router
@@ -27,10 +36,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    # GPT çağrıları ve diğer ölçümler bu isteğin Server-Timing başlığına eklenir
+    timings = start_server_timing()
+    started = time.perf_counter()
+    response = await call_next(request)
+    timings.append(("app", (time.perf_counter() - started) * 1000, ""))
+    response.headers["Server-Timing"] = server_timing_header(timings)
+    return response
+
+@app.on_event("startup")
+def prompt_budgets():
+    # Token bütçesini aşan aktif bir prompt sürümü uyarı olarak loglanır; servis yine de başlar
+    check_prompt_budgets()
+
+@app.on_event("shutdown")
+async def http_client_shutdown():
+    # Sağlayıcılara açık kalan keep-alive bağlantıları kapatılır
+    await close_http_client()
+
 app.include_router(bina_router, prefix="/maks")
 app.include_router(restore_router, prefix="/maks")
 app.include_router(clone_router, prefix="/maks")
 app.include_router(update_router, prefix="/maks")
+app.include_router(jobs_router, prefix="/maks")
+app.include_router(snapshot_router, prefix="/maks")
+app.include_router(yedek_router, prefix="/maks")
+app.include_router(disa_aktarim_router, prefix="/maks")
+app.include_router(geometri_router, prefix="/maks")
 
 # Include AILocationService router - note that location_router already has prefix='/api'
 app.include_router(location_router)
@@ -51,10 +85,42 @@ def read_root():
                 },
                 "description": "Ham YAPI verilerini döndürür (offset frontend tarafında uygulanır)"
             },
+            {
+                "path": "/maks/bina/by-ids",
+                "description": "ID listesine göre bina geometri ve özniteliklerini döndürür (POST)"
+            },
+            {
+                "path": "/maks/bina/export",
+                "description": "Filtreye uyan binaları GeoJSONSeq, CSV ya da GeoPackage olarak dışa aktarır (POST)"
+            },
             {
                 "path": "/maks/update",
                 "description": "Execute building update SQL queries (POST)"
             },
+            {
+                "path": "/maks/update/by-filter",
+                "description": "Filtreye uyan tüm binaları tek bir sunucu tarafı UPDATE ile günceller (POST)"
+            },
+            {
+                "path": "/maks/jobs/{job_id}",
+                "description": "Klonlama, geri yükleme ve toplu güncelleme işlerinin durumu (GET), iptal için /cancel (POST)"
+            },
+            {
+                "path": "/maks/snapshots",
+                "description": "Artımlı YAPI snapshot'ları: oluşturma (POST), listeleme (GET), /{ad}/diff ve /{ad}/restore"
+            },
+            {
+                "path": "/maks/batches",
+                "description": "Güncelleme batch'leri (GET), /{batch_id} ayrıntı (GET) ve /{batch_id}/undo ile tek batch geri alma (POST)"
+            },
+            {
+                "path": "/maks/yapi/backups",
+                "description": "Binary COPY yedekleri: /maks/yapi/export (POST), listeleme (GET), indirme (GET /{ad}) ve /{ad}/import (POST)"
+            },
+            {
+                "path": "/maks/yapi/geometry/validate",
+                "description": "Geometri geçerlilik taraması ve ST_MakeValid onarımı (POST), sonuçlar için /maks/yapi/geometry/summary (GET)"
+            },
             {
                 "path": "/api/location/",
                 "description": "Konum tabanlı doğal dil sorgulaması için API (POST)"
@@ -74,6 +140,22 @@ def read_root():
             {
                 "path": "/ai-filter/filter/",
                 "description": "Doğal dil ile bina filtresi için API (POST)"
+            },
+            {
+                "path": "/ai-filter/filter/stream/",
+                "description": "Bina filtresinin SSE sürümü: önce kural tabanlı sonuç, ardından GPT sonucu (POST)"
+            },
+            {
+                "path": "/ai-filter/apply/",
+                "description": "Doğal dil filtresini YAPI üzerinde çalıştırıp ID, sayı ya da GeoJSONSeq döndürür (POST)"
+            },
+            {
+                "path": "/metrics",
+                "description": "GPT gecikme, token ve maliyet metrikleri (Prometheus metin formatı, GET)"
             }
         ]
-    }
\ No newline at end of file
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
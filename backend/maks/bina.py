@@ -1,12 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import text
+from typing import Optional
+from pydantic import BaseModel
 from database.database import get_db
-from maks.deprem_risk import hesapla_deprem_riski  # doğru import
+from maks.deprem_risk import hesapla_deprem_riski, RISK_ALANLARI  # doğru import
+from maks.update import id_array_type
 import json  # GEOJSON dönüşümü için gerekli
 
 router = APIRouter()
 
+class BinaIdIstegi(BaseModel):
+    ids: list[str]
+    fields: Optional[list[str]] = None  # None ise tüm alanlar döner
+    include_geometry: bool = True
+
 @router.get("/bina")
 async def get_buildings_within_radius(
     lon: float = Query(..., description="Merkez boylam"),
@@ -72,3 +80,88 @@ async def get_buildings_within_radius(
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"🔥 Genel hata: {str(e)}")
+
+
+@router.post("/bina/by-ids")
+async def get_buildings_by_ids(
+    istek: BinaIdIstegi,
+    db: Session = Depends(get_db)
+):
+    """
+    Verilen ID listesindeki binaları tek sorguda döndürür.
+
+    - `fields` verilirse yalnızca bu alanlar (ve her zaman "ID") döner
+    - "RISKSKORU" istenirse hesap için gereken kolonlar da okunur
+    - `include_geometry` false ise geometri dönüştürülmez
+    """
+    ids = list(dict.fromkeys(bid for bid in istek.ids if bid))
+    if not ids:
+        raise HTTPException(status_code=400, detail="En az bir bina ID'si gönderilmelidir.")
+
+    istenen_alanlar = None
+    okunacak_alanlar = None
+    if istek.fields is not None:
+        istenen_alanlar = set(istek.fields) | {"ID"}
+        okunacak_alanlar = set(istenen_alanlar) - {"RISKSKORU"}
+        if "RISKSKORU" in istenen_alanlar:
+            okunacak_alanlar |= set(RISK_ALANLARI)
+
+    try:
+        # Projeksiyon SQL tarafında yapılır, böylece istenmeyen kolonlar taşınmaz
+        if okunacak_alanlar is None:
+            properties_sql = 'to_jsonb("YAPI") - \'geom\''
+        else:
+            properties_sql = """(
+                SELECT COALESCE(jsonb_object_agg(key, value), '{}'::jsonb)
+                FROM jsonb_each(to_jsonb("YAPI") - 'geom')
+                WHERE key = ANY(:alanlar)
+            )"""
+
+        query = text(f"""
+            SELECT
+                CASE WHEN :geometri THEN ST_AsGeoJSON(ST_Transform(geom, 4326)) END AS geometry,
+                {properties_sql} AS properties
+            FROM "YAPI"
+            WHERE "ID" = ANY(CAST(:ids AS {id_array_type(db)}))
+        """)
+
+        params = {"ids": ids, "geometri": istek.include_geometry}
+        if okunacak_alanlar is not None:
+            params["alanlar"] = sorted(okunacak_alanlar)
+
+        rows = db.execute(query, params).fetchall()
+        print(f"📄 ID ile sorgu: {len(ids)} istendi, {len(rows)} bulundu")
+
+        features = []
+        bulunan_ids = set()
+
+        for geometry_str, raw_props in rows:
+            properties = dict(raw_props or {})
+
+            if istenen_alanlar is None or "RISKSKORU" in istenen_alanlar:
+                try:
+                    properties["RISKSKORU"] = hesapla_deprem_riski(properties)
+                except Exception as e:
+                    print("⚠️ Risk hesaplama hatası:", e)
+                    properties["RISKSKORU"] = None
+
+            if istenen_alanlar is not None:
+                properties = {k: v for k, v in properties.items() if k in istenen_alanlar}
+
+            bulunan_ids.add(str(properties.get("ID")))
+            features.append({
+                "type": "Feature",
+                "geometry": json.loads(geometry_str) if geometry_str else None,
+                "properties": properties
+            })
+
+        return {
+            "type": "FeatureCollection",
+            "features": features,
+            "missing_ids": [bid for bid in ids if bid not in bulunan_ids]
+        }
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"🔥 Genel hata: {str(e)}")
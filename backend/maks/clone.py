@@ -1,27 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from database.database import get_db  # kendi db bağlantı fonksiyonun
+from maks.jobs import Job, submit_job
 
 router = APIRouter()
 
-@router.post("/yapi/clone")
-async def klonla_yapi_tablosu(db: Session = Depends(get_db)):
-    try:
-        # 1. Eğer tablo zaten varsa, DROP et (isteğe bağlı)
-        db.execute(text('DROP TABLE IF EXISTS public."YAPI_KLON";'))
+def klonla(job: Job, db: Session):
+    # 1. Eğer tablo zaten varsa, DROP et (isteğe bağlı)
+    db.execute(text('DROP TABLE IF EXISTS public."YAPI_KLON";'))
 
-        # 2. Yeni klon tabloyu oluştur (şema ve tüm constraint'leriyle birlikte)
-        db.execute(text('CREATE TABLE public."YAPI_KLON" (LIKE public."YAPI" INCLUDING ALL);'))
+    # 2. Yeni klon tabloyu oluştur (şema ve tüm constraint'leriyle birlikte)
+    db.execute(text('CREATE TABLE public."YAPI_KLON" (LIKE public."YAPI" INCLUDING ALL);'))
+    job.report_progress(0.1, "Klon tablosu oluşturuldu, veriler kopyalanıyor")
 
-        # 3. Verileri orijinal tablodan klona kopyala
-        db.execute(text('INSERT INTO public."YAPI_KLON" SELECT * FROM public."YAPI";'))
+    # 3. Verileri orijinal tablodan klona kopyala
+    result = db.execute(text('INSERT INTO public."YAPI_KLON" SELECT * FROM public."YAPI";'))
+    job.check_cancelled()
 
-        db.commit()
-        return {"message": "✅ YAPI tablosu başarıyla klonlandı -> YAPI_KLON"}
+    db.commit()
+    return {"message": "✅ YAPI tablosu başarıyla klonlandı -> YAPI_KLON", "rows": result.rowcount}
 
-    except Exception as e:
-        db.rollback()
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"🔥 Klonlama işlemi başarısız: {str(e)}")
+@router.post("/yapi/clone", status_code=202)
+async def klonla_yapi_tablosu():
+    # Uzun süren kopyalama istek içinde değil, arka plan işi olarak çalışır
+    job = submit_job("clone", "YAPI", klonla)
+    return {"message": "⏳ Klonlama işi başlatıldı", "job": job.to_dict()}
@@ -1,3 +1,12 @@
+# hesapla_deprem_riski'nin okuduğu YAPI kolonları
+RISK_ALANLARI = [
+    "BINAYASI",
+    "ZEMINUSTUKATSAYISI",
+    "YAPIKAYITBELGENO",
+    "TOPLAMYUKSEKLIK",
+    "TESPITKARARACIKLAMA",
+]
+
 def puanla_bina_yasi(yas):
     if yas is None:
         return 1  # varsayılabilir risk
@@ -67,3 +76,107 @@ def hesapla_deprem_riski(row):
         return 4  # Yüksek Risk
     else:
         return 5  # Çok Yüksek Risk
+
+
+# hesapla_deprem_riski'nin SQL karşılığı; sunucu tarafı filtre ve güncellemelerde
+# RISKSKORU'nu satır satır Python'a taşımadan hesaplamak için kullanılır.
+# Puan -> skor eşlemesi (<=2:1, <=5:2, <=8:3, <=11:4, diğer:5) LEAST(5, (puan + 3) / 3) ile aynıdır.
+def deprem_riski_sql(onek: str = "") -> str:
+    """RISKSKORU ifadesini döndürür; onek kolonların önüne eklenir (ör. "y.")"""
+    return f"""LEAST(5, ((
+        CASE
+            WHEN {onek}"BINAYASI" IS NULL THEN 1
+            WHEN {onek}"BINAYASI" <= 10 THEN 0
+            WHEN {onek}"BINAYASI" <= 25 THEN 1
+            WHEN {onek}"BINAYASI" <= 40 THEN 2
+            ELSE 3
+        END
+        + CASE
+            WHEN {onek}"ZEMINUSTUKATSAYISI" IS NULL THEN 1
+            WHEN {onek}"ZEMINUSTUKATSAYISI" <= 2 THEN 0
+            WHEN {onek}"ZEMINUSTUKATSAYISI" <= 5 THEN 1
+            WHEN {onek}"ZEMINUSTUKATSAYISI" <= 9 THEN 2
+            ELSE 3
+        END
+        + CASE WHEN NULLIF(btrim({onek}"YAPIKAYITBELGENO"::text), '') IS NOT NULL THEN 2 ELSE 0 END
+        + CASE
+            WHEN {onek}"TOPLAMYUKSEKLIK" IS NULL THEN 1
+            WHEN {onek}"TOPLAMYUKSEKLIK" <= 6 THEN 0
+            WHEN {onek}"TOPLAMYUKSEKLIK" <= 15 THEN 1
+            WHEN {onek}"TOPLAMYUKSEKLIK" <= 25 THEN 2
+            ELSE 3
+        END
+        + CASE WHEN lower({onek}"TESPITKARARACIKLAMA"::text) ~ '(risk|güçlendirme|yıkım)' THEN 3 ELSE 0 END
+    ) + 3) / 3)"""
+
+DEPREM_RISKI_SQL = deprem_riski_sql()
+
+
+# hesapla_deprem_riski'nin numpy karşılığı; toplu veri aktarımında (maks/ingest.py)
+# milyonlarca satırı Python döngüsü olmadan puanlamak için kullanılır.
+# Eksik değerler (None/NaN) tekil hesaplamadaki None ile aynı puanı alır.
+RISKLI_KELIMELER = ["risk", "güçlendirme", "yıkım"]
+
+def _sayisal_dizi(degerler, n):
+    import numpy as np
+
+    if degerler is None:
+        return np.full(n, np.nan)
+    dizi = np.asarray(degerler)
+    if dizi.dtype.kind in "iuf":
+        return dizi.astype(float)
+    sonuc = np.full(n, np.nan)
+    for i, deger in enumerate(dizi):
+        try:
+            sonuc[i] = float(deger)
+        except (TypeError, ValueError):
+            pass
+    return sonuc
+
+def _metin_dizi(degerler, n):
+    import numpy as np
+
+    if degerler is None:
+        return np.full(n, "", dtype=object)
+    dizi = np.asarray(degerler, dtype=object)
+    bos = np.array([deger is None or (isinstance(deger, float) and deger != deger) for deger in dizi])
+    dizi = dizi.astype(str)
+    dizi[bos] = ""
+    return dizi
+
+def _esik_puani(degerler, esikler):
+    """None/NaN -> 1; aksi halde ilk aşmadığı eşiğin sırası (0..len(esikler))"""
+    import numpy as np
+
+    puan = np.searchsorted(np.asarray(esikler, dtype=float), degerler, side="left")
+    return np.where(np.isnan(degerler), 1, puan)
+
+def hesapla_deprem_riski_vektorel(kolonlar):
+    """
+    hesapla_deprem_riski'nin dizi versiyonu.
+
+    Args:
+        kolonlar: RISK_ALANLARI'ndaki kolon adlarından eşit uzunlukta dizilere sözlük;
+            eksik kolonlar tamamen boş sayılır
+
+    Returns:
+        1-5 arası risk skorlarını içeren int8 numpy dizisi
+    """
+    import numpy as np
+
+    n = len(next(iter(kolonlar.values()))) if kolonlar else 0
+
+    puan = _esik_puani(_sayisal_dizi(kolonlar.get("BINAYASI"), n), [10, 25, 40])
+    puan += _esik_puani(_sayisal_dizi(kolonlar.get("ZEMINUSTUKATSAYISI"), n), [2, 5, 9])
+    puan += _esik_puani(_sayisal_dizi(kolonlar.get("TOPLAMYUKSEKLIK"), n), [6, 15, 25])
+
+    belge = _metin_dizi(kolonlar.get("YAPIKAYITBELGENO"), n)
+    puan += np.where(np.char.str_len(np.char.strip(belge.astype(str))) > 0, 2, 0)
+
+    aciklama = np.char.lower(_metin_dizi(kolonlar.get("TESPITKARARACIKLAMA"), n).astype(str))
+    riskli = np.zeros(n, dtype=bool)
+    for kelime in RISKLI_KELIMELER:
+        riskli |= np.char.find(aciklama, kelime) >= 0
+    puan += np.where(riskli, 3, 0)
+
+    return np.minimum(5, (puan + 3) // 3).astype(np.int8)
@@ -0,0 +1,299 @@
+"""
+Filtrelenmiş binaların GeoJSONSeq, CSV ya da GeoPackage olarak dışa aktarımı.
+
+Satırlar sunucu tarafı cursor ile parça parça okunur ve yanıt akıtılır; bellek
+kullanımı sonuç sayısından bağımsızdır. GeoPackage rastgele erişimli bir SQLite
+dosyası olduğu için önce geçici dosyaya yazılır, sonra gönderilir.
+"""
+import csv
+import io
+import os
+import sqlite3
+import struct
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional, Literal, Iterator
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse, FileResponse
+from sqlalchemy import text
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+
+from database.database import engine
+from maks.deprem_risk import deprem_riski_sql
+from maks.filtre import BinaFiltresi, filtre_sql_olustur
+
+router = APIRouter()
+
+# Sunucu tarafı cursor'dan her seferde çekilen satır sayısı
+PARCA_BOYUTU = 2000
+
+# GeoPackage: 'GPKG' uygulama kimliği ve 1.3 sürümü
+GPKG_APPLICATION_ID = 0x47504B47
+GPKG_USER_VERSION = 10300
+GPKG_TABLO = "YAPI"
+
+class BinaDisaAktarimIstegi(BinaFiltresi):
+    format: Literal["geojsonseq", "csv", "gpkg"] = "geojsonseq"
+    fields: Optional[list[str]] = None  # None ise tüm kolonlar
+
+def _yapi_kolonlari() -> dict[str, str]:
+    """geom dışındaki YAPI kolonları ve veri tipleri"""
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT column_name, data_type FROM information_schema.columns
+            WHERE table_schema = 'public' AND table_name = 'YAPI' AND column_name <> 'geom'
+            ORDER BY ordinal_position
+        """)).fetchall()
+    return dict(rows)
+
+def _kolonlari_sec(istek: BinaDisaAktarimIstegi) -> dict[str, str]:
+    kolonlar = _yapi_kolonlari()
+    if istek.fields is None:
+        return kolonlar
+    bilinmeyen = [alan for alan in istek.fields if alan not in kolonlar and alan != "RISKSKORU"]
+    if bilinmeyen:
+        raise HTTPException(status_code=400, detail=f"Bilinmeyen alanlar: {', '.join(bilinmeyen)}")
+    return {alan: kolonlar[alan] for alan in istek.fields if alan in kolonlar}
+
+def _satirlar(sql: str, params: dict) -> Iterator:
+    """Sorguyu sunucu tarafı cursor ile çalıştırır ve satırları PARCA_BOYUTU'luk parçalarla çeker"""
+    with engine.connect() as conn:
+        sonuc = conn.execution_options(stream_results=True, yield_per=PARCA_BOYUTU).execute(text(sql), params)
+        for row in sonuc:
+            yield row
+
+def _deger(deger):
+    if isinstance(deger, Decimal):
+        return float(deger)
+    if isinstance(deger, (date, datetime)):
+        return deger.isoformat()
+    return deger
+
+def _geojsonseq(where_sql: str, params: dict, kolonlar: dict[str, str], risk: bool, tum_alanlar: bool) -> Iterator[bytes]:
+    # Feature JSON'u doğrudan Postgres'te üretilir; Python yalnızca satırları aktarır
+    ozellikler = "(to_jsonb(y) - 'geom')"
+    if not tum_alanlar:
+        ozellikler = """(
+            SELECT COALESCE(jsonb_object_agg(key, value), '{}'::jsonb)
+            FROM jsonb_each(to_jsonb(y) - 'geom')
+            WHERE key = ANY(:alanlar)
+        )"""
+        params = {**params, "alanlar": list(kolonlar)}
+    if risk:
+        ozellikler += f" || jsonb_build_object('RISKSKORU', {deprem_riski_sql('y.')})"
+    sql = f"""
+        SELECT json_build_object(
+            'type', 'Feature',
+            'geometry', ST_AsGeoJSON(ST_Transform(y.geom, 4326))::json,
+            'properties', {ozellikler}
+        )::text
+        FROM "YAPI" y
+        WHERE {where_sql}
+    """
+    tampon = []
+    for (feature,) in _satirlar(sql, params):
+        # RFC 8142: her kayıt RS (0x1E) ile başlar, satır sonu ile biter
+        tampon.append(f"\x1e{feature}\n")
+        if len(tampon) >= PARCA_BOYUTU:
+            yield "".join(tampon).encode("utf-8")
+            tampon = []
+    if tampon:
+        yield "".join(tampon).encode("utf-8")
+
+def bina_geojsonseq(where_sql: str, params: dict) -> Iterator[bytes]:
+    """
+    WHERE ifadesine uyan binaları tüm alanları ve RISKSKORU ile GeoJSONSeq olarak akıtır.
+
+    where_sql, filtre_sql_olustur(..., "y") ile üretilmiş olmalıdır.
+    """
+    return _geojsonseq(where_sql, params, {}, True, True)
+
+def _secim_sql(where_sql: str, kolonlar: dict[str, str], risk: bool, geometri_sql: str, kaynak: str = '"YAPI" y') -> str:
+    secilen = [f'y."{ad}"' for ad in kolonlar]
+    if risk:
+        secilen.append(f'{deprem_riski_sql("y.")} AS "RISKSKORU"')
+    secilen.append(geometri_sql)
+    return f"""
+        SELECT {", ".join(secilen)}
+        FROM {kaynak}
+        WHERE {where_sql}
+    """
+
+def _csv(where_sql: str, params: dict, kolonlar: dict[str, str], risk: bool) -> Iterator[bytes]:
+    basliklar = list(kolonlar) + (["RISKSKORU"] if risk else []) + ["WKT"]
+    sql = _secim_sql(where_sql, kolonlar, risk, "ST_AsText(ST_Transform(y.geom, 4326))")
+
+    tampon = io.StringIO()
+    yazici = csv.writer(tampon)
+    # Excel'in Türkçe karakterleri doğru açması için UTF-8 BOM
+    tampon.write("\ufeff")
+    yazici.writerow(basliklar)
+    for index, row in enumerate(_satirlar(sql, params), start=1):
+        yazici.writerow([_deger(deger) for deger in row])
+        if index % PARCA_BOYUTU == 0:
+            yield tampon.getvalue().encode("utf-8")
+            tampon.seek(0)
+            tampon.truncate()
+    yield tampon.getvalue().encode("utf-8")
+
+def _gpkg_tipi(veri_tipi: str) -> str:
+    if veri_tipi in ("smallint", "integer", "bigint", "boolean"):
+        return "INTEGER"
+    if veri_tipi in ("numeric", "real", "double precision"):
+        return "REAL"
+    return "TEXT"
+
+def _gpkg_geometri(wkb: Optional[bytes], minx, maxx, miny, maxy) -> Optional[bytes]:
+    """ISO WKB'yi GeoPackage geometri blob'una çevirir: 'GP' başlığı, SRS ID ve xy zarfı"""
+    if wkb is None:
+        return None
+    # Bayraklar: little-endian (bit 0) ve xy zarfı (zarf kodu 1, bit 1-3)
+    baslik = b"GP" + bytes([0, 0b00000011]) + struct.pack("<i", 4326)
+    return baslik + struct.pack("<4d", minx, maxx, miny, maxy) + bytes(wkb)
+
+def _gpkg_dosyasi_yaz(dosya: str, alan_tipleri: dict[str, str], geometri_tipi: str, satirlar: Iterator) -> int:
+    """
+    Satırları GeoPackage 1.3 dosyasına yazar ve satır sayısını döndürür.
+
+    Her satır alan değerleri ve ardından (wkb, minx, maxx, miny, maxy) içerir.
+    """
+    sqlite = sqlite3.connect(dosya)
+    try:
+        sqlite.execute(f"PRAGMA application_id = {GPKG_APPLICATION_ID}")
+        sqlite.execute(f"PRAGMA user_version = {GPKG_USER_VERSION}")
+        sqlite.executescript("""
+            CREATE TABLE gpkg_spatial_ref_sys (
+                srs_name TEXT NOT NULL, srs_id INTEGER PRIMARY KEY, organization TEXT NOT NULL,
+                organization_coordsys_id INTEGER NOT NULL, definition TEXT NOT NULL, description TEXT
+            );
+            INSERT INTO gpkg_spatial_ref_sys VALUES
+                ('Undefined cartesian SRS', -1, 'NONE', -1, 'undefined', NULL),
+                ('Undefined geographic SRS', 0, 'NONE', 0, 'undefined', NULL),
+                ('WGS 84 geodetic', 4326, 'EPSG', 4326,
+                 'GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,298.257223563,AUTHORITY["EPSG","7030"]],AUTHORITY["EPSG","6326"]],PRIMEM["Greenwich",0,AUTHORITY["EPSG","8901"]],UNIT["degree",0.0174532925199433,AUTHORITY["EPSG","9122"]],AUTHORITY["EPSG","4326"]]',
+                 NULL);
+            CREATE TABLE gpkg_contents (
+                table_name TEXT NOT NULL PRIMARY KEY, data_type TEXT NOT NULL, identifier TEXT UNIQUE,
+                description TEXT DEFAULT '', last_change DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
+                min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE,
+                srs_id INTEGER REFERENCES gpkg_spatial_ref_sys(srs_id)
+            );
+            CREATE TABLE gpkg_geometry_columns (
+                table_name TEXT NOT NULL, column_name TEXT NOT NULL, geometry_type_name TEXT NOT NULL,
+                srs_id INTEGER NOT NULL, z TINYINT NOT NULL, m TINYINT NOT NULL,
+                CONSTRAINT pk_geom_cols PRIMARY KEY (table_name, column_name)
+            );
+        """)
+        alan_listesi = [f'"{ad}"' for ad in alan_tipleri]
+        alan_tanimlari = "".join(f', "{ad}" {tip}' for ad, tip in alan_tipleri.items())
+        sqlite.execute(f'CREATE TABLE "{GPKG_TABLO}" (fid INTEGER PRIMARY KEY AUTOINCREMENT, geom BLOB{alan_tanimlari})')
+        sqlite.execute(
+            "INSERT INTO gpkg_contents (table_name, data_type, identifier, srs_id) VALUES (?, 'features', ?, 4326)",
+            (GPKG_TABLO, GPKG_TABLO)
+        )
+        sqlite.execute(
+            "INSERT INTO gpkg_geometry_columns VALUES (?, 'geom', ?, 4326, 0, 0)",
+            (GPKG_TABLO, geometri_tipi)
+        )
+
+        ekle = (
+            f'INSERT INTO "{GPKG_TABLO}" ({", ".join(alan_listesi + ["geom"])}) '
+            f'VALUES ({", ".join("?" for _ in range(len(alan_listesi) + 1))})'
+        )
+        alan_sayisi = len(alan_listesi)
+        zarf = [float("inf"), float("inf"), float("-inf"), float("-inf")]
+        parca = []
+        satir_sayisi = 0
+        for row in satirlar:
+            wkb, minx, maxx, miny, maxy = row[alan_sayisi:]
+            parca.append([_deger(deger) for deger in row[:alan_sayisi]] + [_gpkg_geometri(wkb, minx, maxx, miny, maxy)])
+            if wkb is not None:
+                zarf = [min(zarf[0], minx), min(zarf[1], miny), max(zarf[2], maxx), max(zarf[3], maxy)]
+            if len(parca) >= PARCA_BOYUTU:
+                sqlite.executemany(ekle, parca)
+                satir_sayisi += len(parca)
+                parca = []
+        if parca:
+            sqlite.executemany(ekle, parca)
+            satir_sayisi += len(parca)
+
+        if satir_sayisi and zarf[0] != float("inf"):
+            sqlite.execute(
+                "UPDATE gpkg_contents SET min_x = ?, min_y = ?, max_x = ?, max_y = ? WHERE table_name = ?",
+                (*zarf, GPKG_TABLO)
+            )
+        sqlite.commit()
+    finally:
+        sqlite.close()
+    return satir_sayisi
+
+def _gpkg_yaz(dosya: str, where_sql: str, params: dict, kolonlar: dict[str, str], risk: bool) -> int:
+    with engine.connect() as conn:
+        geometri_tipi = conn.execute(text("""
+            SELECT upper(type) FROM geometry_columns
+            WHERE f_table_schema = 'public' AND f_table_name = 'YAPI' AND f_geometry_column = 'geom'
+        """)).scalar() or "GEOMETRY"
+
+    alan_tipleri = {ad: _gpkg_tipi(tip) for ad, tip in kolonlar.items()}
+    if risk:
+        alan_tipleri["RISKSKORU"] = "INTEGER"
+
+    sql = _secim_sql(
+        where_sql, kolonlar, risk,
+        "ST_AsBinary(g, 'NDR'), ST_XMin(g), ST_XMax(g), ST_YMin(g), ST_YMax(g)",
+        kaynak='"YAPI" y CROSS JOIN LATERAL ST_Transform(y.geom, 4326) AS g'
+    )
+    return _gpkg_dosyasi_yaz(dosya, alan_tipleri, geometri_tipi, _satirlar(sql, params))
+
+@router.post("/bina/export")
+async def export_buildings(istek: BinaDisaAktarimIstegi):
+    """
+    Bina görünümüyle aynı filtrelere uyan binaları dışa aktarır.
+
+    - `geojsonseq`: RFC 8142 GeoJSON metin dizisi, akış olarak
+    - `csv`: öznitelikler ve EPSG:4326 WKT geometri, akış olarak
+    - `gpkg`: GeoPackage dosyası
+    - `fields` verilirse yalnızca bu kolonlar yazılır; "RISKSKORU" hesaplanan bir alandır
+    """
+    try:
+        where_sql, params = filtre_sql_olustur(istek, "y")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    kolonlar = await run_in_threadpool(_kolonlari_sec, istek)
+    risk = istek.fields is None or "RISKSKORU" in istek.fields
+    dosya_adi = f"binalar-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    print(f"📤 Dışa aktarım başlatıldı: format={istek.format}, filtre={where_sql}")
+
+    if istek.format == "gpkg":
+        fd, gecici = tempfile.mkstemp(suffix=".gpkg")
+        os.close(fd)
+        try:
+            satir_sayisi = await run_in_threadpool(_gpkg_yaz, gecici, where_sql, params, kolonlar, risk)
+        except Exception as e:
+            if os.path.exists(gecici):
+                os.remove(gecici)
+            raise HTTPException(status_code=500, detail=f"🔥 GeoPackage oluşturulamadı: {str(e)}")
+        print(f"📦 GeoPackage hazır: {satir_sayisi} bina")
+        return FileResponse(
+            gecici,
+            media_type="application/geopackage+sqlite3",
+            filename=f"{dosya_adi}.gpkg",
+            background=BackgroundTask(os.remove, gecici)
+        )
+
+    if istek.format == "csv":
+        return StreamingResponse(
+            _csv(where_sql, params, kolonlar, risk),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": f'attachment; filename="{dosya_adi}.csv"'}
+        )
+
+    return StreamingResponse(
+        _geojsonseq(where_sql, params, kolonlar, risk, istek.fields is None),
+        media_type="application/geo+json-seq",
+        headers={"Content-Disposition": f'attachment; filename="{dosya_adi}.geojsons"'}
+    )
@@ -0,0 +1,123 @@
+"""
+YAPI tablosu için ortak bina filtresi.
+
+AIBuildingFilter'ın çıkardığı parametreleri (zeminustu, tip, durum, seragazi,
+deprem_riski) ve isteğe bağlı bir mekânsal kapsamı parametreli bir SQL WHERE
+ifadesine çevirir. Sunucu tarafı güncelleme, dışa aktarım ve filtre uygulama
+uç noktaları aynı derleyiciyi kullanır.
+"""
+from typing import Optional, Dict, Any, Tuple
+from pydantic import BaseModel
+from maks.deprem_risk import deprem_riski_sql
+
+# Sorgu içindeki YAPI geometrisinin SRID'si; Find_SRID STABLE olduğu için
+# planlayıcı bunu bir kez hesaplar ve geom üzerindeki GiST indeksi kullanılabilir
+YAPI_SRID_SQL = "Find_SRID('public', 'YAPI', 'geom')"
+
+# Seragazı sınıfı harfleri ve güncelleme sorgularında kullanılan sayısal kodlar
+SERAGAZI_KODLARI = {"A": 1, "B": 2, "C": 3, "D": 4, "E": 5, "F": 6, "G": 7}
+
+class BinaFiltresi(BaseModel):
+    zeminustu: Optional[int] = None  # En az zemin üstü kat sayısı
+    zeminalti: Optional[int] = None  # En az zemin altı kat sayısı
+    durum: Optional[str] = None  # 1=Mevcut, 2=Yıkılmış
+    tip: Optional[str] = None  # 1=Konut, 2=Ticari, 3=Karma, 4=Diğer
+    seragazi: Optional[str] = None  # A-G
+    deprem_riski: Optional[str] = None  # 1-5, RISKSKORU ile aynı ölçek
+
+    # Mekânsal kapsam: ya bbox (minx, miny, maxx, maxy; EPSG:4326) ya da merkez + yarıçap
+    bbox: Optional[list[float]] = None
+    lon: Optional[float] = None
+    lat: Optional[float] = None
+    radius: Optional[float] = None  # metre
+
+    def bos_mu(self) -> bool:
+        """Hiçbir öznitelik ya da mekânsal kısıt verilmemişse True döner"""
+        return all(
+            getattr(self, alan) in (None, "")
+            for alan in ["zeminustu", "zeminalti", "durum", "tip", "seragazi", "deprem_riski", "bbox", "radius"]
+        )
+
+def filtre_sql_olustur(filtre: BinaFiltresi, tablo: str = "") -> Tuple[str, Dict[str, Any]]:
+    """
+    Filtreyi parametreli bir WHERE ifadesine çevirir.
+
+    Args:
+        filtre: Bina filtresi
+        tablo: Kolonların önüne eklenecek tablo takma adı (ör. "y"); boşsa eklenmez
+
+    Returns:
+        (where_sql, params) ikilisi; filtre boşsa where_sql "TRUE" olur
+
+    Raises:
+        ValueError: Filtre değerleri geçersizse
+    """
+    onek = f"{tablo}." if tablo else ""
+    kosullar = []
+    params: Dict[str, Any] = {}
+
+    def kolon(ad: str) -> str:
+        return f'{onek}"{ad}"'
+
+    if filtre.zeminustu not in (None, ""):
+        kosullar.append(f"{kolon('ZEMINUSTUKATSAYISI')} >= :f_zeminustu")
+        params["f_zeminustu"] = int(filtre.zeminustu)
+
+    if filtre.zeminalti not in (None, ""):
+        kosullar.append(f"{kolon('ZEMINALTIKATSAYISI')} >= :f_zeminalti")
+        params["f_zeminalti"] = int(filtre.zeminalti)
+
+    if filtre.durum not in (None, ""):
+        kosullar.append(f"{kolon('DURUM')} = :f_durum")
+        params["f_durum"] = _tam_sayi(filtre.durum, "durum", 1, 2)
+
+    if filtre.tip not in (None, ""):
+        kosullar.append(f"{kolon('TIP')} = :f_tip")
+        params["f_tip"] = _tam_sayi(filtre.tip, "tip", 1, 4)
+
+    if filtre.seragazi not in (None, ""):
+        harf = str(filtre.seragazi).strip().upper()
+        if harf not in SERAGAZI_KODLARI:
+            raise ValueError(f"Geçersiz seragazı sınıfı: {filtre.seragazi}")
+        # Arayüz sınıfı harf olarak, güncelleme sorguları sayısal kod olarak yazıyor; ikisi de eşleşsin
+        kosullar.append(f"{kolon('SERAGAZEMISYONSINIF')}::text IN (:f_seragazi_harf, :f_seragazi_kod)")
+        params["f_seragazi_harf"] = harf
+        params["f_seragazi_kod"] = str(SERAGAZI_KODLARI[harf])
+
+    if filtre.deprem_riski not in (None, ""):
+        kosullar.append(f"{deprem_riski_sql(onek)} = :f_deprem_riski")
+        params["f_deprem_riski"] = _tam_sayi(filtre.deprem_riski, "deprem_riski", 1, 5)
+
+    geom = f"{onek}geom"
+    if filtre.bbox is not None:
+        if len(filtre.bbox) != 4:
+            raise ValueError("bbox dört değer içermelidir: minx, miny, maxx, maxy")
+        kosullar.append(
+            f"ST_Intersects({geom}, ST_Transform(ST_MakeEnvelope(:f_minx, :f_miny, :f_maxx, :f_maxy, 4326), {YAPI_SRID_SQL}))"
+        )
+        params.update(dict(zip(["f_minx", "f_miny", "f_maxx", "f_maxy"], map(float, filtre.bbox))))
+
+    if filtre.radius is not None:
+        if filtre.lon is None or filtre.lat is None:
+            raise ValueError("Yarıçap filtresi için lon ve lat gereklidir")
+        nokta = "ST_SetSRID(ST_MakePoint(:f_lon, :f_lat), 4326)::geography"
+        # && ön filtresi indeksi kullanır; kesin kontrol /maks/bina ile aynı ST_DWithin ifadesidir
+        kosullar.append(
+            f"{geom} && ST_Transform(ST_Buffer({nokta}, :f_radius * 1.01)::geometry, {YAPI_SRID_SQL})"
+        )
+        kosullar.append(f"ST_DWithin(ST_Transform({geom}, 4326)::geography, {nokta}, :f_radius)")
+        params.update({"f_lon": float(filtre.lon), "f_lat": float(filtre.lat), "f_radius": float(filtre.radius)})
+
+    if not kosullar:
+        return "TRUE", params
+
+    return " AND ".join(kosullar), params
+
+def _tam_sayi(deger: Any, alan: str, en_az: int, en_cok: int) -> int:
+    try:
+        sayi = int(deger)
+    except (TypeError, ValueError):
+        raise ValueError(f"Geçersiz {alan} değeri: {deger}")
+    if not en_az <= sayi <= en_cok:
+        raise ValueError(f"{alan} {en_az}-{en_cok} aralığında olmalıdır: {deger}")
+    return sayi
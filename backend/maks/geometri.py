@@ -0,0 +1,295 @@
+"""
+YAPI geometrilerinin toplu geçerlilik kontrolü ve onarımı.
+
+Tablo "ID" aralıklarına bölünür (ntile); her bölüm ayrı bir veritabanı
+bağlantısı kullanan bir işçi tarafından parça parça taranır, böylece ST_IsValid
+hesabı birden fazla Postgres sürecine dağılır. Geçersiz geometriler
+ST_MakeValid ile onarılıp "YAPI_GEOM_ONARIM" tablosuna yazılır; canlı geometriye
+dokunulmaz. Her parçadan sonra bölümün kaldığı yer kaydedildiği için yarıda
+kalan bir tarama yeniden başlatıldığında kaldığı yerden devam eder.
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal, get_db
+from maks.jobs import Job, submit_job
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+DEFAULT_ISCI_SAYISI = 4
+DEFAULT_PARCA_BOYUTU = 2000
+
+KURULUM_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS public."YAPI_GEOM_TARAMA" (
+        tarama_id text NOT NULL,
+        bolum integer NOT NULL,
+        alt_id text NOT NULL,           -- bölümün ilk "ID"si (dahil); tipi "YAPI"."ID" ile eşlenir
+        ust_id text NOT NULL,           -- bölümün son "ID"si (dahil)
+        son_id text,                    -- işlenen son "ID"; devam etme noktası
+        kontrol_edilen integer NOT NULL DEFAULT 0,
+        gecersiz integer NOT NULL DEFAULT 0,
+        tamamlandi boolean NOT NULL DEFAULT false,
+        olusturma timestamptz NOT NULL DEFAULT now(),
+        guncelleme timestamptz NOT NULL DEFAULT now(),
+        PRIMARY KEY (tarama_id, bolum)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS public."YAPI_GEOM_ONARIM" (
+        yapi_id text PRIMARY KEY,
+        tarama_id text NOT NULL,
+        sebep text,                     -- ST_IsValidReason
+        onarilmis geometry,             -- ST_MakeValid sonucu, "YAPI".geom ile aynı SRID
+        onarilmis_gecerli boolean,
+        tip_degisti boolean,            -- ör. Polygon -> GeometryCollection
+        kontrol timestamptz NOT NULL DEFAULT now()
+    )
+    """,
+]
+
+class GeometriTaramaIstegi(BaseModel):
+    workers: int = DEFAULT_ISCI_SAYISI
+    batch_size: int = DEFAULT_PARCA_BOYUTU
+    restart: bool = False  # True ise yarım kalan tarama yerine yenisi başlar
+
+def kur(db: Session) -> None:
+    for sql in KURULUM_SQL:
+        db.execute(text(sql))
+    _sinir_tipini_esle(db)
+    db.commit()
+
+def _kolon_tipi(db: Session, tablo: str, kolon: str) -> str:
+    return db.execute(text("""
+        SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+        WHERE attrelid = to_regclass(:tablo) AND attname = :kolon
+    """), {"tablo": tablo, "kolon": kolon}).scalar()
+
+def _sinir_tipini_esle(db: Session) -> None:
+    """
+    Bölüm sınırlarını "YAPI"."ID" ile aynı tipte tutar; böylece tarama sorguları
+    "ID" kolonunu olduğu gibi karşılaştırır ve birincil anahtar indeksini kullanır
+    """
+    id_tipi = _kolon_tipi(db, 'public."YAPI"', "ID")
+    if id_tipi is None or id_tipi == _kolon_tipi(db, 'public."YAPI_GEOM_TARAMA"', "alt_id"):
+        return
+    # Tipi farklı bir tablo için bölünmüş taramalardan devam edilemez
+    db.execute(text('DELETE FROM public."YAPI_GEOM_TARAMA"'))
+    for kolon in ("alt_id", "ust_id", "son_id"):
+        db.execute(text(f'ALTER TABLE public."YAPI_GEOM_TARAMA" ALTER COLUMN {kolon} TYPE {id_tipi} USING NULL'))
+
+def _yarim_tarama(db: Session) -> Optional[str]:
+    return db.execute(text("""
+        SELECT tarama_id FROM public."YAPI_GEOM_TARAMA"
+        GROUP BY tarama_id
+        HAVING NOT bool_and(tamamlandi)
+        ORDER BY min(olusturma) DESC
+        LIMIT 1
+    """)).scalar()
+
+def _tarama_olustur(db: Session, bolum_sayisi: int) -> str:
+    """Tabloyu "ID" sırasına göre eşit büyüklükte bölümlere ayırır"""
+    tarama_id = str(uuid.uuid4())
+    db.execute(text("""
+        INSERT INTO public."YAPI_GEOM_TARAMA" (tarama_id, bolum, alt_id, ust_id)
+        SELECT :tarama_id, bolum, min("ID"), max("ID")
+        FROM (
+            SELECT "ID", ntile(:bolum_sayisi) OVER (ORDER BY "ID") AS bolum
+            FROM public."YAPI"
+        ) b
+        GROUP BY bolum
+    """), {"tarama_id": tarama_id, "bolum_sayisi": bolum_sayisi})
+    # Önceki taramaların sonuçları artık güncel değil
+    db.execute(text('DELETE FROM public."YAPI_GEOM_ONARIM" WHERE tarama_id <> :tarama_id'), {"tarama_id": tarama_id})
+    db.execute(text('DELETE FROM public."YAPI_GEOM_TARAMA" WHERE tarama_id <> :tarama_id'), {"tarama_id": tarama_id})
+    db.commit()
+    return tarama_id
+
+def _bolum_tara(job: Job, tarama_id: str, bolum: int, parca_boyutu: int, on_progress) -> None:
+    """Bir bölümü kaldığı yerden sonuna kadar tarar; her parça kendi transaction'ında kaydedilir"""
+    db = SessionLocal()
+    try:
+        kayit = db.execute(text("""
+            SELECT alt_id, ust_id, son_id FROM public."YAPI_GEOM_TARAMA"
+            WHERE tarama_id = :tarama_id AND bolum = :bolum
+        """), {"tarama_id": tarama_id, "bolum": bolum}).first()
+        # Sınırlar "ID" tipinde okunur ve o tipte geri bağlanır; "ID" dönüştürülmediği için
+        # aralık taraması ve sıralama birincil anahtar indeksinden gelir
+        alt_id, ust_id, son_id = kayit
+
+        while not job.cancel_requested:
+            baslangic = '"ID" >= :alt' if son_id is None else '"ID" > :son'
+            ids = db.execute(text(f"""
+                SELECT "ID" FROM public."YAPI"
+                WHERE {baslangic} AND "ID" <= :ust
+                ORDER BY "ID"
+                LIMIT :limit
+            """), {"alt": alt_id, "ust": ust_id, "son": son_id, "limit": parca_boyutu}).scalars().all()
+            if not ids:
+                break
+
+            gecersiz = db.execute(text("""
+                INSERT INTO public."YAPI_GEOM_ONARIM"
+                    (yapi_id, tarama_id, sebep, onarilmis, onarilmis_gecerli, tip_degisti)
+                SELECT g.id, :tarama_id, g.sebep, g.onarilmis, ST_IsValid(g.onarilmis),
+                       GeometryType(g.onarilmis) <> GeometryType(g.geom)
+                FROM (
+                    SELECT "ID"::text AS id, geom, ST_IsValidReason(geom) AS sebep, ST_MakeValid(geom) AS onarilmis
+                    FROM public."YAPI"
+                    WHERE "ID" >= :ilk AND "ID" <= :son AND NOT ST_IsValid(geom)
+                ) g
+                ON CONFLICT (yapi_id) DO UPDATE SET
+                    tarama_id = EXCLUDED.tarama_id, sebep = EXCLUDED.sebep, onarilmis = EXCLUDED.onarilmis,
+                    onarilmis_gecerli = EXCLUDED.onarilmis_gecerli, tip_degisti = EXCLUDED.tip_degisti,
+                    kontrol = now()
+            """), {"tarama_id": tarama_id, "ilk": ids[0], "son": ids[-1]}).rowcount
+
+            son_id = ids[-1]
+            db.execute(text("""
+                UPDATE public."YAPI_GEOM_TARAMA"
+                SET son_id = :son, kontrol_edilen = kontrol_edilen + :n, gecersiz = gecersiz + :gecersiz,
+                    guncelleme = now()
+                WHERE tarama_id = :tarama_id AND bolum = :bolum
+            """), {"son": son_id, "n": len(ids), "gecersiz": gecersiz, "tarama_id": tarama_id, "bolum": bolum})
+            db.commit()
+            on_progress(len(ids))
+
+        if not job.cancel_requested:
+            db.execute(text("""
+                UPDATE public."YAPI_GEOM_TARAMA" SET tamamlandi = true, guncelleme = now()
+                WHERE tarama_id = :tarama_id AND bolum = :bolum
+            """), {"tarama_id": tarama_id, "bolum": bolum})
+            db.commit()
+    finally:
+        db.close()
+
+def geometri_tara(job: Job, db: Session, isci_sayisi: int, parca_boyutu: int, yeniden: bool) -> Dict[str, Any]:
+    kur(db)
+    tarama_id = None if yeniden else _yarim_tarama(db)
+    devam = tarama_id is not None
+    if tarama_id is None:
+        tarama_id = _tarama_olustur(db, isci_sayisi)
+
+    bolumler = db.execute(text("""
+        SELECT bolum FROM public."YAPI_GEOM_TARAMA"
+        WHERE tarama_id = :tarama_id AND NOT tamamlandi
+        ORDER BY bolum
+    """), {"tarama_id": tarama_id}).scalars().all()
+    toplam, islenen = db.execute(text("""
+        SELECT (SELECT count(*) FROM public."YAPI"), COALESCE(sum(kontrol_edilen), 0)
+        FROM public."YAPI_GEOM_TARAMA" WHERE tarama_id = :tarama_id
+    """), {"tarama_id": tarama_id}).first()
+    db.commit()
+    logger.info(f"Geometry scan {tarama_id}: {'resuming' if devam else 'starting'} {len(bolumler)} partitions")
+
+    durum = {"islenen": int(islenen)}
+    durum_kilidi = threading.Lock()
+
+    def on_progress(n: int):
+        # İşçi thread'lerinden çağrılır; iptal kontrolü ana thread'de yapılır
+        with durum_kilidi:
+            durum["islenen"] += n
+            job.progress = round(min(1.0, durum["islenen"] / toplam), 4) if toplam else 1.0
+            job.message = f"{durum['islenen']}/{toplam} geometri kontrol edildi"
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, len(bolumler)), thread_name_prefix="geom-tarama") as havuz:
+        isler = [havuz.submit(_bolum_tara, job, tarama_id, bolum, parca_boyutu, on_progress) for bolum in bolumler]
+        for is_ in isler:
+            is_.result()
+    job.check_cancelled()
+
+    ozet = tarama_ozeti(db, tarama_id)
+    return {
+        "message": f"✅ Geometri taraması tamamlandı: {ozet['invalid']} geçersiz geometri",
+        "resumed": devam,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        **ozet,
+    }
+
+def tarama_ozeti(db: Session, tarama_id: Optional[str] = None, ornek: int = 20) -> Dict[str, Any]:
+    if tarama_id is None:
+        tarama_id = db.execute(text("""
+            SELECT tarama_id FROM public."YAPI_GEOM_TARAMA" ORDER BY olusturma DESC LIMIT 1
+        """)).scalar()
+        if tarama_id is None:
+            return {"scan_id": None}
+
+    bolumler = db.execute(text("""
+        SELECT bolum, alt_id, ust_id, kontrol_edilen, gecersiz, tamamlandi, guncelleme
+        FROM public."YAPI_GEOM_TARAMA" WHERE tarama_id = :tarama_id ORDER BY bolum
+    """), {"tarama_id": tarama_id}).mappings().all()
+    sonuc = db.execute(text("""
+        SELECT count(*) AS gecersiz,
+               count(*) FILTER (WHERE onarilmis_gecerli) AS onarilan,
+               count(*) FILTER (WHERE tip_degisti) AS tip_degisen
+        FROM public."YAPI_GEOM_ONARIM" WHERE tarama_id = :tarama_id
+    """), {"tarama_id": tarama_id}).mappings().first()
+    # "Self-intersection[27.1 39.6]" -> "Self-intersection"
+    sebepler = db.execute(text("""
+        SELECT split_part(sebep, '[', 1) AS sebep, count(*) AS sayi
+        FROM public."YAPI_GEOM_ONARIM" WHERE tarama_id = :tarama_id
+        GROUP BY 1 ORDER BY 2 DESC
+    """), {"tarama_id": tarama_id}).fetchall()
+    ornekler = db.execute(text("""
+        SELECT yapi_id, sebep, onarilmis_gecerli, tip_degisti
+        FROM public."YAPI_GEOM_ONARIM" WHERE tarama_id = :tarama_id
+        ORDER BY yapi_id LIMIT :ornek
+    """), {"tarama_id": tarama_id, "ornek": ornek}).mappings().all()
+
+    return {
+        "scan_id": tarama_id,
+        "completed": all(bolum["tamamlandi"] for bolum in bolumler),
+        "checked": sum(bolum["kontrol_edilen"] for bolum in bolumler),
+        "invalid": sonuc["gecersiz"],
+        "repaired_valid": sonuc["onarilan"],
+        "type_changed": sonuc["tip_degisen"],
+        "reasons": {sebep: sayi for sebep, sayi in sebepler},
+        "partitions": [dict(bolum) for bolum in bolumler],
+        "samples": [dict(row) for row in ornekler],
+    }
+
+@router.post("/yapi/geometry/validate", status_code=202)
+async def validate_geometries(istek: GeometriTaramaIstegi):
+    """
+    Geometri geçerlilik taramasını başlatır; yarım kalmış bir tarama varsa ondan devam eder.
+
+    Onarılmış geometriler "YAPI_GEOM_ONARIM" tablosuna yazılır, "YAPI" değişmez.
+    """
+    if not 1 <= istek.workers <= 16:
+        raise HTTPException(status_code=400, detail="workers 1-16 aralığında olmalıdır")
+    # "YAPI" işleriyle aynı kuyrukta çalışır; tarama sürerken geri yükleme ya da
+    # içe aktarma tabloyu değiştiremez
+    job = submit_job(
+        "geometry-validate", "YAPI", geometri_tara,
+        istek.workers, max(1, istek.batch_size), istek.restart
+    )
+    return {"message": "⏳ Geometri taraması başlatıldı", "job": job.to_dict()}
+
+@router.get("/yapi/geometry/summary")
+async def geometry_summary(
+    scan_id: Optional[str] = Query(None, description="Boşsa en son tarama"),
+    samples: int = Query(20),
+    db: Session = Depends(get_db)
+):
+    """Son (ya da verilen) taramanın ilerlemesi, geçersizlik sebepleri ve örnek binalar"""
+    kurulu = db.execute(text("""SELECT to_regclass('public."YAPI_GEOM_TARAMA"') IS NOT NULL""")).scalar()
+    if not kurulu:
+        return {"scan_id": None}
+    ozet = tarama_ozeti(db, scan_id, samples)
+    if scan_id and not ozet["partitions"]:
+        raise HTTPException(status_code=404, detail="Tarama bulunamadı")
+    return ozet
@@ -0,0 +1,481 @@
+"""
+MAKS teslimatlarının (GeoPackage / Shapefile) "YAPI" tablosuna toplu aktarımı.
+
+Kaynak parça parça okunur. Her parça bir işçi sürece gönderilir; işçi geometrileri
+onarır, hedef SRID'ye dönüştürür, RISKSKORU'nu vektörel olarak hesaplar ve parçayı
+COPY metin formatına çevirir. Ana süreç hazır parçaları sırayla tek bir COPY akışına
+yazar. Yükleme ara tabloya yapılır, indeksler sonradan kurulur ve ara tablo
+`tablo_degistir` ile tek adımda "YAPI" yapılır.
+
+Komut satırından:
+    python -m maks.ingest teslimat.gpkg [--layer YAPI] [--workers 8]
+    python -m maks.ingest --benchmark 1000000 [--benchmark-source /tmp/sentetik.gpkg] [--benchmark-copy]
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, Optional, Iterator
+
+import numpy as np
+import pyogrio.raw
+import shapely
+from pyproj import Transformer
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal, dbapi_baglantisi
+from maks.deprem_risk import RISK_ALANLARI, hesapla_deprem_riski_vektorel
+from maks.restore import tablo_degistir
+
+AKTARIM_TABLOSU = "YAPI_AKTARIM"
+DEFAULT_PARCA_BOYUTU = 50000
+TAM_SAYI_TIPLERI = {"smallint", "integer", "bigint"}
+
+class _CopyAkisi:
+    """Sıralı parça baytlarını copy_expert'in beklediği dosya arayüzüyle sunar"""
+
+    def __init__(self, parcalar: Iterator[bytes]):
+        self.parcalar = parcalar
+        self.tampon = b""
+
+    def read(self, boyut=-1):
+        while boyut < 0 or len(self.tampon) < boyut:
+            parca = next(self.parcalar, None)
+            if parca is None:
+                break
+            self.tampon += parca
+        if boyut < 0:
+            veri, self.tampon = self.tampon, b""
+        else:
+            veri, self.tampon = self.tampon[:boyut], self.tampon[boyut:]
+        return veri
+
+    readline = read
+
+@lru_cache(maxsize=8)
+def _donusturucu(kaynak_crs: str, hedef_crs: str) -> Transformer:
+    # Her işçi süreçte bir kez kurulur
+    return Transformer.from_crs(kaynak_crs, hedef_crs, always_xy=True)
+
+def _copy_degeri(deger) -> str:
+    if deger is None or (isinstance(deger, float) and deger != deger):
+        return "\\N"
+    return (
+        str(deger)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+def _copy_kolonu(ad: str, dizi: np.ndarray, tam_sayi: bool) -> list[str]:
+    """Bir kolonu COPY metin değerlerine çevirir; sayısal kolonlar satır döngüsü olmadan işlenir"""
+    if dizi.dtype.kind in "iu":
+        return dizi.astype(str).tolist()
+    if dizi.dtype.kind == "f":
+        bos = np.isnan(dizi)
+        if tam_sayi:
+            # Kesirli değer tam sayı kolonuna sessizce yuvarlanmaz; COPY'nin yarıda kalmaması için burada reddedilir
+            dolu = dizi[~bos]
+            with np.errstate(invalid="ignore"):
+                kesirli = ~np.isfinite(dolu) | (np.mod(dolu, 1) != 0)
+            if kesirli.any():
+                raise ValueError(
+                    f"{ad} tam sayı kolonu ama kaynakta kesirli değerler var "
+                    f"({int(kesirli.sum())} satır, ör. {dolu[kesirli][0]})"
+                )
+            metin = np.where(bos, 0, dizi).astype(np.int64).astype(str).astype(object)
+        else:
+            metin = dizi.astype(str).astype(object)
+        metin[bos] = "\\N"
+        return metin.tolist()
+    if dizi.dtype.kind == "M":
+        # pyogrio tarih/zaman alanlarını datetime64 verir; str() boş değeri "NaT" yazar ve COPY durur
+        bos = np.isnat(dizi)
+        metin = np.datetime_as_string(dizi).astype(object)
+        metin[bos] = "\\N"
+        return metin.tolist()
+    return [_copy_degeri(deger) for deger in dizi]
+
+def _poligonal_onar(geometriler: np.ndarray, coklu: bool) -> np.ndarray:
+    """
+    make_valid sonucunun yalnızca poligon parçalarını tutar. Onarım bir poligonu
+    GeometryCollection'a ya da çizgi/noktaya çevirebilir; bunlar kolona yazılamaz.
+    Poligon parçası kalmayan geometriler None olur ve parça işlenirken atılır.
+    """
+    onarilmis = shapely.make_valid(geometriler)
+    parcalar, sira = shapely.get_parts(onarilmis, return_index=True)
+    poligon = shapely.get_type_id(parcalar) == shapely.GeometryType.POLYGON
+    sonuc = np.empty(len(onarilmis), dtype=object)
+    shapely.multipolygons(parcalar[poligon], indices=sira[poligon], out=sonuc)
+    if not coklu:
+        # Tekil poligon kolonuna yalnızca tek parçalı sonuçlar sığar
+        tek = shapely.get_num_geometries(sonuc) == 1
+        sonuc[tek] = shapely.get_geometry(sonuc[tek], 0)
+        sonuc[~tek] = None
+    return sonuc
+
+def parca_isle(
+    wkb: np.ndarray,
+    alanlar: Dict[str, np.ndarray],
+    kaynak_crs: Optional[str],
+    hedef_srid: int,
+    coklu: bool,
+    tam_sayi_kolonlari: frozenset,
+    risk_kolonu: bool,
+) -> tuple[bytes, Dict[str, Any]]:
+    """
+    Bir parçayı işler ve COPY metin formatında satırlar döndürür (işçi süreçte çalışır).
+
+    Kolon sırası: `alanlar`ın anahtarları, (varsa) RISKSKORU, en sonda geom.
+    """
+    geometriler = shapely.from_wkb(wkb, on_invalid="ignore")
+
+    # 1. Geçersiz geometrileri onar, boş olanları at
+    gecersiz = ~shapely.is_valid(geometriler) & ~shapely.is_missing(geometriler)
+    if gecersiz.any():
+        geometriler[gecersiz] = _poligonal_onar(geometriler[gecersiz], coklu)
+    poligonal = shapely.get_type_id(geometriler) == shapely.GeometryType.POLYGON
+    if coklu and poligonal.any():
+        geometriler[poligonal] = shapely.multipolygons(
+            geometriler[poligonal], indices=np.arange(int(poligonal.sum()))
+        )
+    gecerli = ~shapely.is_missing(geometriler) & ~shapely.is_empty(geometriler)
+    geometriler = geometriler[gecerli]
+    alanlar = {ad: dizi[gecerli] for ad, dizi in alanlar.items()}
+
+    # 2. Hedef koordinat sistemine dönüştür
+    hedef_crs = f"EPSG:{hedef_srid}"
+    if kaynak_crs and kaynak_crs != hedef_crs:
+        donusturucu = _donusturucu(kaynak_crs, hedef_crs)
+        geometriler = shapely.transform(
+            geometriler, lambda xy: np.column_stack(donusturucu.transform(xy[:, 0], xy[:, 1]))
+        )
+    geometriler = shapely.set_srid(geometriler, hedef_srid)
+    ewkb = shapely.to_wkb(geometriler, hex=True, include_srid=True, output_dimension=2)
+
+    # 3. Risk skoru
+    skorlar = hesapla_deprem_riski_vektorel({ad: alanlar.get(ad) for ad in RISK_ALANLARI})
+
+    # 4. COPY metni
+    kolonlar = [_copy_kolonu(ad, dizi, ad in tam_sayi_kolonlari) for ad, dizi in alanlar.items()]
+    if risk_kolonu:
+        kolonlar.append(skorlar.astype(str).tolist())
+    kolonlar.append(ewkb.tolist())
+    satirlar = ["\t".join(satir) for satir in zip(*kolonlar)]
+    veri = ("\n".join(satirlar) + "\n").encode("utf-8") if satirlar else b""
+
+    istatistik = {
+        "okunan": len(wkb),
+        "yazilan": len(satirlar),
+        "onarilan": int(gecersiz.sum()),
+        "atilan": int((~gecerli).sum()),
+        "risk": Counter(int(skor) for skor in skorlar),
+    }
+    return veri, istatistik
+
+def kaynak_parcalari(
+    yol: str,
+    katman: Optional[str] = None,
+    parca_boyutu: int = DEFAULT_PARCA_BOYUTU
+) -> Iterator[tuple[np.ndarray, Dict[str, np.ndarray]]]:
+    """
+    Kaynağı (WKB dizisi, {alan: dizi}) parçaları olarak okur; tüm dosya belleğe alınmaz.
+
+    Dosya bir kez açılır ve parçalar aynı okuma imlecinden gelir. Her parça için
+    skip_features ile baştan konumlanmak, hızlı rastgele erişimi olmayan
+    sürücülerde (Shapefile, GeoJSON, filtreli GPKG) okumayı O(n²) yapar.
+    """
+    with pyogrio.raw.open_arrow(yol, layer=katman, batch_size=parca_boyutu, use_pyarrow=True) as (meta, okuyucu):
+        alan_adlari = list(meta["fields"])
+        for parca in okuyucu:
+            # Boş değerli tam sayı alanları NaN'lı float, tarih alanları datetime64 olarak gelir
+            kolonlar = {ad: parca.column(ad).to_numpy(zero_copy_only=False) for ad in parca.schema.names}
+            geometri_adi = next(ad for ad in parca.schema.names if ad not in alan_adlari)
+            yield kolonlar[geometri_adi], {ad: kolonlar[ad] for ad in alan_adlari}
+
+def _hedef_bilgisi(db: Session) -> Dict[str, Any]:
+    geom = db.execute(text("""
+        SELECT srid, upper(type) FROM geometry_columns
+        WHERE f_table_schema = 'public' AND f_table_name = 'YAPI' AND f_geometry_column = 'geom'
+    """)).first()
+    if geom is None:
+        raise RuntimeError('"YAPI".geom geometri kolonu bulunamadı')
+    kolonlar = db.execute(text("""
+        SELECT column_name, data_type FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = 'YAPI' AND is_generated = 'NEVER'
+    """)).fetchall()
+    return {"srid": geom[0], "tip": geom[1], "kolonlar": dict(kolonlar)}
+
+def _ara_tablo_hazirla(db: Session) -> list[str]:
+    """Ara tabloyu oluşturur ve yüklemeyi yavaşlatan indeksleri kaldırır; yeniden kurmak için tanımları döndürür"""
+    db.execute(text(f'DROP TABLE IF EXISTS public."{AKTARIM_TABLOSU}";'))
+    db.execute(text(f'CREATE TABLE public."{AKTARIM_TABLOSU}" (LIKE public."YAPI" INCLUDING ALL);'))
+    indeksler = db.execute(text("""
+        SELECT i.relname, pg_get_indexdef(x.indexrelid)
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = to_regclass(:tablo)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+    """), {"tablo": f'public."{AKTARIM_TABLOSU}"'}).fetchall()
+    for ad, _ in indeksler:
+        db.execute(text(f'DROP INDEX public."{ad}";'))
+    return [tanim for _, tanim in indeksler]
+
+def _sirali_sonuclar(havuz, parcalar, isle_argumanlari, en_fazla_bekleyen, istatistik):
+    """Parçaları havuza gönderir, sonuçları okuma sırasıyla verir; bellekte sınırlı sayıda parça tutar"""
+    bekleyen = deque()
+    for wkb, alanlar in parcalar:
+        bekleyen.append(havuz.submit(parca_isle, wkb, alanlar, *isle_argumanlari))
+        if len(bekleyen) >= en_fazla_bekleyen:
+            yield _topla(bekleyen.popleft().result(), istatistik)
+    while bekleyen:
+        yield _topla(bekleyen.popleft().result(), istatistik)
+
+def _topla(sonuc, istatistik):
+    veri, parca = sonuc
+    for anahtar in ("okunan", "yazilan", "onarilan", "atilan"):
+        istatistik[anahtar] += parca[anahtar]
+    istatistik["risk"].update(parca["risk"])
+    istatistik["parca"] += 1
+    print(f"  {istatistik['parca']}. parça: {istatistik['yazilan']} satır yazıldı")
+    return veri
+
+def aktar(
+    db: Session,
+    yol: str,
+    katman: Optional[str] = None,
+    parca_boyutu: int = DEFAULT_PARCA_BOYUTU,
+    isci_sayisi: Optional[int] = None,
+    kaynak_crs: Optional[str] = None,
+    degistir: bool = True,
+) -> Dict[str, Any]:
+    """
+    Bir GeoPackage/Shapefile'ı ara tabloya yükler ve (istenirse) "YAPI" ile yer değiştirir.
+
+    Kaynaktaki alanlar büyük/küçük harf duyarsız olarak "YAPI" kolonlarıyla eşleştirilir;
+    karşılığı olmayan alanlar raporlanır ve atlanır. "YAPI"da RISKSKORU kolonu varsa doldurulur.
+    """
+    isci_sayisi = isci_sayisi or os.cpu_count() or 1
+    hedef = _hedef_bilgisi(db)
+    bilgi = pyogrio.read_info(yol, layer=katman)
+    kaynak_crs = kaynak_crs or bilgi["crs"]
+
+    kolon_haritasi = {kolon.upper(): kolon for kolon in hedef["kolonlar"]}
+    eslesen = {alan: kolon_haritasi[alan.upper()] for alan in bilgi["fields"] if alan.upper() in kolon_haritasi}
+    eslesmeyen = [alan for alan in bilgi["fields"] if alan.upper() not in kolon_haritasi]
+    risk_kolonu = "RISKSKORU" in hedef["kolonlar"] and "RISKSKORU" not in eslesen.values()
+    tam_sayi_kolonlari = frozenset(
+        kolon for kolon, tip in hedef["kolonlar"].items() if tip in TAM_SAYI_TIPLERI
+    )
+
+    hedef_kolonlar = list(eslesen.values()) + (["RISKSKORU"] if risk_kolonu else []) + ["geom"]
+    kolon_listesi = ", ".join(f'"{kolon}"' for kolon in hedef_kolonlar)
+    copy_sql = f'COPY public."{AKTARIM_TABLOSU}" ({kolon_listesi}) FROM STDIN'
+
+    def parcalar():
+        # Alanlar hedef kolon adlarıyla gönderilir ki risk hesabı ve tip dönüşümü doğru kolonu bulsun
+        for wkb, alanlar in kaynak_parcalari(yol, katman, parca_boyutu):
+            yield wkb, {eslesen[alan]: dizi for alan, dizi in alanlar.items() if alan in eslesen}
+
+    isle_argumanlari = (kaynak_crs, hedef["srid"], hedef["tip"].startswith("MULTI"), tam_sayi_kolonlari, risk_kolonu)
+
+    istatistik = {"okunan": 0, "yazilan": 0, "onarilan": 0, "atilan": 0, "parca": 0, "risk": Counter()}
+    sureler = {}
+
+    started = time.perf_counter()
+    indeks_tanimlari = _ara_tablo_hazirla(db)
+    print(f"📥 {yol} ({bilgi['features']} kayıt, {kaynak_crs} -> EPSG:{hedef['srid']}), {isci_sayisi} işçi")
+    with ProcessPoolExecutor(max_workers=isci_sayisi) as havuz:
+        akis = _CopyAkisi(_sirali_sonuclar(havuz, parcalar(), isle_argumanlari, isci_sayisi * 2, istatistik))
+        with dbapi_baglantisi(db).cursor() as cursor:
+            cursor.copy_expert(copy_sql, akis, size=1024 * 1024)
+    sureler["yukleme_s"] = round(time.perf_counter() - started, 2)
+
+    adim = time.perf_counter()
+    for tanim in indeks_tanimlari:
+        db.execute(text(tanim))
+    db.execute(text(f'ANALYZE public."{AKTARIM_TABLOSU}";'))
+    db.commit()
+    sureler["indeks_s"] = round(time.perf_counter() - adim, 2)
+
+    if degistir:
+        adim = time.perf_counter()
+        tablo_degistir(db, AKTARIM_TABLOSU)
+        sureler["degisim_s"] = round(time.perf_counter() - adim, 2)
+
+    toplam_sure = time.perf_counter() - started
+    return {
+        "message": f"✅ {istatistik['yazilan']} bina aktarıldı" + ("" if degistir else f' ("{AKTARIM_TABLOSU}" tablosunda bekliyor)'),
+        "rows_read": istatistik["okunan"],
+        "rows_loaded": istatistik["yazilan"],
+        "geometries_repaired": istatistik["onarilan"],
+        "rows_dropped": istatistik["atilan"],
+        "risk_distribution": {str(skor): sayi for skor, sayi in sorted(istatistik["risk"].items())},
+        "unmatched_fields": eslesmeyen,
+        "timings": sureler,
+        "rows_per_sec": round(istatistik["yazilan"] / toplam_sure, 1) if toplam_sure else None,
+    }
+
+def sentetik_parcalar(satir_sayisi: int, parca_boyutu: int, tohum: int = 42):
+    """Edremit civarında rastgele bina poligonları ve MAKS öznitelikleri üretir (EPSG:4326)"""
+    rng = np.random.default_rng(tohum)
+    aciklamalar = np.array([None, "", "Güçlendirme gerekli", "Riskli yapı", "Uygun"], dtype=object)
+    for baslangic in range(0, satir_sayisi, parca_boyutu):
+        n = min(parca_boyutu, satir_sayisi - baslangic)
+        x = rng.uniform(26.90, 27.20, n)
+        y = rng.uniform(39.55, 39.65, n)
+        boyut = rng.uniform(0.00005, 0.0002, n)
+        kutular = shapely.box(x, y, x + boyut, y + boyut)
+        # Birkaç geçersiz (kendini kesen) geometri de olsun
+        bozuk = rng.random(n) < 0.001
+        kutular[bozuk] = shapely.polygons(np.stack([
+            np.column_stack([x[bozuk], y[bozuk]]),
+            np.column_stack([x[bozuk] + boyut[bozuk], y[bozuk] + boyut[bozuk]]),
+            np.column_stack([x[bozuk] + boyut[bozuk], y[bozuk]]),
+            np.column_stack([x[bozuk], y[bozuk] + boyut[bozuk]]),
+            np.column_stack([x[bozuk], y[bozuk]]),
+        ], axis=1))
+        alanlar = {
+            "ID": np.array([str(baslangic + i) for i in range(n)], dtype=object),
+            "BINAYASI": rng.integers(0, 80, n).astype(float),
+            "ZEMINUSTUKATSAYISI": rng.integers(1, 15, n).astype(float),
+            "TOPLAMYUKSEKLIK": rng.uniform(3, 45, n),
+            "YAPIKAYITBELGENO": np.where(rng.random(n) < 0.1, "YKB-1", None).astype(object),
+            "TESPITKARARACIKLAMA": aciklamalar[rng.integers(0, len(aciklamalar), n)],
+            "TIP": rng.integers(1, 5, n).astype(float),
+            "DURUM": rng.integers(1, 3, n).astype(float),
+        }
+        yield shapely.to_wkb(kutular), alanlar
+
+def _sentetik_dosya_yaz(yol: str, satir_sayisi: int, parca_boyutu: int) -> None:
+    """Sentetik binaları bir GeoPackage'a yazar; akış hâlinde okuma ölçümü için"""
+    if os.path.exists(yol):
+        os.remove(yol)
+    for index, (wkb, alanlar) in enumerate(sentetik_parcalar(satir_sayisi, parca_boyutu)):
+        pyogrio.raw.write(
+            yol, wkb, list(alanlar.values()), list(alanlar), driver="GPKG", layer="YAPI",
+            geometry_type="Polygon", crs="EPSG:4326", append=index > 0
+        )
+
+def _benchmark_copy(db: Session, akis: Iterator[bytes]) -> int:
+    """
+    COPY metnini bir ara tabloya yükler ve yüklenen bayt sayısını döndürür.
+
+    Tablo aktar()'daki gibi COPY ile aynı transaction'da oluşturulur. PostGIS yoksa
+    geom kolonu text olur; bu durumda EWKB ayrıştırma maliyeti ölçüme girmez.
+    """
+    postgis = db.execute(text("SELECT to_regtype('geometry') IS NOT NULL")).scalar()
+    geom_tipi = "geometry(MultiPolygon, 5254)" if postgis else "text"
+    db.execute(text('DROP TABLE IF EXISTS public."YAPI_AKTARIM_BENCHMARK"'))
+    db.execute(text(f"""
+        CREATE TABLE public."YAPI_AKTARIM_BENCHMARK" (
+            "ID" text, "BINAYASI" integer, "ZEMINUSTUKATSAYISI" integer, "TOPLAMYUKSEKLIK" double precision,
+            "YAPIKAYITBELGENO" text, "TESPITKARARACIKLAMA" text, "TIP" integer, "DURUM" integer,
+            "RISKSKORU" integer, geom {geom_tipi}
+        )
+    """))
+    sayac = {"bayt": 0}
+
+    def say(parcalar):
+        for veri in parcalar:
+            sayac["bayt"] += len(veri)
+            yield veri
+
+    with dbapi_baglantisi(db).cursor() as cursor:
+        cursor.copy_expert('COPY public."YAPI_AKTARIM_BENCHMARK" FROM STDIN', _CopyAkisi(say(akis)), size=1024 * 1024)
+    db.commit()
+    db.execute(text('DROP TABLE public."YAPI_AKTARIM_BENCHMARK"'))
+    db.commit()
+    return sayac["bayt"]
+
+def benchmark(
+    satir_sayisi: int,
+    parca_boyutu: int,
+    isci_sayilari: list[int],
+    kaynak: Optional[str] = None,
+    copy: bool = False,
+) -> list[Dict[str, Any]]:
+    """
+    Sentetik binalarla aktarım hattının hızını ölçer.
+
+    Varsayılan olarak yalnızca işleme (onarım, dönüşüm, risk, COPY metni) ölçülür;
+    sentetik veri önceden üretilir ki ölçüm okuma maliyetini içermesin.
+    `kaynak` verilirse veri önce o GeoPackage'a yazılır ve ölçüm dosyanın akış
+    hâlinde okunmasını da kapsar. `copy` ile COPY metni veritabanına da yüklenir.
+    """
+    tam_sayi_kolonlari = frozenset({"BINAYASI", "ZEMINUSTUKATSAYISI", "TIP", "DURUM"})
+    argumanlar = ("EPSG:4326", 5254, True, tam_sayi_kolonlari, True)
+
+    if kaynak:
+        print(f"🧪 {satir_sayisi} sentetik bina {kaynak} dosyasına yazılıyor...")
+        _sentetik_dosya_yaz(kaynak, satir_sayisi, parca_boyutu)
+        parcalar = lambda: kaynak_parcalari(kaynak, "YAPI", parca_boyutu)
+    else:
+        print(f"🧪 {satir_sayisi} sentetik bina üretiliyor...")
+        hazir = list(sentetik_parcalar(satir_sayisi, parca_boyutu))
+        parcalar = lambda: iter(hazir)
+
+    db = SessionLocal() if copy else None
+    sonuclar = []
+    try:
+        for isci_sayisi in isci_sayilari:
+            istatistik = {"okunan": 0, "yazilan": 0, "onarilan": 0, "atilan": 0, "parca": 0, "risk": Counter()}
+            started = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=isci_sayisi) as havuz:
+                akis = _sirali_sonuclar(havuz, parcalar(), argumanlar, isci_sayisi * 2, istatistik)
+                bayt = _benchmark_copy(db, akis) if db is not None else sum(len(veri) for veri in akis)
+            sure = time.perf_counter() - started
+            sonuclar.append({
+                "workers": isci_sayisi,
+                "rows": istatistik["yazilan"],
+                "geometries_repaired": istatistik["onarilan"],
+                "read_from_file": bool(kaynak),
+                "copy": copy,
+                "seconds": round(sure, 2),
+                "rows_per_sec": round(istatistik["yazilan"] / sure, 1),
+                "copy_mb": round(bayt / 1024 / 1024, 1),
+            })
+            print(f"  {isci_sayisi} işçi: {sonuclar[-1]['rows_per_sec']} satır/sn")
+    finally:
+        if db is not None:
+            db.close()
+    return sonuclar
+
+def main():
+    parser = argparse.ArgumentParser(description="MAKS GeoPackage/Shapefile teslimatını YAPI tablosuna aktarır")
+    parser.add_argument("kaynak", nargs="?", help="GeoPackage ya da Shapefile yolu")
+    parser.add_argument("--layer", help="Kaynaktaki katman adı (varsayılan: ilk katman)")
+    parser.add_argument("--source-crs", help="Kaynak dosyada CRS yoksa ya da yanlışsa (ör. EPSG:5254)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_PARCA_BOYUTU)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--no-swap", action="store_true", help=f'Veriyi "{AKTARIM_TABLOSU}" tablosunda bırak')
+    parser.add_argument("--benchmark", type=int, metavar="N", help="N sentetik binayla işleme hızını ölç")
+    parser.add_argument("--benchmark-source", metavar="GPKG", help="Sentetik veriyi bu dosyaya yazıp oradan akış hâlinde oku")
+    parser.add_argument("--benchmark-copy", action="store_true", help="COPY metnini DATABASE_URL'deki veritabanına da yükle")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        isci_sayilari = sorted({1, args.workers or 1})
+        sonuc = benchmark(
+            args.benchmark, args.chunk_size, isci_sayilari, args.benchmark_source, args.benchmark_copy
+        )
+    elif args.kaynak:
+        db = SessionLocal()
+        try:
+            sonuc = aktar(
+                db, args.kaynak, args.layer, args.chunk_size, args.workers,
+                args.source_crs, degistir=not args.no_swap
+            )
+        finally:
+            db.close()
+    else:
+        parser.error("kaynak dosya ya da --benchmark gerekli")
+    print(json.dumps(sonuc, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
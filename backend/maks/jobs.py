@@ -0,0 +1,189 @@
+"""
+Background job runner for long-running maintenance work on MAKS tables.
+
+Clone, restore and bulk update used to run inside the HTTP request. They are now
+submitted as jobs: the request returns a job ID immediately and the work runs on
+a worker thread with its own database session. Jobs touching the same table run
+one after another; jobs on different tables may run in parallel.
+"""
+import logging
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable
+
+from fastapi import APIRouter, HTTPException
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal, engine
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Finished jobs kept in memory for status queries
+MAX_FINISHED_JOBS = 200
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested"""
+
+class Job:
+    def __init__(self, kind: str, table: str):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.table = table
+        self.status = "queued"  # queued | running | succeeded | failed | cancelled
+        self.progress = 0.0
+        self.message = "Sırada bekliyor"
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancel = threading.Event()
+        self._backend_pid: Optional[int] = None
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def set_progress(self, progress: float, message: Optional[str] = None) -> None:
+        """Update progress (0-1) without checking for cancellation (for steps past the point of no return)"""
+        self.progress = round(max(0.0, min(1.0, progress)), 4)
+        if message:
+            self.message = message
+
+    def report_progress(self, progress: float, message: Optional[str] = None) -> None:
+        """Update progress (0-1) and stop the job if it was cancelled"""
+        self.set_progress(progress, message)
+        self.check_cancelled()
+
+    def check_cancelled(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled("İş iptal edildi")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "table": self.table,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+# Job registry and one single-worker executor per table
+_jobs: "OrderedDict[str, Job]" = OrderedDict()
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_lock = threading.Lock()
+
+def submit_job(kind: str, table: str, func: Callable[..., Optional[Dict[str, Any]]], *args, **kwargs) -> Job:
+    """
+    Queue a job. `func(job, db, *args, **kwargs)` runs on the table's worker with
+    a fresh session; whatever it returns is stored as the job result.
+    """
+    job = Job(kind, table)
+    with _lock:
+        _jobs[job.id] = job
+        _prune_finished()
+        executor = _executors.get(table)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"job-{table}")
+            _executors[table] = executor
+    executor.submit(_run, job, func, args, kwargs)
+    logger.info(f"Job {job.id} ({kind}) queued for table {table}")
+    return job
+
+def get_job(job_id: str) -> Optional[Job]:
+    return _jobs.get(job_id)
+
+def cancel_job(job_id: str) -> Job:
+    """
+    Request cancellation. Queued jobs never start; a running job stops at its
+    next progress report, and any statement it is executing is cancelled.
+    """
+    job = _jobs.get(job_id)
+    if job is None:
+        raise KeyError(job_id)
+
+    job._cancel.set()
+    if job.status == "running" and job._backend_pid:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT pg_cancel_backend(:pid)"), {"pid": job._backend_pid})
+        except Exception as e:
+            logger.warning(f"Could not cancel backend {job._backend_pid} for job {job.id}: {str(e)}")
+    return job
+
+def _run(job: Job, func: Callable, args: tuple, kwargs: dict) -> None:
+    if job.cancel_requested:
+        job.status = "cancelled"
+        job.message = "Başlamadan iptal edildi"
+        job.finished_at = time.time()
+        return
+
+    db: Session = SessionLocal()
+    job.status = "running"
+    job.message = "Çalışıyor"
+    job.started_at = time.time()
+    try:
+        job._backend_pid = db.execute(text("SELECT pg_backend_pid()")).scalar()
+        job.result = func(job, db, *args, **kwargs)
+        job.status = "succeeded"
+        job.progress = 1.0
+        job.message = "Tamamlandı"
+    except Exception as e:
+        db.rollback()
+        if job.cancel_requested:
+            job.status = "cancelled"
+            job.message = "İptal edildi"
+        else:
+            traceback.print_exc()
+            job.status = "failed"
+            job.error = str(e)
+            job.message = "Hata ile sonlandı"
+    finally:
+        job._backend_pid = None
+        job.finished_at = time.time()
+        db.close()
+        duration = job.finished_at - job.started_at
+        logger.info(f"Job {job.id} ({job.kind}) {job.status} in {duration:.2f}s")
+
+def _prune_finished() -> None:
+    finished = [job_id for job_id, job in _jobs.items() if job.finished_at is not None]
+    for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del _jobs[job_id]
+
+@router.get("/jobs")
+async def list_jobs(status: Optional[str] = None):
+    """List known jobs, newest first, optionally filtered by status"""
+    jobs = [job.to_dict() for job in reversed(list(_jobs.values()))]
+    if status:
+        jobs = [job for job in jobs if job["status"] == status]
+    return {"jobs": jobs}
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    return job.to_dict()
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job_endpoint(job_id: str):
+    try:
+        job = cancel_job(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    return job.to_dict()
@@ -1,26 +1,151 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from database.database import get_db  # varsa kendi db bağlantı fonksiyonun
+from maks.jobs import Job, submit_job
+from maks.clone import klonla
+from maks.snapshot import tablo_degisti
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/yapi/restore")
-async def restore_yapi_from_clone(db: Session = Depends(get_db)):
-    try:
-        # 1. Orijinal tabloyu boşalt
-        db.execute(text('TRUNCATE TABLE "YAPI" RESTART IDENTITY CASCADE;'))
+def _bagimlilari_bul(db: Session) -> list[str]:
+    """
+    "YAPI" adıyla değil tablonun kendisine bağlı olan ve değişimde yeni tabloya
+    taşınamayan nesneleri döndürür: view'lar ve "YAPI"ya başvuran foreign key'ler
+    """
+    rows = db.execute(text("""
+        SELECT DISTINCT format('view %s', v.oid::regclass)
+        FROM pg_depend d
+        JOIN pg_rewrite r ON r.oid = d.objid AND d.classid = 'pg_rewrite'::regclass
+        JOIN pg_class v ON v.oid = r.ev_class
+        WHERE d.refclassid = 'pg_class'::regclass
+          AND d.refobjid = 'public."YAPI"'::regclass
+          AND v.oid <> d.refobjid
+        UNION ALL
+        SELECT format('foreign key %I (%s)', c.conname, c.conrelid::regclass)
+        FROM pg_constraint c
+        WHERE c.contype = 'f'
+          AND c.confrelid = 'public."YAPI"'::regclass
+          AND c.conrelid <> c.confrelid
+    """)).scalars().all()
+    return list(rows)
 
-        # 2. Klon tablodan veri kopyala
-        db.execute(text('INSERT INTO "YAPI" SELECT * FROM "YAPI_KLON";'))
+def _yetki_ve_politikalar(db: Session) -> list[str]:
+    """Canlı tablonun yetkilerini ve RLS politikalarını yeni tabloda yeniden kuracak SQL'ler"""
+    komutlar = []
+    yetkiler = db.execute(text("""
+        SELECT a.privilege_type,
+               CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END,
+               a.is_grantable
+        FROM pg_class c, aclexplode(c.relacl) a
+        WHERE c.oid = 'public."YAPI"'::regclass AND a.grantee <> c.relowner
+    """)).fetchall()
+    for yetki, rol, devredilebilir in yetkiler:
+        komutlar.append(f'GRANT {yetki} ON public."YAPI" TO {rol}' + (" WITH GRANT OPTION" if devredilebilir else ""))
 
-        # 3. (Opsiyonel) Commit işlemi
-        db.commit()
+    rls, zorunlu = db.execute(text("""
+        SELECT relrowsecurity, relforcerowsecurity FROM pg_class WHERE oid = 'public."YAPI"'::regclass
+    """)).one()
+    if rls:
+        komutlar.append('ALTER TABLE public."YAPI" ENABLE ROW LEVEL SECURITY')
+    if zorunlu:
+        komutlar.append('ALTER TABLE public."YAPI" FORCE ROW LEVEL SECURITY')
+
+    politikalar = db.execute(text("""
+        SELECT format('CREATE POLICY %I ON public."YAPI" AS %s FOR %s TO %s', policyname, permissive, cmd,
+                      (SELECT string_agg(CASE WHEN r = 'public' THEN 'PUBLIC' ELSE quote_ident(r) END, ', ')
+                       FROM unnest(roles) r))
+               || COALESCE(' USING (' || qual || ')', '')
+               || COALESCE(' WITH CHECK (' || with_check || ')', '')
+        FROM pg_policies
+        WHERE schemaname = 'public' AND tablename = 'YAPI'
+    """)).scalars().all()
+    komutlar.extend(politikalar)
+    return komutlar
+
+def tablo_degistir(db: Session, hazir_tablo: str) -> None:
+    """
+    Hazırlanmış bir tabloyu tek ve kısa bir transaction içinde "YAPI" yapar.
+
+    Canlı tablo "YAPI_ESKI" adıyla saklanır (bir sonraki değişimde silinir), hazır
+    tablo "YAPI" olarak yeniden adlandırılır. Yalnızca katalog güncellendiği için
+    süre tablo boyutundan bağımsızdır ve okuyucular yarım dolu bir tablo görmez.
+
+    Yetkiler ve RLS politikaları yeni tabloya yeniden verilir. View'lar ve "YAPI"ya
+    başvuran foreign key'ler yeniden adlandırılan eski tabloda kalacağı için böyle
+    bağımlılıklar varsa değişim yapılmaz.
+    """
+    # Kilit beklerken okuyucuları kuyrukta bekletmemek için kısa bir süre sınırı
+    db.execute(text("SELECT set_config('lock_timeout', '5s', true)"))
+
+    # 1. Eski tabloya bağlı kalacak nesneler varsa değişimi reddet
+    bagimlilar = _bagimlilari_bul(db)
+    if bagimlilar:
+        raise RuntimeError(
+            '"YAPI" tablosuna bağlı nesneler var, tablo değiştirilemez: ' + ", ".join(bagimlilar)
+        )
+    yeniden_kur = _yetki_ve_politikalar(db)
+
+    # 2. Önceki değişimden kalan eski tabloyu kaldır
+    db.execute(text('DROP TABLE IF EXISTS public."YAPI_ESKI";'))
+
+    # 3. Canlı tabloyu kenara al, hazır tabloyu yerine koy
+    db.execute(text('ALTER TABLE public."YAPI" RENAME TO "YAPI_ESKI";'))
+    db.execute(text(f'ALTER TABLE public."{hazir_tablo}" RENAME TO "YAPI";'))
 
-        return {"message": "✅ YAPI tablosu başarıyla geri yüklendi."}
+    # 4. Yetkiler ve RLS politikaları eski tabloyla birlikte gitti; yeni tabloya yeniden ver
+    for komut in yeniden_kur:
+        db.execute(text(komut))
 
+    # 5. Eski tablonun sahip olduğu sequence'ler (serial kolonlar) yeni tabloya devredilir,
+    #    aksi halde eski tablo silinirken yeni tablonun varsayılan değerleri bozulur
+    sequences = db.execute(text("""
+        SELECT s.relname, a.attname
+        FROM pg_class s
+        JOIN pg_depend d ON d.objid = s.oid AND d.deptype = 'a'
+        JOIN pg_attribute a ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid
+        WHERE s.relkind = 'S' AND d.refobjid = 'public."YAPI_ESKI"'::regclass
+    """)).fetchall()
+    for sequence, column in sequences:
+        db.execute(text(f'ALTER SEQUENCE public."{sequence}" OWNED BY public."YAPI"."{column}";'))
+
+    # 6. Değişiklik günlüğü trigger'larını aynı transaction içinde yeni tabloya bağla
+    tablo_degisti(db)
+
+    db.commit()
+
+    # İstatistikler yeni tabloya ait olsun (örnekleme yapar, tabloyu yeniden yazmaz).
+    # Değişim commit edildiği için burada bir hata (ör. iptal edilen sorgu) değişimi geçersiz kılmaz.
+    try:
+        db.execute(text('ANALYZE public."YAPI";'))
+        db.commit()
     except Exception as e:
         db.rollback()
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"🔥 Restore işlemi başarısız: {str(e)}")
+        logger.warning(f'ANALYZE after table swap failed, autovacuum will analyze "YAPI" later: {str(e)}')
+
+def geri_yukle(job: Job, db: Session):
+    klon_var = db.execute(text("""SELECT to_regclass('public."YAPI_KLON"') IS NOT NULL""")).scalar()
+    if not klon_var:
+        raise RuntimeError("YAPI_KLON tablosu bulunamadı, önce klonlama yapılmalı")
+    job.check_cancelled()
+
+    # 1. Klon tabloyu canlı tabloyla yer değiştir (veri kopyalanmaz)
+    tablo_degistir(db, "YAPI_KLON")
+    # Değişim commit edildi; bundan sonra iptal dikkate alınmaz, yoksa iş "iptal edildi"
+    # görünür ve yeniden klonlama yapılmadığı için sonraki geri yükleme klonsuz kalır
+    job.set_progress(0.9, "Tablolar değiştirildi")
+
+    # 2. Klon tüketildiği için bir sonraki geri yükleme adına yeniden klonla (arka planda)
+    klon_isi = submit_job("clone", "YAPI", klonla)
+
+    return {"message": "✅ YAPI tablosu başarıyla geri yüklendi.", "reclone_job": klon_isi.id}
+
+@router.post("/yapi/restore", status_code=202)
+async def restore_yapi_from_clone():
+    # Geri yükleme arka plan işi olarak çalışır; tablo değişimi milisaniyeler sürer
+    job = submit_job("restore", "YAPI", geri_yukle)
+    return {"message": "⏳ Geri yükleme işi başlatıldı", "job": job.to_dict()}
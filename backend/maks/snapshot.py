@@ -0,0 +1,558 @@
+"""
+YAPI tablosu için değişiklik günlüğü, artımlı snapshot'lar ve batch geri alma.
+
+"YAPI" üzerindeki statement seviyesindeki trigger'lar değişen kolonların eski ve
+yeni değerlerini (silinen satırların tamamını) ve işlemin batch ID'sini
+"YAPI_DEGISIKLIK" tablosuna yazar. Günlüğe yalnızca bir batch içinde ya da geçerli
+bir snapshot varken yazılır; ikisi de yoksa değişikliğe ihtiyaç duyan kimse yoktur.
+
+- Snapshot: günlükteki bir sıra numarasıdır; oluşturmak O(1)'dir. Snapshot'a dönmek,
+  o numaradan sonra değişen satırları günlükteki ilk eski hâllerine çevirmektir.
+- Batch: tek bir /maks/update çağrısının yaptığı değişikliklerdir; yalnızca o batch'in
+  değiştirdiği kolonlar, sonradan başka bir düzenleme yapılmamışsa geri alınabilir.
+"""
+import uuid
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database.database import get_db
+from maks.jobs import Job, submit_job
+
+router = APIRouter()
+
+# Trigger fonksiyonu ya da günlük şeması değiştiğinde artırılır; kur() eski kurulumları günceller
+GUNLUK_SURUMU = "3"
+
+KURULUM_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS public."YAPI_DEGISIKLIK" (
+        seq bigserial PRIMARY KEY,
+        yapi_id text NOT NULL,
+        islem char(1) NOT NULL,      -- I: ekleme, U: güncelleme, D: silme
+        eski jsonb,                  -- D: silinen satırın tamamı, U: değişen kolonların eski değerleri
+        alanlar text[],              -- U için değişen kolonlar
+        zaman timestamptz NOT NULL DEFAULT now()
+    )
+    """,
+    'ALTER TABLE public."YAPI_DEGISIKLIK" ADD COLUMN IF NOT EXISTS yeni jsonb',  # U: değişen kolonlar, I: tam satır
+    'ALTER TABLE public."YAPI_DEGISIKLIK" ADD COLUMN IF NOT EXISTS batch_id text',
+    """
+    CREATE INDEX IF NOT EXISTS "YAPI_DEGISIKLIK_batch_id_idx"
+        ON public."YAPI_DEGISIKLIK" (batch_id) WHERE batch_id IS NOT NULL
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS "YAPI_DEGISIKLIK_yapi_id_seq_idx"
+        ON public."YAPI_DEGISIKLIK" (yapi_id, seq)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS "YAPI_DEGISIKLIK_zaman_idx"
+        ON public."YAPI_DEGISIKLIK" (zaman)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS public."YAPI_SNAPSHOT" (
+        ad text PRIMARY KEY,
+        seq bigint NOT NULL,
+        aciklama text,
+        olusturma timestamptz NOT NULL DEFAULT now(),
+        gecerli boolean NOT NULL DEFAULT true
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS public."YAPI_BATCH" (
+        batch_id text PRIMARY KEY,
+        aciklama text,
+        olusturma timestamptz NOT NULL DEFAULT now(),
+        geri_alinma timestamptz,
+        geri_alma_batch_id text
+    )
+    """,
+    """
+    CREATE OR REPLACE FUNCTION public.yapi_degisiklik_kaydet() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        batch text := NULLIF(current_setting('yapi.batch_id', true), '');
+    BEGIN
+        -- Geometri jsonb içinde GeoJSON yerine hex EWKB olarak saklanır ki geri yazılabilsin.
+        -- Fonksiyon "YAPI" satır tipine bağlanmaz; tablo değişiminde (restore) bağımlılık kalmasın.
+        -- Batch ID, işlemi yapan transaction'da set_config('yapi.batch_id', ..., true) ile verilir.
+
+        -- Ne batch ne de geçerli bir snapshot varsa bu değişiklik hiçbir zaman geri alınmayacak
+        IF batch IS NULL AND NOT EXISTS (SELECT 1 FROM public."YAPI_SNAPSHOT" WHERE gecerli) THEN
+            RETURN NULL;
+        END IF;
+
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO public."YAPI_DEGISIKLIK" (yapi_id, islem, yeni, batch_id)
+            SELECT n."ID"::text, 'I', to_jsonb(n) || jsonb_build_object('geom', n.geom::text), batch
+            FROM yeni_satirlar n;
+        ELSIF TG_OP = 'DELETE' THEN
+            INSERT INTO public."YAPI_DEGISIKLIK" (yapi_id, islem, eski, batch_id)
+            SELECT o."ID"::text, 'D', to_jsonb(o) || jsonb_build_object('geom', o.geom::text), batch
+            FROM eski_satirlar o;
+        ELSE
+            INSERT INTO public."YAPI_DEGISIKLIK" (yapi_id, islem, eski, alanlar, yeni, batch_id)
+            SELECT o."ID"::text, 'U', d.eski, d.alanlar, d.yeni, batch
+            FROM (SELECT t."ID", to_jsonb(t) || jsonb_build_object('geom', t.geom::text) AS j FROM eski_satirlar t) o
+            JOIN (SELECT t."ID", to_jsonb(t) || jsonb_build_object('geom', t.geom::text) AS j FROM yeni_satirlar t) n
+              ON n."ID" = o."ID"
+            CROSS JOIN LATERAL (
+                SELECT array_agg(e.key ORDER BY e.key) AS alanlar,
+                       jsonb_object_agg(e.key, e.value) AS eski,
+                       jsonb_object_agg(e.key, n.j -> e.key) AS yeni
+                FROM jsonb_each(o.j) e
+                WHERE e.value IS DISTINCT FROM n.j -> e.key
+            ) d
+            WHERE d.alanlar IS NOT NULL;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    f"COMMENT ON FUNCTION public.yapi_degisiklik_kaydet() IS '{GUNLUK_SURUMU}'",
+]
+
+# Transition table'lar tek olaylı trigger'larda kullanılabildiği için her olaya ayrı trigger
+TRIGGER_SQL = {
+    "yapi_degisiklik_ekleme": 'AFTER INSERT ON public."YAPI" REFERENCING NEW TABLE AS yeni_satirlar',
+    "yapi_degisiklik_guncelleme": 'AFTER UPDATE ON public."YAPI" REFERENCING OLD TABLE AS eski_satirlar NEW TABLE AS yeni_satirlar',
+    "yapi_degisiklik_silme": 'AFTER DELETE ON public."YAPI" REFERENCING OLD TABLE AS eski_satirlar',
+}
+
+class SnapshotIstegi(BaseModel):
+    ad: Optional[str] = None
+    aciklama: Optional[str] = None
+
+def kur(db: Session) -> None:
+    """Günlük tablolarını, fonksiyonu ve "YAPI" trigger'larını kurar (idempotent)"""
+    surum = db.execute(text(
+        "SELECT obj_description(to_regprocedure('public.yapi_degisiklik_kaydet()')::oid, 'pg_proc')"
+    )).scalar()
+    if surum == GUNLUK_SURUMU and _triggerlar_var_mi(db):
+        return
+    for sql in KURULUM_SQL:
+        db.execute(text(sql))
+    trigger_kur(db)
+    db.commit()
+
+def trigger_kur(db: Session) -> None:
+    """
+    Trigger'ları güncel "YAPI" tablosuna bağlar. Tablo değişiminden (restore)
+    sonra da çağrılır, çünkü yeniden adlandırılan tablo trigger'ları taşımaz.
+    """
+    for ad, tanim in TRIGGER_SQL.items():
+        db.execute(text(f'DROP TRIGGER IF EXISTS {ad} ON public."YAPI"'))
+        db.execute(text(f"CREATE TRIGGER {ad} {tanim} FOR EACH STATEMENT EXECUTE PROCEDURE public.yapi_degisiklik_kaydet()"))
+
+def kurulu_mu(db: Session) -> bool:
+    return db.execute(text("""SELECT to_regclass('public."YAPI_SNAPSHOT"') IS NOT NULL""")).scalar()
+
+def _triggerlar_var_mi(db: Session) -> bool:
+    sayi = db.execute(text("""
+        SELECT count(*) FROM pg_trigger
+        WHERE tgrelid = 'public."YAPI"'::regclass AND tgname = ANY(:adlar)
+    """), {"adlar": list(TRIGGER_SQL)}).scalar()
+    return sayi == len(TRIGGER_SQL)
+
+def tablo_degisti(db: Session) -> None:
+    """
+    "YAPI" tablosu bütünüyle değiştirildiğinde (restore, içe aktarma) çağrılır.
+    Günlük bu değişimi kapsamadığı için mevcut snapshot'lar geçersiz sayılır.
+    Commit çağırana bırakılır; değişimle aynı transaction içinde çalışmalıdır.
+    """
+    if not kurulu_mu(db):
+        return
+    trigger_kur(db)
+    db.execute(text('UPDATE public."YAPI_SNAPSHOT" SET gecerli = false WHERE gecerli'))
+
+def batch_baslat(db: Session, aciklama: Optional[str] = None) -> str:
+    """
+    Yeni bir batch kaydı açar ve ID'sini döndürür. Saklama süresi dolan günlük
+    kayıtları da burada budanır; günlük yalnızca batch'ler ve snapshot'larla büyür.
+    """
+    kur(db)
+    gunlugu_buda(db)
+    batch_id = str(uuid.uuid4())
+    db.execute(
+        text('INSERT INTO public."YAPI_BATCH" (batch_id, aciklama) VALUES (:batch_id, :aciklama)'),
+        {"batch_id": batch_id, "aciklama": aciklama}
+    )
+    db.commit()
+    return batch_id
+
+def batch_ayarla(db: Session, batch_id: Optional[str]) -> None:
+    """Geçerli transaction'daki değişiklikleri verilen batch'e bağlar; commit'e kadar geçerlidir"""
+    if batch_id:
+        db.execute(text("SELECT set_config('yapi.batch_id', :batch_id, true)"), {"batch_id": batch_id})
+
+def snapshot_olustur(db: Session, ad: Optional[str] = None, aciklama: Optional[str] = None) -> Dict[str, Any]:
+    """Günlükteki son sıra numarasını isimle kaydeder; veri kopyalanmaz"""
+    kur(db)
+    ad = ad or datetime.now().strftime("snapshot-%Y%m%d-%H%M%S-%f")
+
+    # SHARE kilidi devam eden yazma transaction'larının bitmesini bekler; böylece
+    # snapshot numarasından küçük ama henüz commit edilmemiş bir değişiklik kalmaz
+    db.execute(text('LOCK TABLE public."YAPI" IN SHARE MODE'))
+    seq = db.execute(text('SELECT COALESCE(max(seq), 0) FROM public."YAPI_DEGISIKLIK"')).scalar()
+    var_mi = db.execute(text('SELECT 1 FROM public."YAPI_SNAPSHOT" WHERE ad = :ad'), {"ad": ad}).scalar()
+    if var_mi:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=f"'{ad}' adında bir snapshot zaten var")
+
+    db.execute(
+        text('INSERT INTO public."YAPI_SNAPSHOT" (ad, seq, aciklama) VALUES (:ad, :seq, :aciklama)'),
+        {"ad": ad, "seq": seq, "aciklama": aciklama}
+    )
+    db.commit()
+    return {"ad": ad, "seq": seq, "aciklama": aciklama}
+
+def _snapshot_getir(db: Session, ad: str) -> Dict[str, Any]:
+    row = db.execute(
+        text('SELECT ad, seq, gecerli FROM public."YAPI_SNAPSHOT" WHERE ad = :ad'), {"ad": ad}
+    ).mappings().first()
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Snapshot bulunamadı: {ad}")
+    return dict(row)
+
+def yapi_id_tipi(db: Session) -> str:
+    """
+    "YAPI"."ID" kolonunun SQL tipi (ör. `integer`). Günlükteki text yapi_id bu tipe
+    çevrilerek karşılaştırılır; "ID" dönüştürülmediği için birincil anahtar indeksi kullanılır.
+    """
+    return db.execute(text("""
+        SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+        WHERE attrelid = 'public."YAPI"'::regclass AND attname = 'ID'
+    """)).scalar()
+
+def _yapi_kolonlari(db: Session) -> list[str]:
+    rows = db.execute(text("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = 'YAPI' AND is_generated = 'NEVER'
+        ORDER BY ordinal_position
+    """)).fetchall()
+    return [row[0] for row in rows]
+
+def snapshot_geri_yukle(job: Job, db: Session, ad: str) -> Dict[str, Any]:
+    """
+    "YAPI"yı snapshot anındaki hâline döndürür. Yalnızca snapshot'tan sonra
+    değişen satırlara dokunulur; geri alma da günlüğe yazıldığı için geri alınabilir.
+    """
+    snapshot = _snapshot_getir(db, ad)
+    if not snapshot["gecerli"]:
+        raise RuntimeError(f"'{ad}' snapshot'ı tablo değişiminden önce alınmış, artık geri yüklenemez")
+
+    yapi_kolonlari = _yapi_kolonlari(db)
+    id_tipi = yapi_id_tipi(db)
+    kolonlar = ", ".join(f'"{kolon}"' for kolon in yapi_kolonlari)
+    kaynak = ", ".join(f'r."{kolon}"' for kolon in yapi_kolonlari)
+    # Günlükte eski değeri olmayan kolon snapshot'tan beri değişmemiştir
+    atamalar = ", ".join(
+        f"\"{kolon}\" = CASE WHEN g.eski ? '{kolon}' THEN r.\"{kolon}\" ELSE y.\"{kolon}\" END"
+        for kolon in yapi_kolonlari
+    )
+    batch_id = batch_baslat(db, f"'{ad}' snapshot'ına dönüş")
+    batch_ayarla(db, batch_id)
+
+    # Satırın ilk değişikliği snapshot anında var olup olmadığını, her kolonun
+    # snapshot'tan sonraki ilk eski değeri de o anki değerini verir. Silme kaydı
+    # satırın tamamını taşıdığı için silinen satırlarda bütün kolonlar bulunur.
+    db.execute(text("""
+        CREATE TEMP TABLE snapshot_geri_al ON COMMIT DROP AS
+        WITH d AS (
+            SELECT yapi_id, seq, islem, eski
+            FROM public."YAPI_DEGISIKLIK"
+            WHERE seq > :seq
+        ),
+        ozet AS (
+            SELECT yapi_id, (array_agg(islem ORDER BY seq))[1] AS islem
+            FROM d
+            GROUP BY yapi_id
+        ),
+        kolon AS (
+            SELECT DISTINCT ON (d.yapi_id, e.key) d.yapi_id, e.key, e.value
+            FROM d CROSS JOIN LATERAL jsonb_each(d.eski) e
+            ORDER BY d.yapi_id, e.key, d.seq
+        )
+        SELECT o.yapi_id, o.islem, k.eski
+        FROM ozet o
+        LEFT JOIN (
+            SELECT yapi_id, jsonb_object_agg(key, value) AS eski FROM kolon GROUP BY yapi_id
+        ) k USING (yapi_id)
+    """), {"seq": snapshot["seq"]})
+    job.report_progress(0.2, "Değişen satırlar belirlendi")
+
+    # Snapshot'tan sonra eklenen satırlar silinir
+    silinen = db.execute(text(f"""
+        DELETE FROM public."YAPI" y
+        USING snapshot_geri_al g
+        WHERE g.islem = 'I' AND y."ID" = g.yapi_id::{id_tipi}
+    """)).rowcount
+    job.report_progress(0.4, "Eklenen satırlar silindi")
+
+    # Güncellenen ya da silinip yeniden eklenen satırlar eski hâllerine döner
+    guncellenen = db.execute(text(f"""
+        UPDATE public."YAPI" y
+        SET {atamalar}
+        FROM snapshot_geri_al g
+        CROSS JOIN LATERAL jsonb_populate_record(NULL::public."YAPI", g.eski) r
+        WHERE g.islem <> 'I' AND g.eski IS NOT NULL AND y."ID" = g.yapi_id::{id_tipi}
+    """)).rowcount
+    job.report_progress(0.7, "Değişen satırlar geri alındı")
+
+    # Silinen satırlar yeniden eklenir; bunların eski değeri silme kaydından gelen tam satırdır
+    eklenen = db.execute(text(f"""
+        INSERT INTO public."YAPI" ({kolonlar}) OVERRIDING SYSTEM VALUE
+        SELECT {kaynak}
+        FROM snapshot_geri_al g
+        CROSS JOIN LATERAL jsonb_populate_record(NULL::public."YAPI", g.eski) r
+        WHERE g.islem <> 'I'
+          AND NOT EXISTS (SELECT 1 FROM public."YAPI" y WHERE y."ID" = g.yapi_id::{id_tipi})
+    """)).rowcount
+    job.check_cancelled()
+
+    db.commit()
+    return {
+        "message": f"✅ YAPI tablosu '{ad}' snapshot'ına döndürüldü",
+        "batch_id": batch_id,
+        "deleted": silinen,
+        "updated": guncellenen,
+        "inserted": eklenen,
+    }
+
+def batch_geri_al(job: Job, db: Session, batch_id: str) -> Dict[str, Any]:
+    """
+    Tek bir batch'in değişikliklerini geri alır; diğer düzenlemelere dokunmaz.
+
+    Güncellenen her kolon, ancak güncel değeri hâlâ batch'in yazdığı değerse eski
+    değerine döner. Sonradan başka biri tarafından değiştirilmiş kolonlar çakışma
+    olarak sayılır ve olduğu gibi bırakılır.
+    """
+    batch = db.execute(
+        text('SELECT batch_id, geri_alinma FROM public."YAPI_BATCH" WHERE batch_id = :b'), {"b": batch_id}
+    ).mappings().first()
+    if batch is None:
+        raise RuntimeError(f"Batch bulunamadı: {batch_id}")
+    if batch["geri_alinma"] is not None:
+        raise RuntimeError(f"Batch zaten geri alınmış: {batch_id}")
+
+    geri_alma_batch = batch_baslat(db, f"{batch_id} batch'inin geri alınması")
+    batch_ayarla(db, geri_alma_batch)
+
+    # Batch'in yazdığı satırı hâlâ içeren güncel satır görünümü (geometri hex EWKB)
+    guncel_json = "(to_jsonb(y) || jsonb_build_object('geom', y.geom::text))"
+    id_tipi = yapi_id_tipi(db)
+
+    alanlar = db.execute(text("""
+        SELECT DISTINCT unnest(alanlar) FROM public."YAPI_DEGISIKLIK"
+        WHERE batch_id = :b AND islem = 'U'
+    """), {"b": batch_id}).scalars().all()
+    gecerli_kolonlar = set(_yapi_kolonlari(db))
+
+    geri_alinan = {}
+    cakisan = {}
+    for index, alan in enumerate(alanlar):
+        if alan not in gecerli_kolonlar:
+            continue
+        toplam = db.execute(text("""
+            SELECT count(*) FROM public."YAPI_DEGISIKLIK"
+            WHERE batch_id = :b AND islem = 'U' AND yeni ? :alan
+        """), {"b": batch_id, "alan": alan}).scalar()
+        sonuc = db.execute(text(f"""
+            UPDATE public."YAPI" y
+            SET "{alan}" = r."{alan}"
+            FROM public."YAPI_DEGISIKLIK" e
+            CROSS JOIN LATERAL jsonb_populate_record(NULL::public."YAPI", e.eski) r
+            WHERE e.batch_id = :b AND e.islem = 'U' AND e.yeni ? :alan
+              AND y."ID" = e.yapi_id::{id_tipi}
+              AND {guncel_json} -> :alan = e.yeni -> :alan
+        """), {"b": batch_id, "alan": alan})
+        geri_alinan[alan] = sonuc.rowcount
+        cakisan[alan] = toplam - sonuc.rowcount
+        job.report_progress((index + 1) / (len(alanlar) + 1), f"{alan} kolonu geri alındı")
+
+    # Batch'in eklediği satırlar silinir, sildiği satırlar (yeniden eklenmemişlerse) geri eklenir
+    silinen = db.execute(text(f"""
+        DELETE FROM public."YAPI" y
+        USING public."YAPI_DEGISIKLIK" e
+        WHERE e.batch_id = :b AND e.islem = 'I' AND y."ID" = e.yapi_id::{id_tipi}
+    """), {"b": batch_id}).rowcount
+
+    kolonlar = ", ".join(f'"{kolon}"' for kolon in _yapi_kolonlari(db))
+    kaynak = ", ".join(f'r."{kolon}"' for kolon in _yapi_kolonlari(db))
+    eklenen = db.execute(text(f"""
+        INSERT INTO public."YAPI" ({kolonlar}) OVERRIDING SYSTEM VALUE
+        SELECT {kaynak}
+        FROM public."YAPI_DEGISIKLIK" e
+        CROSS JOIN LATERAL jsonb_populate_record(NULL::public."YAPI", e.eski) r
+        WHERE e.batch_id = :b AND e.islem = 'D'
+          AND NOT EXISTS (SELECT 1 FROM public."YAPI" y WHERE y."ID" = e.yapi_id::{id_tipi})
+    """), {"b": batch_id}).rowcount
+    job.check_cancelled()
+
+    db.execute(text("""
+        UPDATE public."YAPI_BATCH" SET geri_alinma = now(), geri_alma_batch_id = :yeni
+        WHERE batch_id = :b
+    """), {"b": batch_id, "yeni": geri_alma_batch})
+    db.commit()
+
+    return {
+        "message": f"↩️ {batch_id} batch'i geri alındı",
+        "undo_batch_id": geri_alma_batch,
+        "reverted": geri_alinan,
+        "conflicts": cakisan,
+        "deleted": silinen,
+        "inserted": eklenen,
+    }
+
+# Snapshot'lardan bağımsız olarak günlükte tutulan süre (batch geri alma için)
+DEGISIKLIK_SAKLAMA_GUN = 30
+
+def gunlugu_buda(db: Session) -> int:
+    """
+    Saklama süresini aşmış ve hiçbir geçerli snapshot'ın ihtiyaç duymadığı
+    günlük kayıtlarını siler
+    """
+    en_eski = db.execute(text('SELECT min(seq) FROM public."YAPI_SNAPSHOT" WHERE gecerli')).scalar()
+    sonuc = db.execute(text("""
+        DELETE FROM public."YAPI_DEGISIKLIK"
+        WHERE zaman < now() - make_interval(days => :gun)
+          AND (CAST(:seq AS bigint) IS NULL OR seq <= :seq)
+    """), {"gun": DEGISIKLIK_SAKLAMA_GUN, "seq": en_eski})
+    db.commit()
+    return sonuc.rowcount
+
+@router.post("/snapshots")
+async def create_snapshot(istek: SnapshotIstegi, db: Session = Depends(get_db)):
+    """Yeni bir snapshot alır; süre ve disk maliyeti tablo boyutundan bağımsızdır"""
+    try:
+        return snapshot_olustur(db, istek.ad, istek.aciklama)
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"🔥 Snapshot oluşturulamadı: {str(e)}")
+
+@router.get("/snapshots")
+async def list_snapshots(db: Session = Depends(get_db)):
+    """Snapshot'ları ve her birinden sonra değişen bina sayısını listeler"""
+    if not kurulu_mu(db):
+        return {"snapshots": []}
+    rows = db.execute(text("""
+        SELECT s.ad, s.seq, s.aciklama, s.olusturma, s.gecerli,
+               (SELECT count(DISTINCT d.yapi_id) FROM public."YAPI_DEGISIKLIK" d WHERE d.seq > s.seq) AS degisen_bina
+        FROM public."YAPI_SNAPSHOT" s
+        ORDER BY s.seq DESC, s.olusturma DESC
+    """)).mappings().all()
+    return {"snapshots": [dict(row) for row in rows]}
+
+@router.get("/snapshots/{ad}/diff")
+async def diff_snapshot(
+    ad: str,
+    to: Optional[str] = Query(None, description="Karşılaştırılacak ikinci snapshot; boşsa güncel tablo"),
+    limit: int = Query(1000, description="Döndürülecek en fazla bina sayısı"),
+    db: Session = Depends(get_db)
+):
+    """Snapshot'tan bu yana (ya da iki snapshot arasında) değişen binaları döndürür"""
+    baslangic = _snapshot_getir(db, ad)
+    bitis_seq = _snapshot_getir(db, to)["seq"] if to else None
+    alt, ust = baslangic["seq"], bitis_seq
+    if ust is not None and ust < alt:
+        alt, ust = ust, alt
+
+    rows = db.execute(text("""
+        WITH d AS (
+            SELECT * FROM public."YAPI_DEGISIKLIK"
+            WHERE seq > :alt AND (CAST(:ust AS bigint) IS NULL OR seq <= :ust)
+        )
+        SELECT d.yapi_id,
+               (array_agg(d.islem ORDER BY d.seq))[1] AS ilk_islem,
+               (array_agg(d.islem ORDER BY d.seq DESC))[1] AS son_islem,
+               count(*) AS degisiklik_sayisi,
+               ARRAY(
+                   SELECT DISTINCT a FROM d d2, unnest(d2.alanlar) a
+                   WHERE d2.yapi_id = d.yapi_id ORDER BY 1
+               ) AS alanlar
+        FROM d
+        GROUP BY d.yapi_id
+        ORDER BY d.yapi_id
+        LIMIT :limit
+    """), {"alt": alt, "ust": ust, "limit": limit}).mappings().all()
+
+    return {
+        "from": ad,
+        "to": to,
+        "valid": baslangic["gecerli"],
+        "buildings": [dict(row) for row in rows],
+    }
+
+@router.post("/snapshots/{ad}/restore", status_code=202)
+async def restore_snapshot(ad: str, db: Session = Depends(get_db)):
+    """Snapshot'a dönüşü arka plan işi olarak başlatır"""
+    _snapshot_getir(db, ad)
+    job = submit_job("snapshot-restore", "YAPI", snapshot_geri_yukle, ad)
+    return {"message": f"⏳ '{ad}' snapshot'ına dönüş başlatıldı", "job": job.to_dict()}
+
+@router.delete("/snapshots/{ad}")
+async def delete_snapshot(ad: str, db: Session = Depends(get_db)):
+    """Snapshot'ı siler ve artık gerekmeyen günlük kayıtlarını budar"""
+    _snapshot_getir(db, ad)
+    db.execute(text('DELETE FROM public."YAPI_SNAPSHOT" WHERE ad = :ad'), {"ad": ad})
+    db.commit()
+    budanan = gunlugu_buda(db)
+    return {"message": f"🗑️ '{ad}' snapshot'ı silindi", "pruned_log_rows": budanan}
+
+@router.get("/batches")
+async def list_batches(limit: int = Query(50), db: Session = Depends(get_db)):
+    """Son güncelleme batch'lerini ve etkiledikleri satır sayısını listeler"""
+    if not kurulu_mu(db):
+        return {"batches": []}
+    rows = db.execute(text("""
+        SELECT b.batch_id, b.aciklama, b.olusturma, b.geri_alinma, b.geri_alma_batch_id,
+               (SELECT count(*) FROM public."YAPI_DEGISIKLIK" d WHERE d.batch_id = b.batch_id) AS degisiklik_sayisi
+        FROM public."YAPI_BATCH" b
+        ORDER BY b.olusturma DESC
+        LIMIT :limit
+    """), {"limit": limit}).mappings().all()
+    return {"batches": [dict(row) for row in rows]}
+
+@router.get("/batches/{batch_id}")
+async def get_batch(batch_id: str, limit: int = Query(100), db: Session = Depends(get_db)):
+    """Bir batch'in değiştirdiği satırları eski ve yeni değerleriyle döndürür"""
+    if not kurulu_mu(db):
+        raise HTTPException(status_code=404, detail="Batch bulunamadı")
+    batch = db.execute(
+        text('SELECT * FROM public."YAPI_BATCH" WHERE batch_id = :b'), {"b": batch_id}
+    ).mappings().first()
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch bulunamadı")
+
+    degisiklikler = db.execute(text("""
+        SELECT yapi_id, islem, alanlar,
+               eski - 'geom' AS eski,
+               yeni - 'geom' AS yeni,
+               zaman
+        FROM public."YAPI_DEGISIKLIK"
+        WHERE batch_id = :b
+        ORDER BY seq
+        LIMIT :limit
+    """), {"b": batch_id, "limit": limit}).mappings().all()
+    return {**dict(batch), "changes": [dict(row) for row in degisiklikler]}
+
+@router.post("/batches/{batch_id}/undo", status_code=202)
+async def undo_batch(batch_id: str, db: Session = Depends(get_db)):
+    """Tek bir batch'i geri alma işini başlatır"""
+    batch = None
+    if kurulu_mu(db):
+        batch = db.execute(
+            text('SELECT geri_alinma FROM public."YAPI_BATCH" WHERE batch_id = :b'), {"b": batch_id}
+        ).mappings().first()
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch bulunamadı")
+    if batch["geri_alinma"] is not None:
+        raise HTTPException(status_code=409, detail=f"Batch zaten geri alınmış: {batch_id}")
+    job = submit_job("batch-undo", "YAPI", batch_geri_al, batch_id)
+    return {"message": f"⏳ {batch_id} batch'inin geri alınması başlatıldı", "job": job.to_dict()}
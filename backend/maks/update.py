@@ -1,10 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, Body
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import text
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Literal
 from pydantic import BaseModel
 from database.database import get_db
+from maks.filtre import BinaFiltresi, filtre_sql_olustur
+from maks.jobs import Job, submit_job
+from maks.snapshot import snapshot_olustur, batch_baslat, batch_ayarla, yapi_id_tipi
+import json
 import logging
+import re
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -12,9 +18,313 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Maximum number of IDs bound in a single UPDATE statement / transaction
+DEFAULT_CHUNK_SIZE = 5000
+
+# Only these fields may be touched by /maks/update
+ALLOWED_UPDATE_FIELDS = ["\"TIP\"", "\"DURUM\"", "\"SERAGAZEMISYONSINIF\""]
+
+# Allowed value ranges for structured (predicate-based) updates
+UPDATE_FIELD_VALUES = {
+    "TIP": range(1, 5),
+    "DURUM": range(1, 3),
+    "SERAGAZEMISYONSINIF": range(1, 8),
+}
+
 class UpdateRequest(BaseModel):
     sql_query: str
     building_ids: list[str]
+    chunk_size: Optional[int] = None
+    dry_run: bool = False
+    sample_size: int = 10
+    background: bool = False
+    snapshot: bool = False  # Take a safety snapshot before updating
+
+class PredicateUpdateRequest(BaseModel):
+    field: Literal["TIP", "DURUM", "SERAGAZEMISYONSINIF"]
+    value: int
+    filter: BinaFiltresi
+    dry_run: bool = False
+    sample_size: int = 10
+    background: bool = False
+    snapshot: bool = False  # Take a safety snapshot before updating
+
+def build_predicate_update(request: "PredicateUpdateRequest") -> tuple[str, str, Dict[str, Any]]:
+    """
+    Compile a structured update into a single parameterized UPDATE statement.
+
+    Rows that already hold the target value are excluded so they are not rewritten.
+
+    Returns:
+        (set_sql, where_sql, params); the full statement is `{set_sql} WHERE {where_sql}`
+    """
+    if request.value not in UPDATE_FIELD_VALUES[request.field]:
+        allowed = UPDATE_FIELD_VALUES[request.field]
+        raise HTTPException(
+            status_code=400,
+            detail=f"{request.field} must be between {allowed.start} and {allowed.stop - 1}"
+        )
+
+    if request.filter.bos_mu():
+        raise HTTPException(
+            status_code=400,
+            detail="A filter or spatial extent is required. Refusing to update the whole table."
+        )
+
+    try:
+        where_sql, params = filtre_sql_olustur(request.filter)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    where_sql = f"{where_sql} AND \"{request.field}\" IS DISTINCT FROM :value"
+    params["value"] = request.value
+    set_sql = f"UPDATE public.\"YAPI\" SET \"{request.field}\" = :value"
+    return set_sql, where_sql, params
+
+def validate_update_query(sql_query: str) -> str:
+    """
+    Check that an AI-generated statement is a bare UPDATE on the YAPI table
+    touching only allowed fields. Returns the stripped query.
+    """
+    sql_query = sql_query.strip().rstrip(";").strip()
+
+    # Check if it's an UPDATE query on YAPI table
+    if not sql_query.upper().startswith("UPDATE PUBLIC.\"YAPI\" SET"):
+        raise HTTPException(
+            status_code=400, 
+            detail="Invalid query format. Only UPDATE queries on the YAPI table are allowed."
+        )
+
+    # Validate the fields being updated - only allow specific fields
+    if not any(field in sql_query for field in ALLOWED_UPDATE_FIELDS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Only the following fields can be updated: {', '.join(ALLOWED_UPDATE_FIELDS)}"
+        )
+
+    if "WHERE" in sql_query.upper():
+        # If there's already a WHERE clause, we don't want to modify it
+        logger.warning(f"Query already contains WHERE clause: {sql_query}")
+        raise HTTPException(
+            status_code=400,
+            detail="Custom WHERE clauses are not supported. The system will add the appropriate filters automatically."
+        )
+
+    # A second statement could be smuggled in after the SET clause
+    if ";" in sql_query:
+        raise HTTPException(status_code=400, detail="Only a single UPDATE statement is allowed.")
+
+    return sql_query
+
+class ChunkedUpdateError(Exception):
+    """Raised when a chunk fails; earlier chunks are already committed"""
+
+    def __init__(self, message: str, affected_rows: int, chunks: list):
+        super().__init__(message)
+        self.affected_rows = affected_rows
+        self.chunks = chunks
+
+def id_array_type(db: Session) -> str:
+    """
+    SQL array type of "YAPI"."ID" (e.g. `integer[]`).
+
+    Building IDs arrive as strings; casting the bound array to this type keeps
+    `"ID" = ANY(...)` comparing the column as-is, so the primary key index is used.
+    """
+    return f"{yapi_id_tipi(db)}[]"
+
+def run_chunked_update(
+    db: Session,
+    sql_query: str,
+    building_ids: list[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    batch_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Apply a validated UPDATE to the given buildings in chunks.
+
+    IDs are sent as a bound array cast to the column type
+    (`"ID" = ANY(CAST(:ids AS integer[]))` for an integer ID), so the statement text is
+    identical for every chunk and Postgres can reuse the plan. Each chunk is
+    committed in its own transaction; a failure stops the run and reports the
+    chunks that were already committed.
+
+    Args:
+        db: Database session
+        sql_query: Validated `UPDATE public."YAPI" SET ...` statement without WHERE
+        building_ids: Target building IDs
+        chunk_size: Maximum number of IDs per chunk/transaction
+        on_progress: Optional callback receiving (processed_ids, total_ids)
+        batch_id: Change-log batch every chunk is recorded under (see maks.snapshot)
+
+    Returns:
+        Dictionary with affected row count and per-chunk timings
+    """
+    ids = list(dict.fromkeys(building_ids))
+    chunk_size = max(1, chunk_size)
+    statement = text(f"{sql_query} WHERE \"ID\" = ANY(CAST(:ids AS {id_array_type(db)}))")
+    total = len(ids)
+
+    chunks = []
+    affected_rows = 0
+    started = time.perf_counter()
+
+    for index, offset in enumerate(range(0, total, chunk_size)):
+        chunk = ids[offset:offset + chunk_size]
+        chunk_started = time.perf_counter()
+        try:
+            batch_ayarla(db, batch_id)
+            result = db.execute(statement, {"ids": chunk})
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Chunk {index + 1} failed after {affected_rows} committed rows: {str(e)}")
+            raise ChunkedUpdateError(str(e), affected_rows, chunks) from e
+
+        duration_ms = round((time.perf_counter() - chunk_started) * 1000, 2)
+        affected_rows += result.rowcount
+        chunks.append({
+            "chunk": index + 1,
+            "ids": len(chunk),
+            "affected_rows": result.rowcount,
+            "duration_ms": duration_ms
+        })
+
+        processed = min(offset + chunk_size, total)
+        logger.info(f"Chunk {index + 1}: {result.rowcount} rows in {duration_ms} ms ({processed}/{total} IDs)")
+        if on_progress:
+            on_progress(processed, total)
+
+    return {
+        "affected_rows": affected_rows,
+        "total_ids": total,
+        "chunk_size": chunk_size,
+        "chunks": chunks,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+def dry_run_update(
+    db: Session,
+    set_sql: str,
+    where_sql: str,
+    params: Dict[str, Any],
+    field: str,
+    sample_size: int = 10
+) -> Dict[str, Any]:
+    """
+    Describe what an UPDATE would do without committing anything.
+
+    Everything runs in one transaction that is always rolled back:
+    - plan cost and row estimate from `EXPLAIN` (not executed)
+    - exact affected count from a read-only `SELECT count(*)`
+    - before/after values for a small sample, produced by updating only the
+      sampled rows, so at most `sample_size` dead tuples are created
+    - relation locks held by this backend after the sample update (table + indexes)
+      and the number of rows the real update would lock
+
+    Args:
+        db: Database session
+        set_sql: `UPDATE public."YAPI" SET ...` part of the statement
+        where_sql: WHERE clause selecting the target rows
+        params: Bind parameters for set_sql and where_sql
+        field: Column being updated
+        sample_size: Number of rows to show before/after values for
+    """
+    update_sql = f"{set_sql} WHERE {where_sql}"
+    sample_size = max(0, min(sample_size, 100))
+
+    try:
+        # Keep a runaway estimate from holding locks
+        db.execute(text("SELECT set_config('statement_timeout', '30s', true)"))
+
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {update_sql}"), params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        root = plan[0]["Plan"]
+        scan = root.get("Plans", [root])[0]
+
+        affected_rows = db.execute(
+            text(f"SELECT count(*) FROM public.\"YAPI\" WHERE {where_sql}"), params
+        ).scalar()
+
+        table_rows = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'public.\"YAPI\"'::regclass")
+        ).scalar()
+
+        before = db.execute(
+            text(f"SELECT \"ID\", \"{field}\" FROM public.\"YAPI\" WHERE {where_sql} ORDER BY \"ID\" LIMIT :dry_run_limit"),
+            {**params, "dry_run_limit": sample_size}
+        ).fetchall()
+        sample_ids = [row[0] for row in before]
+
+        after = {}
+        if sample_ids:
+            updated = db.execute(
+                text(f"{set_sql} WHERE \"ID\" = ANY(:dry_run_ids) RETURNING \"ID\", \"{field}\""),
+                {**params, "dry_run_ids": sample_ids}
+            ).fetchall()
+            after = {row[0]: row[1] for row in updated}
+
+        locks = db.execute(text("""
+            SELECT relation::regclass::text AS relation, mode
+            FROM pg_locks
+            WHERE pid = pg_backend_pid() AND locktype = 'relation'
+              AND relation::regclass::text NOT LIKE 'pg_%'
+            ORDER BY 1, 2
+        """)).fetchall()
+
+    finally:
+        db.rollback()
+
+    table_fraction = round(affected_rows / table_rows, 4) if table_rows and table_rows > 0 else None
+    warnings = []
+    if table_fraction is not None and table_fraction >= 0.5:
+        warnings.append(
+            f"Update touches {table_fraction:.0%} of the table; this rewrites most rows and will need a VACUUM afterwards."
+        )
+
+    return {
+        "status": "dry_run",
+        "affected_rows": affected_rows,
+        "estimated_rows": scan.get("Plan Rows"),
+        "table_rows_estimate": table_rows,
+        "table_fraction": table_fraction,
+        "plan": {
+            "startup_cost": root.get("Startup Cost"),
+            "total_cost": root.get("Total Cost"),
+            "scan": scan.get("Node Type"),
+            "index": scan.get("Index Name")
+        },
+        "locks": {
+            "relations": [{"relation": row[0], "mode": row[1]} for row in locks],
+            # Postgres keeps row locks in the tuples, not in pg_locks; the real update
+            # takes one per affected row, for the length of its transaction
+            "rows_to_lock": affected_rows
+        },
+        "sample": [
+            {"ID": row[0], "before": row[1], "after": after.get(row[0])}
+            for row in before
+        ],
+        "warnings": warnings
+    }
+
+def _chunked_update_job(job: Job, db: Session, sql_query: str, building_ids: list[str], chunk_size: int, batch_id: str):
+    def on_progress(processed: int, total: int):
+        job.report_progress(processed / total, f"{processed}/{total} bina işlendi")
+
+    return run_chunked_update(db, sql_query, building_ids, chunk_size, on_progress, batch_id)
+
+def _predicate_update_job(job: Job, db: Session, update_sql: str, params: Dict[str, Any], batch_id: str):
+    started = time.perf_counter()
+    batch_ayarla(db, batch_id)
+    result = db.execute(text(update_sql), params)
+    job.check_cancelled()
+    db.commit()
+    return {
+        "affected_rows": result.rowcount,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
 
 @router.post("/update", status_code=200)
 async def update_buildings(
@@ -28,10 +338,13 @@ async def update_buildings(
     - Only UPDATE queries are allowed
     - The query must target the YAPI table
     - Only certain fields can be updated (TIP, DURUM, SERAGAZEMISYONSINIF)
+    - Building IDs are bound as an array and applied in chunks, one transaction per chunk
+    - With `dry_run` nothing is committed; the affected count, plan cost and a sample are returned
+    - With `background` the update runs as a job; poll /maks/jobs/{id} for progress
+    - With `snapshot` a named snapshot is taken first so the update can be rolled back
+    - Every update is recorded under a `batch_id` that /maks/batches/{id}/undo can revert
     """
     try:
-        # Validate query - basic security check
-        sql_query = request.sql_query.strip()
         building_ids = request.building_ids
         
         # Validate building IDs
@@ -40,65 +353,100 @@ async def update_buildings(
                 status_code=400,
                 detail="No building IDs provided. Cannot update without target buildings."
             )
-            
-        # Check if it's an UPDATE query on YAPI table
-        if not sql_query.upper().startswith("UPDATE PUBLIC.\"YAPI\" SET"):
-            raise HTTPException(
-                status_code=400, 
-                detail="Invalid query format. Only UPDATE queries on the YAPI table are allowed."
-            )
-        
-        # Validate the fields being updated - only allow specific fields
-        allowed_fields = ["\"TIP\"", "\"DURUM\"", "\"SERAGAZEMISYONSINIF\""]
-        valid_field = False
-        
-        for field in allowed_fields:
-            if field in sql_query:
-                valid_field = True
-                break
-                
-        if not valid_field:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Only the following fields can be updated: {', '.join(allowed_fields)}"
-            )
-            
-        # Modify the query to only target specific buildings
-        # Extract the main part of the query (what's being updated)
-        if "WHERE" in sql_query.upper():
-            # If there's already a WHERE clause, we don't want to modify it
-            # This is a safety check, but our current implementation doesn't add WHERE clauses
-            logger.warning(f"Query already contains WHERE clause: {sql_query}")
-            raise HTTPException(
-                status_code=400,
-                detail="Custom WHERE clauses are not supported. The system will add the appropriate filters automatically."
-            )
-            
-        # Add WHERE clause to only update the filtered buildings
-        building_ids_list = ", ".join([f"'{bid}'" for bid in building_ids])
-        modified_query = f"{sql_query} WHERE \"ID\" IN ({building_ids_list})"
-        
-        # Execute the modified query
-        logger.info(f"Original query: {sql_query}")
-        logger.info(f"Executing modified query: {modified_query}")
-        
-        result = db.execute(text(modified_query))
-        db.commit()
-        
-        # Get count of affected rows
-        affected_rows = result.rowcount
-        logger.info(f"Updated {affected_rows} rows")
+
+        sql_query = validate_update_query(request.sql_query)
+        chunk_size = request.chunk_size or DEFAULT_CHUNK_SIZE
+
+        if request.dry_run:
+            field_match = re.search(r'SET\s+"(\w+)"', sql_query, re.IGNORECASE)
+            field = field_match.group(1) if field_match else "TIP"
+            ids = list(dict.fromkeys(building_ids))
+            where_sql = f"\"ID\" = ANY(CAST(:ids AS {id_array_type(db)}))"
+            return dry_run_update(db, sql_query, where_sql, {"ids": ids}, field, request.sample_size)
+
+        snapshot = snapshot_olustur(db, aciklama=f"/maks/update öncesi: {sql_query}") if request.snapshot else None
+        batch_id = batch_baslat(db, f"/maks/update: {sql_query} ({len(building_ids)} bina)")
+
+        if request.background:
+            job = submit_job("update", "YAPI", _chunked_update_job, sql_query, building_ids, chunk_size, batch_id)
+            return {"status": "queued", "message": "Update job queued", "job": job.to_dict(), "snapshot": snapshot, "batch_id": batch_id}
+
+        logger.info(f"Executing update for {len(building_ids)} buildings in chunks of {chunk_size}: {sql_query}")
+        summary = run_chunked_update(db, sql_query, building_ids, chunk_size, batch_id=batch_id)
+        logger.info(f"Updated {summary['affected_rows']} rows in {summary['duration_ms']} ms")
         
         return {
             "status": "success",
-            "message": f"Successfully updated {affected_rows} buildings",
-            "affected_rows": affected_rows
+            "message": f"Successfully updated {summary['affected_rows']} buildings",
+            **summary,
+            "snapshot": snapshot,
+            "batch_id": batch_id
         }
         
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
+    except ChunkedUpdateError as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "message": f"Update failed: {str(e)}",
+                "committed_rows": e.affected_rows,
+                "committed_chunks": e.chunks
+            }
+        )
     except Exception as e:
         logger.error(f"Error executing update query: {str(e)}")
         db.rollback()  # Roll back the transaction on error
         raise HTTPException(status_code=500, detail=f"Update failed: {str(e)}")
+
+@router.post("/update/by-filter", status_code=200)
+async def update_buildings_by_filter(
+    request: PredicateUpdateRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Update every building matching a filter with a single server-side UPDATE.
+
+    Takes the same filter parameters as AIBuildingFilter (zeminustu, zeminalti,
+    durum, tip, seragazi, deprem_riski) plus an optional bbox or center/radius,
+    so the browser never has to collect and send building IDs.
+    With `dry_run` the statement is only explained and sampled, then rolled back.
+    """
+    set_sql, where_sql, params = build_predicate_update(request)
+    update_sql = f"{set_sql} WHERE {where_sql}"
+
+    try:
+        if request.dry_run:
+            return dry_run_update(db, set_sql, where_sql, params, request.field, request.sample_size)
+
+        snapshot = snapshot_olustur(db, aciklama=f"/maks/update/by-filter öncesi: {request.field} = {request.value}") if request.snapshot else None
+        batch_id = batch_baslat(db, f"/maks/update/by-filter: {request.field} = {request.value}")
+
+        if request.background:
+            job = submit_job("update", "YAPI", _predicate_update_job, update_sql, params, batch_id)
+            return {"status": "queued", "message": "Update job queued", "job": job.to_dict(), "snapshot": snapshot, "batch_id": batch_id}
+
+        logger.info(f"Executing predicate update: {update_sql} {params}")
+        started = time.perf_counter()
+        batch_ayarla(db, batch_id)
+        result = db.execute(text(update_sql), params)
+        db.commit()
+        duration_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        affected_rows = result.rowcount
+        logger.info(f"Updated {affected_rows} rows in {duration_ms} ms")
+
+        return {
+            "status": "success",
+            "message": f"Successfully updated {affected_rows} buildings",
+            "affected_rows": affected_rows,
+            "duration_ms": duration_ms,
+            "snapshot": snapshot,
+            "batch_id": batch_id
+        }
+
+    except Exception as e:
+        logger.error(f"Error executing predicate update: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Update failed: {str(e)}")
@@ -0,0 +1,283 @@
+"""
+YAPI tablosunun binary COPY ile dışa ve içe aktarımı.
+
+Tablo `COPY ... TO STDOUT (FORMAT binary)` ile gzip'li bir dosyaya akıtılır,
+yanına kolon listesi, satır sayısı ve sha256 özetlerini içeren bir manifest
+yazılır. İçe aktarımda özet doğrulanır, veri `COPY FROM` ile ara tabloya
+yüklenir ve ara tablo `tablo_degistir` ile tek adımda "YAPI" yapılır.
+
+Komut satırından:
+    python -m maks.yedek export [dosya]
+    python -m maks.yedek import <dosya>
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal, dbapi_baglantisi
+from maks.jobs import Job, submit_job
+from maks.restore import tablo_degistir
+
+router = APIRouter()
+
+# Sunucu tarafında yedeklerin tutulduğu dizin
+YEDEK_DIZINI = os.getenv("MAKS_YEDEK_DIZINI", "yedekler")
+YEDEK_UZANTISI = ".copy.gz"
+MANIFEST_UZANTISI = ".manifest.json"
+YUKLEME_TABLOSU = "YAPI_YUKLEME"
+FORMAT = "pgcopy-binary"
+
+class _OzetYazici:
+    """COPY çıktısını gzip dosyasına yazarken sha256 ve boyut hesaplar"""
+
+    def __init__(self, dosya):
+        self.dosya = dosya
+        self.ozet = hashlib.sha256()
+        self.boyut = 0
+
+    def write(self, veri):
+        self.ozet.update(veri)
+        self.boyut += len(veri)
+        return self.dosya.write(veri)
+
+class _OzetOkuyucu:
+    """gzip dosyasından COPY'ye veri verirken sha256 hesaplar"""
+
+    def __init__(self, dosya):
+        self.dosya = dosya
+        self.ozet = hashlib.sha256()
+
+    def read(self, boyut=-1):
+        veri = self.dosya.read(boyut)
+        self.ozet.update(veri)
+        return veri
+
+    def readline(self, boyut=-1):
+        veri = self.dosya.readline(boyut)
+        self.ozet.update(veri)
+        return veri
+
+def _manifest_yolu(dosya: str) -> str:
+    if dosya.endswith(YEDEK_UZANTISI):
+        dosya = dosya[:-len(YEDEK_UZANTISI)]
+    return dosya + MANIFEST_UZANTISI
+
+def _dosya_ozeti(dosya: str) -> str:
+    ozet = hashlib.sha256()
+    with open(dosya, "rb") as f:
+        for parca in iter(lambda: f.read(1024 * 1024), b""):
+            ozet.update(parca)
+    return ozet.hexdigest()
+
+def _kolonlar(db: Session, tablo: str) -> list[Dict[str, str]]:
+    """Tablonun yazılabilir kolonları ve tipleri; binary COPY tiplerin birebir uyuşmasını ister"""
+    rows = db.execute(text("""
+        SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+        FROM pg_attribute a
+        WHERE a.attrelid = to_regclass(:tablo) AND a.attnum > 0
+          AND NOT a.attisdropped AND a.attgenerated = ''
+        ORDER BY a.attnum
+    """), {"tablo": f'public."{tablo}"'}).fetchall()
+    return [{"name": row[0], "type": row[1]} for row in rows]
+
+def _kolon_listesi(kolonlar: list[Dict[str, str]]) -> str:
+    return ", ".join(f'"{kolon["name"]}"' for kolon in kolonlar)
+
+def disa_aktar(db: Session, dosya: str, job: Optional[Job] = None) -> Dict[str, Any]:
+    """
+    "YAPI"yı binary COPY ile gzip'li dosyaya yazar ve manifest oluşturur.
+
+    COPY tek bir ifade olduğundan tutarlı bir anlık görüntü alınır; eşzamanlı
+    güncellemeler beklemez.
+    """
+    kolonlar = _kolonlar(db, "YAPI")
+    os.makedirs(os.path.dirname(os.path.abspath(dosya)), exist_ok=True)
+
+    started = time.perf_counter()
+    gecici = dosya + ".part"
+    with gzip.open(gecici, "wb", compresslevel=6) as gz:
+        yazici = _OzetYazici(gz)
+        with dbapi_baglantisi(db).cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY public."YAPI" ({_kolon_listesi(kolonlar)}) TO STDOUT (FORMAT binary)',
+                yazici
+            )
+            satir_sayisi = cursor.rowcount
+    db.commit()
+    os.replace(gecici, dosya)
+    if job:
+        job.report_progress(0.9, f"{satir_sayisi} satır yazıldı")
+
+    manifest = {
+        "format": FORMAT,
+        "compression": "gzip",
+        "table": "YAPI",
+        "columns": kolonlar,
+        "rows": satir_sayisi,
+        "raw_bytes": yazici.boyut,
+        "raw_sha256": yazici.ozet.hexdigest(),
+        "file_bytes": os.path.getsize(dosya),
+        "file_sha256": _dosya_ozeti(dosya),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    with open(_manifest_yolu(dosya), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    return {"message": f"✅ YAPI tablosu dışa aktarıldı: {os.path.basename(dosya)}", "file": dosya, **manifest}
+
+def ice_aktar(db: Session, dosya: str, job: Optional[Job] = None) -> Dict[str, Any]:
+    """
+    Manifest'i doğrulanan bir yedeği ara tabloya yükler ve "YAPI" ile yer değiştirir.
+
+    Yükleme sırasında canlı tablo okunmaya ve yazılmaya devam eder; kilit yalnızca
+    son tablo değişiminde alınır.
+    """
+    manifest_dosyasi = _manifest_yolu(dosya)
+    if not os.path.exists(manifest_dosyasi):
+        raise ValueError(f"Manifest bulunamadı: {manifest_dosyasi}")
+    with open(manifest_dosyasi, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT:
+        raise ValueError(f"Desteklenmeyen yedek formatı: {manifest.get('format')}")
+
+    # 1. Dosya bütünlüğü
+    if _dosya_ozeti(dosya) != manifest["file_sha256"]:
+        raise ValueError("Yedek dosyasının sha256 özeti manifest ile uyuşmuyor")
+
+    # 2. Şema uyumu: binary COPY kolon tiplerinin aynı olmasını gerektirir
+    mevcut = {kolon["name"]: kolon["type"] for kolon in _kolonlar(db, "YAPI")}
+    uyumsuz = [
+        kolon["name"] for kolon in manifest["columns"]
+        if mevcut.get(kolon["name"]) != kolon["type"]
+    ]
+    if uyumsuz:
+        raise ValueError(f"Yedekteki kolonlar mevcut YAPI şemasıyla uyuşmuyor: {', '.join(uyumsuz)}")
+    if job:
+        job.report_progress(0.1, "Yedek doğrulandı, ara tabloya yükleniyor")
+
+    # 3. Ara tabloya yükle
+    started = time.perf_counter()
+    db.execute(text(f'DROP TABLE IF EXISTS public."{YUKLEME_TABLOSU}";'))
+    db.execute(text(f'CREATE TABLE public."{YUKLEME_TABLOSU}" (LIKE public."YAPI" INCLUDING ALL);'))
+    with gzip.open(dosya, "rb") as gz:
+        okuyucu = _OzetOkuyucu(gz)
+        with dbapi_baglantisi(db).cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY public."{YUKLEME_TABLOSU}" ({_kolon_listesi(manifest["columns"])}) FROM STDIN (FORMAT binary)',
+                okuyucu
+            )
+            satir_sayisi = cursor.rowcount
+
+    if okuyucu.ozet.hexdigest() != manifest["raw_sha256"] or satir_sayisi != manifest["rows"]:
+        db.rollback()
+        raise ValueError("Yüklenen veri manifest ile uyuşmuyor (özet ya da satır sayısı farklı)")
+    db.commit()
+    if job:
+        job.report_progress(0.8, f"{satir_sayisi} satır yüklendi, tablolar değiştiriliyor")
+
+    # 4. Ara tabloyu canlı tabloyla yer değiştir
+    tablo_degistir(db, YUKLEME_TABLOSU)
+
+    return {
+        "message": f"✅ YAPI tablosu {os.path.basename(dosya)} yedeğinden yüklendi",
+        "rows": satir_sayisi,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+def _yedek_dosyasi(ad: str) -> str:
+    """Yedek adını sunucu dizinindeki dosya yoluna çevirir (dizin dışına çıkılamaz)"""
+    if os.path.basename(ad) != ad or not ad:
+        raise HTTPException(status_code=400, detail="Geçersiz yedek adı")
+    if not ad.endswith(YEDEK_UZANTISI):
+        ad += YEDEK_UZANTISI
+    return os.path.join(YEDEK_DIZINI, ad)
+
+def _disa_aktar_isi(job: Job, db: Session, dosya: str):
+    return disa_aktar(db, dosya, job)
+
+def _ice_aktar_isi(job: Job, db: Session, dosya: str):
+    return ice_aktar(db, dosya, job)
+
+@router.post("/yapi/export", status_code=202)
+async def export_yapi():
+    """YAPI tablosunu sunucudaki yedek dizinine binary COPY ile dışa aktarır"""
+    ad = f"yapi-{datetime.now().strftime('%Y%m%d-%H%M%S')}{YEDEK_UZANTISI}"
+    job = submit_job("export", "YAPI", _disa_aktar_isi, os.path.join(YEDEK_DIZINI, ad))
+    return {"message": "⏳ Dışa aktarma işi başlatıldı", "backup": ad, "job": job.to_dict()}
+
+@router.get("/yapi/backups")
+async def list_backups():
+    """Sunucudaki yedekleri manifest bilgileriyle listeler"""
+    if not os.path.isdir(YEDEK_DIZINI):
+        return {"backups": []}
+    yedekler = []
+    for ad in sorted(os.listdir(YEDEK_DIZINI), reverse=True):
+        if not ad.endswith(YEDEK_UZANTISI):
+            continue
+        manifest_dosyasi = _manifest_yolu(os.path.join(YEDEK_DIZINI, ad))
+        manifest = {}
+        if os.path.exists(manifest_dosyasi):
+            with open(manifest_dosyasi, encoding="utf-8") as f:
+                manifest = json.load(f)
+        yedekler.append({
+            "name": ad,
+            "rows": manifest.get("rows"),
+            "file_bytes": manifest.get("file_bytes"),
+            "created_at": manifest.get("created_at"),
+        })
+    return {"backups": yedekler}
+
+@router.get("/yapi/backups/{ad}")
+async def download_backup(ad: str, manifest: bool = False):
+    """Bir yedeği (ya da manifest'ini) başka bir ortama taşımak için indirir"""
+    dosya = _yedek_dosyasi(ad)
+    if manifest:
+        dosya = _manifest_yolu(dosya)
+    if not os.path.exists(dosya):
+        raise HTTPException(status_code=404, detail="Yedek bulunamadı")
+    return FileResponse(dosya, filename=os.path.basename(dosya))
+
+@router.post("/yapi/backups/{ad}/import", status_code=202)
+async def import_backup(ad: str):
+    """Bir yedeği ara tabloya yükleyip canlı YAPI tablosuyla yer değiştirir"""
+    dosya = _yedek_dosyasi(ad)
+    if not os.path.exists(dosya):
+        raise HTTPException(status_code=404, detail="Yedek bulunamadı")
+    job = submit_job("import", "YAPI", _ice_aktar_isi, dosya)
+    return {"message": "⏳ İçe aktarma işi başlatıldı", "job": job.to_dict()}
+
+def main():
+    parser = argparse.ArgumentParser(description="YAPI tablosunu binary COPY ile dışa/içe aktarır")
+    alt = parser.add_subparsers(dest="komut", required=True)
+    export_parser = alt.add_parser("export", help="YAPI tablosunu dosyaya yazar")
+    export_parser.add_argument(
+        "dosya", nargs="?",
+        default=f"yapi-{datetime.now().strftime('%Y%m%d-%H%M%S')}{YEDEK_UZANTISI}"
+    )
+    import_parser = alt.add_parser("import", help="Dosyadaki yedeği YAPI tablosuna yükler")
+    import_parser.add_argument("dosya")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.komut == "export":
+            sonuc = disa_aktar(db, args.dosya)
+        else:
+            sonuc = ice_aktar(db, args.dosya)
+    finally:
+        db.close()
+    print(json.dumps(sonuc, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
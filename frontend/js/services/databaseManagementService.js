@@ -2,6 +2,20 @@ import { showNotification, showLoading, hideLoading, updateLoadingMessage } from
 
 const settingsToggle = document.getElementById("settings-toggle");
 
+// Klonlama ve geri yükleme arka plan işi olarak çalışır; iş bitene kadar durumunu sorgula
+async function waitForJob(job, message) {
+    while (job.status === "queued" || job.status === "running") {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const response = await fetch(`http://localhost:8001/maks/jobs/${job.id}`);
+        if (!response.ok) {
+            throw new Error(`İş durumu alınamadı: ${response.status}`);
+        }
+        job = await response.json();
+        updateLoadingMessage(`${message} (%${Math.round(job.progress * 100)})`);
+    }
+    return job;
+}
+
 export async function restoreService() {
     try {
         
@@ -16,8 +30,9 @@ export async function restoreService() {
         });
         
         const result = await response.json();
+        const job = response.ok ? await waitForJob(result.job, "Veritabanı sıfırlanıyor, lütfen bekleyiniz...") : null;
         
-        if (response.ok) {
+        if (job && job.status === "succeeded") {
             // Başarılı mesajını göstermeden doğrudan kapatıyoruz
             hideLoading();
             
@@ -49,8 +64,9 @@ export async function cloneService() {
         });
         
         const result = await response.json();
+        const job = response.ok ? await waitForJob(result.job, "Veritabanı yedekleniyor, lütfen bekleyiniz...") : null;
         
-        if (response.ok) {
+        if (job && job.status === "succeeded") {
             // Başarılı mesajını göstermeden doğrudan kapatıyoruz
             hideLoading();
             